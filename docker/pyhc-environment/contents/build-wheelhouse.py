@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+Build the wheels listed in install-tiers/wheelhouse.txt that the wheelhouse doesn't have yet.
+
+Runs in the Dockerfile's `wheels` stage, with the image's conda toolchain:
+
+    python /build-wheelhouse.py /wheelhouse-plan.txt /wheelhouse-cache /wheelhouse /wheelhouse-builds
+
+Each plan line is "name==version  # key". A key whose directory in the cache (contents/wheelhouse) already holds a
+wheel is copied from there; otherwise the release is built with `pip wheel --no-deps`. The output directory gets
+one <key>/<wheel> per plan line and an install.txt with their relative paths, and nothing else, so it's identical
+from run to run and the install layer stays cached. <key>.json files in the report directory record whether each
+wheel was reused and how long builds took. Standard library only, since it runs against the image's environment.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+
+def read_plan(path):
+    """
+    :param path: install-tiers/wheelhouse.txt
+    :return: List of (key, "name==version") in file order
+    """
+    plan = []
+    with open(path, "r") as f:
+        for line in f:
+            if line.startswith("#") or "#" not in line:
+                continue
+            pin, key = (part.strip() for part in line.split("#", 1))
+            plan.append((key, pin))
+    return plan
+
+
+def find_wheel(directory):
+    if not os.path.isdir(directory):
+        return None
+    wheels = sorted(f for f in os.listdir(directory) if f.endswith(".whl"))
+    return wheels[0] if wheels else None
+
+
+def build_wheel(pin, directory):
+    """
+    :param pin: "name==version"
+    :param directory: Output directory for the wheel
+    :return: Build time in seconds
+    """
+    os.makedirs(directory, exist_ok=True)
+    name = pin.split("==", 1)[0]
+    start = time.monotonic()
+    subprocess.run(
+        [sys.executable, "-m", "pip", "wheel", "--no-deps", "--no-binary", name, "--wheel-dir", directory, pin],
+        check=True,
+    )
+    return time.monotonic() - start
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 4:
+        print("usage: build-wheelhouse.py PLAN_FILE CACHE_DIR OUTPUT_DIR REPORT_DIR")
+        return 2
+    plan_path, cache_dir, output_dir, report_dir = args
+    os.makedirs(output_dir, exist_ok=True)
+    os.makedirs(report_dir, exist_ok=True)
+
+    wheels = []
+    for key, pin in read_plan(plan_path):
+        directory = os.path.join(output_dir, key)
+        wheel = find_wheel(os.path.join(cache_dir, key))
+        if wheel is not None:
+            os.makedirs(directory, exist_ok=True)
+            shutil.copy2(os.path.join(cache_dir, key, wheel), os.path.join(directory, wheel))
+            build_info = {"cached": True}
+            print(f"Reusing {key}: {wheel}")
+        else:
+            print(f"Building {pin} ({key})")
+            build_info = {"cached": False, "build_seconds": round(build_wheel(pin, directory), 1)}
+            wheel = find_wheel(directory)
+            if wheel is None:
+                print(f"ERROR: pip wheel produced no wheel for {pin}")
+                return 1
+            print(f"Built {wheel} in {build_info['build_seconds']}s")
+        with open(os.path.join(report_dir, f"{key}.json"), "w") as f:
+            json.dump(build_info, f)
+        wheels.append(f"{key}/{wheel}")
+
+    with open(os.path.join(output_dir, "install.txt"), "w") as f:
+        f.write("".join(f"{path}\n" for path in wheels))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
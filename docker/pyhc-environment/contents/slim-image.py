@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+"""
+Remove files the image doesn't need from a conda environment, in the same RUN as the install that created them.
+
+    SLIM_SINCE=$(mktemp) && uv pip install ... && python /app/slim-image.py --since "$SLIM_SINCE" \
+        --rules /app/slim-rules.txt --layer base /opt/conda/envs/pyhc-all
+
+Only files whose inode changed after the --since marker (i.e. were created by this layer's install) are touched:
+deleting or rewriting a file from a lower layer would not make the image any smaller. Rules are documented in
+slim-rules.txt. Prints one "slim: <bytes>\t<files>\t<layer>\t<action> <pattern>" line per rule, which
+docker_operations.py collects from the build log into the slimming report. Standard library only.
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+
+ACTIONS = ("allow", "deny", "strip", "dedupe")
+
+
+def glob_to_regex(pattern):
+    """Translate a rule pattern ("**", "*", "?", trailing "/" for directories) into a regex over relative paths."""
+    regex = ""
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+        elif pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+        elif pattern[i] == "*":
+            regex += "[^/]*"
+            i += 1
+        elif pattern[i] == "?":
+            regex += "[^/]"
+            i += 1
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    return re.compile(f"^{regex}$")
+
+
+def parse_rules(path, cache_tag):
+    """
+    :param path: Rules file (see slim-rules.txt)
+    :param cache_tag: Bytecode tag of the environment's Python, substituted for {cache_tag}
+    :return: List of dicts {"action", "pattern", "regex", "dir_only"} in file order
+    """
+    rules = []
+    with open(path, "r") as f:
+        for number, line in enumerate(f, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            parts = line.split()
+            if len(parts) != 2 or parts[0] not in ACTIONS:
+                raise ValueError(f"{path}:{number}: expected '<{'|'.join(ACTIONS)}> <pattern>', got {line!r}")
+            action, pattern = parts
+            pattern = pattern.replace("{cache_tag}", cache_tag)
+            rules.append({
+                "action": action,
+                "pattern": pattern,
+                "regex": glob_to_regex(pattern.rstrip("/")),
+                "dir_only": pattern.endswith("/"),
+            })
+    return rules
+
+
+def environment_cache_tag(root):
+    """Bytecode tag of the Python in a conda environment, e.g. "cpython-312" for lib/python3.12."""
+    for path in sorted(glob.glob(os.path.join(root, "lib", "python3.*"))):
+        match = re.fullmatch(r"python3\.(\d+)", os.path.basename(path))
+        if match:
+            return f"cpython-3{match.group(1)}"
+    return sys.implementation.cache_tag
+
+
+def _matching(rules, relpath, is_dir, actions):
+    for rule in rules:
+        if rule["action"] in actions and (is_dir or not rule["dir_only"]) and rule["regex"].match(relpath):
+            return rule
+    return None
+
+
+def _is_elf(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read(4) == b"\x7fELF"
+    except OSError:
+        return False
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def slim(root, rules, since_ns=None, dry_run=False):
+    """
+    Apply the rules to the files under root created after since_ns.
+    :param root: Environment directory like /opt/conda/envs/pyhc-all
+    :param rules: From parse_rules()
+    :param since_ns: Only touch files whose st_ctime_ns is newer than this (None: all files)
+    :param dry_run: Only measure what would be saved
+    :return: Dict mapping "<action> <pattern>" → {"bytes": saved, "files": count}
+    """
+    saved = {f"{rule['action']} {rule['pattern']}": {"bytes": 0, "files": 0} for rule in rules if rule["action"] != "allow"}
+    inherited = {root: (None, None)}  # directory → (allow rule, deny rule) applying to everything under it
+    new_dirs = []
+    to_strip, to_dedupe = [], []
+
+    for dirpath, dirnames, filenames in os.walk(root):
+        allowed, denied = inherited.pop(dirpath)
+        for dirname in dirnames:
+            path = os.path.join(dirpath, dirname)
+            relpath = os.path.relpath(path, root)
+            inherited[path] = (
+                allowed or _matching(rules, relpath, True, ("allow",)),
+                denied or _matching(rules, relpath, True, ("deny",)),
+            )
+            if since_ns is None or os.lstat(path).st_ctime_ns > since_ns:
+                new_dirs.append(path)
+
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            stat = os.lstat(path)
+            if since_ns is not None and stat.st_ctime_ns <= since_ns:
+                continue
+            relpath = os.path.relpath(path, root)
+            if allowed or _matching(rules, relpath, False, ("allow",)):
+                continue
+            rule = denied or _matching(rules, relpath, False, ("deny", "strip", "dedupe"))
+            if rule is None:
+                continue
+            if rule["action"] == "deny":
+                key = f"deny {rule['pattern']}"
+                saved[key]["bytes"] += stat.st_size if stat.st_nlink == 1 else 0
+                saved[key]["files"] += 1
+                if not dry_run:
+                    os.remove(path)
+            elif os.path.islink(path):
+                continue
+            elif rule["action"] == "strip":
+                to_strip.append((path, rule, stat.st_size))
+            else:
+                to_dedupe.append((path, rule, stat))
+
+    strip = shutil.which("strip")
+    for path, rule, size in to_strip:
+        if strip is None or not _is_elf(path):
+            continue
+        key = f"strip {rule['pattern']}"
+        if dry_run:
+            saved[key]["files"] += 1
+            continue
+        if subprocess.run([strip, "--strip-debug", path], capture_output=True).returncode == 0:
+            saved[key]["bytes"] += max(0, size - os.path.getsize(path))
+            saved[key]["files"] += 1
+
+    originals = {}
+    for path, rule, stat in to_dedupe:
+        fingerprint = (stat.st_size, _sha256(path))
+        original = originals.setdefault(fingerprint, path)
+        if original == path or os.path.samefile(original, path):
+            continue
+        key = f"dedupe {rule['pattern']}"
+        saved[key]["bytes"] += stat.st_size
+        saved[key]["files"] += 1
+        if not dry_run:
+            tmp_path = f"{path}.slim-link"
+            os.link(original, tmp_path)
+            os.replace(tmp_path, path)
+
+    if not dry_run:
+        for path in reversed(new_dirs):  # Deepest first
+            try:
+                os.rmdir(path)  # Only succeeds for directories emptied above
+            except OSError:
+                pass
+    return saved
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root", help="Environment directory, e.g. /opt/conda/envs/pyhc-all")
+    parser.add_argument("--rules", required=True, help="Rules file (slim-rules.txt)")
+    parser.add_argument("--since", help="Marker file created before the install; older files are left alone")
+    parser.add_argument("--layer", default="", help="Name of the layer in the report")
+    parser.add_argument("--report", help="Also write the savings to this JSON file")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be saved")
+    args = parser.parse_args(argv)
+
+    rules = parse_rules(args.rules, environment_cache_tag(args.root))
+    since_ns = os.stat(args.since).st_ctime_ns if args.since else None
+    saved = slim(args.root, rules, since_ns, args.dry_run)
+
+    for rule, result in saved.items():
+        print(f"slim: {result['bytes']}\t{result['files']}\t{args.layer}\t{rule}")
+    total = sum(result["bytes"] for result in saved.values())
+    print(f"Slimming {args.layer or args.root}: {total / 1024 ** 2:.1f} MB saved{' (dry run)' if args.dry_run else ''}")
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({"layer": args.layer, "rules": saved}, f, indent=1)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+Check that the image's Python environment matches the install tier files exactly.
+
+Run inside the Docker build after the last `uv pip install --no-deps` layer:
+
+    python /app/verify-lockfile.py /app/install-tiers/base.txt /app/install-tiers/mid.txt \
+        /app/install-tiers/wheelhouse.txt /app/install-tiers/top.txt
+
+Fails (exit 1) when a pinned distribution is missing or installed at another version. Distributions that aren't in
+the tier files (the conda environment's own packages, e.g. pip and uv) are only counted. Standard library only, since
+it runs against the freshly installed environment.
+"""
+
+import re
+import sys
+from importlib import metadata
+
+try:
+    from packaging.version import Version, InvalidVersion
+except ImportError:  # Fall back to comparing version strings
+    Version = None
+
+PIN_PATTERN = re.compile(r"^([A-Za-z0-9][A-Za-z0-9._-]*)==([^\s#;\\]+)")
+
+
+def canonicalize(name):
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def read_pins(paths):
+    """
+    :param paths: Requirement files with "name==version" lines, optionally followed by indented --hash lines
+    :return: Dict mapping canonical name to (name, version)
+    """
+    pins = {}
+    for path in paths:
+        with open(path, "r") as f:
+            for line in f:
+                match = PIN_PATTERN.match(line)
+                if match:
+                    pins[canonicalize(match.group(1))] = (match.group(1), match.group(2))
+    return pins
+
+
+def installed_versions():
+    """
+    :return: Dict mapping canonical name to installed version, first on sys.path wins
+    """
+    installed = {}
+    for dist in metadata.distributions():
+        name = dist.metadata["Name"]
+        if name:
+            installed.setdefault(canonicalize(name), dist.version)
+    return installed
+
+
+def same_version(pinned, installed):
+    if Version is not None:
+        try:
+            return Version(pinned) == Version(installed)
+        except InvalidVersion:
+            pass
+    return pinned == installed
+
+
+def compare(pins, installed):
+    """
+    :param pins: From read_pins()
+    :param installed: From installed_versions()
+    :return: Tuple (missing, mismatched, extra): lists of names, of (name, pinned, installed), and of canonical names
+    """
+    missing = []
+    mismatched = []
+    for canonical, (name, version) in sorted(pins.items()):
+        if canonical not in installed:
+            missing.append(name)
+        elif not same_version(version, installed[canonical]):
+            mismatched.append((name, version, installed[canonical]))
+    extra = sorted(set(installed) - set(pins))
+    return missing, mismatched, extra
+
+
+def main(argv=None):
+    paths = sys.argv[1:] if argv is None else argv
+    if not paths:
+        print("usage: verify-lockfile.py REQUIREMENTS_FILE [REQUIREMENTS_FILE ...]")
+        return 2
+
+    pins = read_pins(paths)
+    missing, mismatched, extra = compare(pins, installed_versions())
+    for name in missing:
+        print(f"MISSING  {name}=={pins[canonicalize(name)][1]}")
+    for name, pinned, actual in mismatched:
+        print(f"MISMATCH {name}: locked {pinned}, installed {actual}")
+    print(f"{len(pins) - len(missing) - len(mismatched)}/{len(pins)} locked distributions installed exactly; "
+          f"{len(extra)} other distributions from the base environment")
+    return 1 if missing or mismatched else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
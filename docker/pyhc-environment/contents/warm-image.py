@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+"""
+Create jovyan's first-run caches at build time, and check that starting to work in the image writes nothing.
+
+Run as jovyan at the end of the Docker build, after every install:
+
+    python /app/warm-image.py
+
+1. Times a first plot the way a new container used to start: without bytecode (PYTHONPYCACHEPREFIX pointing at an
+   empty directory) and with an empty home directory, so the matplotlib font cache, astropy/sunpy config and cache
+   directories etc. have to be created first.
+2. Imports the core packages once in jovyan's real home, which creates those caches, and builds the matplotlib font
+   cache with a first plot.
+3. Times the first plot again, now with the bytecode compiled by compile-bytecode.py and the warmed caches.
+4. Imports the core packages in a fresh interpreter and fails (exit 1) if that created or changed any file in the
+   environment or the home directory.
+
+Prints "first-plot: <cold seconds>\t<warm seconds>", which docker_operations.py reports. Standard library only.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Imported by the warm-up and the cold import check
+CORE_MODULES = [
+    "numpy", "scipy", "pandas", "matplotlib.pyplot", "astropy.units", "astropy.time",
+    "hapiclient", "plasmapy", "pysat", "pyspedas", "spacepy", "sunpy.map",
+]
+
+FIRST_PLOT = (
+    "import io, matplotlib; matplotlib.use('Agg'); import matplotlib.pyplot as plt; "
+    "fig, ax = plt.subplots(); ax.plot(range(10)); fig.savefig(io.BytesIO(), format='png')"
+)
+
+# First-run setup that importing doesn't do by itself; failures are reported, not fatal
+WARM_UP = """
+import importlib, traceback
+for module in {modules!r}:
+    try:
+        importlib.import_module(module)
+    except Exception:
+        print(f"warm-up: could not import {{module}}:")
+        traceback.print_exc()
+try:
+    from astropy.config import get_cache_dir, get_config_dir
+    get_config_dir(), get_cache_dir()
+except Exception as e:
+    print(f"warm-up: astropy directories: {{e}}")
+try:
+    from sunpy.util.config import get_and_create_download_dir
+    get_and_create_download_dir()
+except Exception as e:
+    print(f"warm-up: sunpy directories: {{e}}")
+{first_plot}
+"""
+
+COLD_IMPORT = """
+import importlib
+for module in {modules!r}:
+    try:
+        importlib.import_module(module)
+    except Exception as e:
+        print(f"cold import: could not import {{module}}: {{e}}")
+"""
+
+
+def run_python(code, env=None, cwd=None):
+    """
+    :param code: Python source to run with this interpreter
+    :param env: Environment variables (default: inherited)
+    :param cwd: Working directory
+    :return: Wall-clock seconds
+    """
+    start = time.monotonic()
+    subprocess.run([sys.executable, "-c", code], env=env, cwd=cwd, check=True)
+    return time.monotonic() - start
+
+
+def time_first_plot(cold, repeat=1):
+    """
+    :param cold: Run without bytecode and with an empty home directory, like a container before this warm-up
+    :param repeat: Number of runs; the fastest is returned
+    :return: Seconds to the first saved plot
+    """
+    times = []
+    for _ in range(repeat):
+        if not cold:
+            times.append(run_python(FIRST_PLOT))
+            continue
+        with tempfile.TemporaryDirectory() as home, tempfile.TemporaryDirectory() as pycache:
+            env = {**os.environ, "HOME": home, "PYTHONPYCACHEPREFIX": pycache}
+            for name in ("MPLCONFIGDIR", "XDG_CACHE_HOME", "XDG_CONFIG_HOME"):
+                env.pop(name, None)
+            times.append(run_python(FIRST_PLOT, env, cwd=home))
+    return min(times)
+
+
+def snapshot(roots):
+    """
+    :param roots: Directories to record
+    :return: Dict mapping every file and directory path under roots → (st_mtime_ns, st_size) for files, None for
+        directories
+    """
+    state = {}
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(root):
+            for dirname in dirnames:
+                state[os.path.join(dirpath, dirname)] = None
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.lstat(path)
+                except OSError:
+                    continue
+                state[path] = (stat.st_mtime_ns, stat.st_size)
+    return state
+
+
+def changed_paths(before, after):
+    """
+    :return: Sorted paths that are new in after, or files whose modification time or size changed
+    """
+    return sorted(path for path, state in after.items() if path not in before or before[path] != state)
+
+
+def check_cold_import(modules, roots, cwd=None):
+    """
+    :param modules: Modules to import in a fresh interpreter
+    :param roots: Directories that must not change
+    :param cwd: Working directory of the interpreter
+    :return: Paths the import created or changed
+    """
+    before = snapshot(roots)
+    run_python(COLD_IMPORT.format(modules=modules), cwd=cwd)
+    return changed_paths(before, snapshot(roots))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", default=",".join(CORE_MODULES), help="Comma-separated modules to import")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per first-plot timing (fastest counts)")
+    args = parser.parse_args(argv)
+    modules = [module for module in args.modules.split(",") if module]
+    home = os.path.expanduser("~")
+
+    cold = time_first_plot(cold=True, repeat=args.repeat)
+    run_python(WARM_UP.format(modules=modules, first_plot=FIRST_PLOT), cwd=home)
+    warm = time_first_plot(cold=False, repeat=args.repeat)
+    print(f"Time to first plot: {cold:.1f}s without bytecode and caches, {warm:.1f}s in this image "
+          f"({cold - warm:.1f}s saved)")
+    print(f"first-plot: {cold:.2f}\t{warm:.2f}")
+
+    written = check_cold_import(modules, [sys.prefix, home], cwd=home)
+    if written:
+        print(f"ERROR: a cold import of {', '.join(modules)} wrote {len(written)} files:")
+        for path in written[:50]:
+            print(f"  {path}")
+        return 1
+    print(f"Cold import of {len(modules)} core modules wrote nothing")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,9 +7,14 @@ docker/pyhc-environment/contents/
 Primary modes:
 - --auto-pin: pin PyHC packages in packages.txt to latest constraint-compatible versions
   and detect direct package set additions/removals against resolved-versions.txt
-- --compile: run uv pip compile to produce /tmp/new-resolved-versions.txt
+- --compile: run uv pip compile to produce /tmp/new-resolved-versions.txt, then split it into
+  the tiered install files the Dockerfile installs layer by layer (install-tiers/), exactly and
+  without resolving again (PYHC_LOCK_HASHES=true also pins every distribution's sha256); releases
+  without a usable PyPI wheel go to install-tiers/wheelhouse.txt and are built once (wheelhouse/)
 - --post-build: persist /tmp/new-resolved-versions.txt to resolved-versions.txt
 - --generate-spreadsheet: optional dependency analysis artifact for diagnostics
+  (add --fast to build it from the lockfile and cached PyPI metadata without installs,
+  or --history-years N for a matrix of every PyHC release from the last N years)
 
 Behavior notes:
 - packages.txt contains pinned direct PyHC package entries (extras preserved)
@@ -24,7 +29,7 @@ import os
 import shutil
 import subprocess
 import sys
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 
 from utils.pipeline_utils import (
@@ -40,6 +45,9 @@ PYHC_ENV_CONTENTS_DIR = REPO_ROOT / "docker" / "pyhc-environment" / "contents"
 PACKAGES_FILE = str(PYHC_ENV_CONTENTS_DIR / "packages.txt")
 CONSTRAINTS_FILE = str(PYHC_ENV_CONTENTS_DIR / "constraints.txt")
 LOCKFILE_PATH = str(PYHC_ENV_CONTENTS_DIR / "resolved-versions.txt")
+ENVIRONMENT_FILE = str(PYHC_ENV_CONTENTS_DIR / "environment.yml")
+INSTALL_TIERS_DIR = str(PYHC_ENV_CONTENTS_DIR / "install-tiers")
+WHEELHOUSE_DIR = str(PYHC_ENV_CONTENTS_DIR / "wheelhouse")
 TMP_RESOLVED_PATH = "/tmp/new-resolved-versions.txt"
 
 
@@ -70,7 +78,7 @@ def format_changed_packages(
 
 
 def run_uv_compile(packages_file: str, output_file: str, python_version: str = None,
-                   constraints_file: str = None) -> tuple[bool, str]:
+                   constraints_file: str = None, generate_hashes: bool = False) -> tuple[bool, str]:
     """
     Run uv pip compile to resolve dependencies.
 
@@ -79,6 +87,7 @@ def run_uv_compile(packages_file: str, output_file: str, python_version: str = N
         output_file: Path to write resolved dependencies
         python_version: Python version to target (default: from environment.yml)
         constraints_file: Optional path to constraints.txt for blocking versions
+        generate_hashes: Record the sha256 of every pinned distribution, so the Docker build verifies what it installs
 
     Returns:
         Tuple of (success, error_message)
@@ -97,6 +106,9 @@ def run_uv_compile(packages_file: str, output_file: str, python_version: str = N
     if constraints_file and os.path.exists(constraints_file):
         cmd.extend(["-c", constraints_file])
 
+    if generate_hashes:
+        cmd.append("--generate-hashes")
+
     try:
         result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
         if result.returncode != 0:
@@ -114,27 +126,36 @@ def update_lockfile(tmp_resolved_path: str, lockfile_path: str) -> None:
     print(f"Updated lockfile at {lockfile_path}")
 
 
-def generate_spreadsheet(packages_file=None):
+def generate_spreadsheet(packages_file=None, fast=False, spreadsheet_folder=None):
     """
     Generate dependency spreadsheet using legacy pipdeptree parsing code.
     This is available for debugging/analysis but not part of the normal workflow.
 
     Args:
         packages_file: Path to packages.txt (default: docker/pyhc-environment/contents/packages.txt)
+        fast: Build the table from the lockfile and cached PyPI metadata instead of installing each package
+        spreadsheet_folder: Output folder (default: spreadsheets/, or /tmp/pyhc-dependency-table in fast mode)
     """
     try:
         from utils.generate_dependency_table import (
             generate_dependency_table_data,
+            generate_dependency_table_data_from_lockfile,
             excel_spreadsheet_from_table_data,
+            write_table_data_jsonl,
             find_spec0_problems,
+            forecast_spec0_problems,
             find_dependency_conflicts,
         )
+        from utils.conflict_analysis import analyze_dependency_conflicts, format_conflict_analysis
+        from utils.pipeline_utils import load_spec0_release_dates, build_spec0_drop_schedule
 
         if packages_file is None:
             packages_file = PACKAGES_FILE
 
-        filename = f"PyHC-Dependency-Table-{datetime.now().strftime('%Y-%m-%d-%H-%M')}.xlsx"
-        spreadsheet_folder = "spreadsheets"
+        table_kind = "Dependency-Table-Fast" if fast else "Dependency-Table"
+        filename = f"PyHC-{table_kind}-{datetime.now().strftime('%Y-%m-%d-%H-%M')}.xlsx"
+        if spreadsheet_folder is None:
+            spreadsheet_folder = "/tmp/pyhc-dependency-table" if fast else "spreadsheets"
         if not os.path.exists(spreadsheet_folder):
             os.makedirs(spreadsheet_folder)
         spreadsheet_path = os.path.join(spreadsheet_folder, filename)
@@ -153,7 +174,15 @@ def generate_spreadsheet(packages_file=None):
             ) from exc
 
         print(f"Using spreadsheet worker count: {max_workers}")
-        table_data = generate_dependency_table_data(all_packages, max_workers=max_workers)
+        if fast:
+            # Prefer the fresh compile output; fall back to the last successful build's lockfile
+            lockfile = TMP_RESOLVED_PATH if os.path.exists(TMP_RESOLVED_PATH) else LOCKFILE_PATH
+            print(f"Fast mode: reading resolved versions from {lockfile}")
+            table_data = generate_dependency_table_data_from_lockfile(
+                all_packages, lockfile, python_version=get_python_version(), max_workers=max(8, max_workers)
+            )
+        else:
+            table_data = generate_dependency_table_data(all_packages, max_workers=max_workers)
 
         # Check for dependency conflicts in spreadsheet
         dependency_conflicts = find_dependency_conflicts(table_data)
@@ -164,10 +193,23 @@ def generate_spreadsheet(packages_file=None):
                 *dependency_conflicts,
                 "```",
             ]
+            # Reduce each conflict to its smallest conflicting sets of projects, with the newest co-installable releases
+            conflict_explanations = format_conflict_analysis(
+                analyze_dependency_conflicts(table_data, python_version=get_python_version())
+            )
+            if conflict_explanations:
+                conflict_comment_lines += [
+                    "**Minimal conflicting sets:**",
+                    "```",
+                    *conflict_explanations,
+                    "```",
+                ]
             conflict_comment = "\n".join(conflict_comment_lines)
             print(f"Found {len(dependency_conflicts)} dependency conflict(s) in spreadsheet:")
             for conflict in dependency_conflicts:
                 print(f"  {conflict}")
+            for explanation in conflict_explanations:
+                print(f"  {explanation}")
         else:
             conflict_comment = ""
             print("No dependency conflicts found in spreadsheet.")
@@ -195,10 +237,48 @@ def generate_spreadsheet(packages_file=None):
         set_github_output("spec0_comment", spec0_comment)
         set_github_output("spec0_problem_count", str(len(spec0_problems)))
 
+        # Forecast SPEC 0 problems that will appear by the forecast horizon (from the cached release dates)
+        forecast_days_str = os.environ.get("PYHC_SPEC0_FORECAST_DAYS", "90")
+        try:
+            forecast_days = max(1, int(forecast_days_str))
+        except ValueError as exc:
+            raise ValueError(
+                f"Invalid PYHC_SPEC0_FORECAST_DAYS value '{forecast_days_str}'. "
+                "Expected a positive integer."
+            ) from exc
+        horizon = datetime.now() + timedelta(days=forecast_days)
+        drop_schedule = build_spec0_drop_schedule(load_spec0_release_dates())
+        current_requirements = {problem.split(" but SPEC 0 requires ")[0] for problem in spec0_problems}
+        upcoming_problems = [
+            problem for problem in forecast_spec0_problems(table_data, drop_schedule, [horizon])[horizon]
+            if problem.split(" but SPEC 0 requires ")[0] not in current_requirements
+        ]
+        if upcoming_problems:
+            spec0_forecast_comment = "\n".join([
+                f"**Upcoming SPEC 0 problems by {horizon.strftime('%Y-%m-%d')}:**",
+                "```",
+                *upcoming_problems,
+                "```",
+            ])
+            print(f"Forecast {len(upcoming_problems)} new SPEC 0 problem(s) by {horizon.strftime('%Y-%m-%d')}:")
+            for problem in upcoming_problems:
+                print(f"  {problem}")
+        else:
+            spec0_forecast_comment = ""
+            print(f"No new SPEC 0 problems forecast by {horizon.strftime('%Y-%m-%d')}.")
+
+        set_github_output("spec0_forecast_comment", spec0_forecast_comment)
+
         table = excel_spreadsheet_from_table_data(table_data)
         table.save(spreadsheet_path)
 
+        # Machine-readable copy of the table for utils/query_dependency_table.py
+        table_data_path = os.path.splitext(spreadsheet_path)[0] + ".jsonl"
+        record_count = write_table_data_jsonl(table_data, table_data_path)
+        set_github_output("table_data_path", table_data_path)
+
         print(f"Generated spreadsheet: {spreadsheet_path}")
+        print(f"Exported {record_count} dependency table records: {table_data_path}")
         return spreadsheet_path
     except ImportError as e:
         print(f"Error importing legacy code for spreadsheet generation: {e}")
@@ -206,6 +286,47 @@ def generate_spreadsheet(packages_file=None):
         return None
 
 
+def generate_history_matrix(years, packages_file=None, output_folder="/tmp/pyhc-dependency-table"):
+    """
+    Generate the historical compatibility matrix: every release of each PyHC package from the last
+    `years` years checked against the resolved environment, built from cached PyPI metadata.
+
+    Args:
+        years: How many years of releases to include
+        packages_file: Path to packages.txt (default: docker/pyhc-environment/contents/packages.txt)
+        output_folder: Folder for the generated spreadsheet
+    """
+    from utils.historical_dependency_matrix import (
+        collect_release_requirements,
+        build_historical_matrix,
+        write_historical_spreadsheet,
+        find_incompatible_releases,
+    )
+    from utils.package_metadata import parse_resolved_versions
+
+    if packages_file is None:
+        packages_file = PACKAGES_FILE
+    lockfile = TMP_RESOLVED_PATH if os.path.exists(TMP_RESOLVED_PATH) else LOCKFILE_PATH
+
+    all_packages = parse_packages_txt(packages_file, preserve_specifiers=True)
+    print(f"Collecting {years} year(s) of releases for {len(all_packages)} package entries from {packages_file}")
+    release_requirements = collect_release_requirements(all_packages, years, python_version=get_python_version())
+    matrix = build_historical_matrix(release_requirements, parse_resolved_versions(lockfile))
+    print(
+        f"Evaluated {len(matrix['projects'])} releases ({len(matrix['requirement_sets'])} distinct requirement sets) "
+        f"against {lockfile}"
+    )
+
+    os.makedirs(output_folder, exist_ok=True)
+    path = os.path.join(output_folder, f"PyHC-Dependency-History-{datetime.now().strftime('%Y-%m-%d-%H-%M')}.xlsx")
+    write_historical_spreadsheet(matrix, path)
+
+    incompatible = find_incompatible_releases(matrix)
+    print(f"{len(incompatible)} release(s) reject at least one resolved version.")
+    print(f"Generated history matrix: {path}")
+    return path
+
+
 def main():
     parser = argparse.ArgumentParser(description="PyHC Docker Environment Pipeline")
     parser.add_argument(
@@ -213,6 +334,18 @@ def main():
         action="store_true",
         help="Generate dependency spreadsheet using legacy pipdeptree parsing code (for analysis/debugging)"
     )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="With --generate-spreadsheet: build the table from the lockfile and cached PyPI metadata (no installs)"
+    )
+    parser.add_argument(
+        "--history-years",
+        type=float,
+        metavar="N",
+        help="With --generate-spreadsheet: build a matrix of every PyHC release from the last N years "
+             "against the resolved environment (cached PyPI metadata, no installs)"
+    )
     parser.add_argument(
         "--auto-pin",
         action="store_true",
@@ -229,6 +362,11 @@ def main():
         help="Update persisted lockfile from /tmp/new-resolved-versions.txt after successful build"
     )
     args = parser.parse_args()
+    if args.history_years is not None:
+        if not args.generate_spreadsheet:
+            parser.error("--history-years requires --generate-spreadsheet")
+        if args.history_years <= 0:
+            parser.error("--history-years must be greater than 0")
 
     # Canonical file paths
     packages_file = PACKAGES_FILE
@@ -242,8 +380,12 @@ def main():
         return
 
     # Handle spreadsheet generation mode
+    if args.generate_spreadsheet and args.history_years is not None:
+        history_matrix = generate_history_matrix(args.history_years)
+        set_github_output("history_matrix_path", history_matrix)
+        return
     if args.generate_spreadsheet:
-        spreadsheet = generate_spreadsheet()
+        spreadsheet = generate_spreadsheet(fast=args.fast)
         if spreadsheet:
             print(f"Spreadsheet saved to: {spreadsheet}")
             set_github_output("spreadsheet_path", spreadsheet)
@@ -303,8 +445,10 @@ def main():
     # Handle compile mode (just run uv compile with constraints)
     if args.compile:
         print("Running uv pip compile with constraints...")
+        generate_hashes = os.environ.get("PYHC_LOCK_HASHES", "false").lower() == "true"
         success, error = run_uv_compile(packages_file, tmp_resolved_path,
-                                        constraints_file=constraints_file)
+                                        constraints_file=constraints_file,
+                                        generate_hashes=generate_hashes)
         if not success:
             print(f"ERROR: Dependency resolution failed:\n{error}")
             set_github_output("compile_success", "false")
@@ -316,6 +460,18 @@ def main():
             print(f.read())
         print("-" * 50)
         set_github_output("compile_success", "true")
+
+        # Releases without a usable wheel on PyPI are built once into the wheelhouse and installed from it
+        from utils.install_tiers import parse_lockfile_graph, write_install_tiers
+        from utils.wheelhouse import PLAN_NAME, plan_wheelhouse, write_wheelhouse_plan
+        wheelhouse_plan = plan_wheelhouse(parse_lockfile_graph(tmp_resolved_path)[0], WHEELHOUSE_DIR, ENVIRONMENT_FILE)
+
+        # Split the resolved set into base/mid/top install layers for the Dockerfile
+        tier_sizes = write_install_tiers(tmp_resolved_path, INSTALL_TIERS_DIR, local_builds=set(wheelhouse_plan))
+        write_wheelhouse_plan(wheelhouse_plan, os.path.join(INSTALL_TIERS_DIR, PLAN_NAME))
+        print("Install tiers: " + ", ".join(f"{tier} {count}" for tier, count in tier_sizes.items()))
+        cached = sum(entry["cached"] for entry in wheelhouse_plan.values())
+        print(f"Wheelhouse: {len(wheelhouse_plan)} local builds, {cached} already built, {len(wheelhouse_plan) - cached} to build")
         return
 
     parser.error("No mode specified. Use one of: --auto-pin, --compile, --generate-spreadsheet, --post-build")
@@ -0,0 +1,87 @@
+"""
+Deterministic synthetic corpora for benchmarking the dependency table code.
+
+Every project range for a dependency is generated around that dependency's "center" version, so ranges
+always intersect and the corpus exercises the full range algebra (including `~=`, wildcards and `!=`
+lists) without tripping conflict errors.
+"""
+
+import random
+
+
+def _version(major, minor, micro=0):
+    return f"{major}.{minor}.{micro}"
+
+
+def _random_range(rng, center):
+    """A specifier containing the center version (major, minor)."""
+    major, minor = center
+    kind = rng.random()
+    if kind < 0.15:
+        return "any"
+    if kind < 0.40:
+        return f">={major}.{rng.randint(0, minor)}"
+    if kind < 0.60:
+        return f">={major}.{rng.randint(0, minor)},<{major + rng.randint(1, 2)}"
+    if kind < 0.72:
+        return f"~={major}.{rng.randint(0, minor)}"
+    if kind < 0.80:
+        return f"~={_version(major, minor, 0)}"
+    if kind < 0.88:
+        return f"=={major}.*"
+    # Lower bound plus a list of exclusions that never hit the center
+    exclusions = ",".join(f"!={major}.{minor + k}" for k in range(1, rng.randint(2, 4)))
+    return f">={major}.{rng.randint(0, minor)},{exclusions}"
+
+
+def _uv_tree_range(version_range):
+    """Render a range the way `uv pip tree --show-version-specifiers` prints it."""
+    return "*" if version_range == "any" else ", ".join(version_range.split(","))
+
+
+def generate_corpus(n_projects=300, n_dependencies=2000, min_deps=20, max_deps=120, seed=0):
+    """
+    :param n_projects: Number of synthetic PyHC projects
+    :param n_dependencies: Size of the dependency pool
+    :param min_deps: Minimum dependencies per project
+    :param max_deps: Maximum dependencies per project
+    :param seed: Random seed (the same arguments always produce the same corpus)
+    :return: Dict like {
+                 'deps_by_project': {'proj0000==1.0.0': {'dep0003': '>=1.2', ...}, ...},
+                 'uv_trees': {'proj0000==1.0.0': 'proj0000 v1.0.0\\n├── dep0003 v1.4.0 [required: >=1.2]\\n...', ...},
+                 'range_pairs': [('>=1.2', '~=1.0'), ...],
+             }
+    """
+    rng = random.Random(seed)
+    dependencies = [f"dep{d:04d}" for d in range(n_dependencies)]
+    centers = {dep: (rng.randint(0, 5), rng.randint(2, 30)) for dep in dependencies}
+    # Popularity skew: low-numbered dependencies (numpy, astropy, ...) are shared by most projects
+    weights = [1.0 / (d + 1) ** 0.8 for d in range(n_dependencies)]
+
+    deps_by_project = {}
+    uv_trees = {}
+    range_pairs = []
+    for p in range(n_projects):
+        project_name = f"proj{p:04d}"
+        project = f"{project_name}==1.0.0"
+        count = rng.randint(min_deps, min(max_deps, n_dependencies))
+        chosen = set()
+        while len(chosen) < count:
+            chosen.add(rng.choices(dependencies, weights=weights)[0])
+
+        project_deps = {}
+        tree_lines = [f"{project_name} v1.0.0"]
+        for dep in sorted(chosen):
+            version_range = _random_range(rng, centers[dep])
+            project_deps[dep] = version_range
+            major, minor = centers[dep]
+            tree_lines.append(f"├── {dep} v{_version(major, minor)} [required: {_uv_tree_range(version_range)}]")
+            range_pairs.append((version_range, _random_range(rng, centers[dep])))
+        deps_by_project[project] = project_deps
+        uv_trees[project] = "\n".join(tree_lines)
+
+    return {
+        'deps_by_project': deps_by_project,
+        'uv_trees': uv_trees,
+        'range_pairs': range_pairs,
+    }
@@ -0,0 +1,184 @@
+#! /usr/bin/env python
+"""
+Benchmarks for range algebra, uv tree parsing and dependency table generation on a synthetic corpus.
+
+Usage:
+    python utils/benchmark/run_benchmarks.py run --output bench-main.json
+    python utils/benchmark/run_benchmarks.py run --projects 500 --dependencies 4000 --output bench-big.json
+    python utils/benchmark/run_benchmarks.py compare bench-main.json bench-branch.json --threshold 0.2
+
+`compare` exits with status 1 when any benchmark's median time regressed by more than the threshold.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from unittest.mock import patch
+
+# Add the utils directory to the path so we can import module functions.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark.corpus import generate_corpus
+from generate_dependency_table import (
+    parse_uv_tree_output,
+    combine_ranges,
+    reduce_environment_requirements,
+    generate_dependency_table_data,
+    excel_spreadsheet_from_table_data,
+    normalize_declared_range,
+)
+
+# Fixed SPEC 0 requirements so table generation doesn't query PyPI
+SPEC0_PACKAGES = ["dep0000>=1.0", "dep0001>=1.0", "dep0002>=2.0"]
+
+
+def _time(function, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return timings, result
+
+
+def run_benchmarks(n_projects=300, n_dependencies=2000, repeat=3, seed=0):
+    """
+    Time each stage of dependency table generation on a synthetic corpus.
+    :return: Results dict like {'metadata': {...}, 'results': {'combine_ranges': {'min': 0.1, 'median': 0.11, ...}, ...}}
+    """
+    corpus = generate_corpus(n_projects=n_projects, n_dependencies=n_dependencies, seed=seed)
+    uv_trees = corpus['uv_trees']
+    # combine_ranges() only ever sees ranges already normalized by parse_uv_tree_output()
+    range_pairs = [
+        tuple(version_range if version_range == "any" else normalize_declared_range(version_range) for version_range in pair)
+        for pair in corpus['range_pairs']
+    ]
+
+    def _parse_trees():
+        return {project: parse_uv_tree_output(project, tree)[1] for project, tree in uv_trees.items()}
+
+    def _combine_ranges():
+        conflicts = 0
+        for current_range, new_range in range_pairs:
+            try:
+                combine_ranges(current_range, new_range)
+            except RuntimeError:
+                conflicts += 1
+        return conflicts
+
+    deps_by_project = _parse_trees()
+
+    def _generate_table_data():
+        with patch("generate_dependency_table.get_dependency_ranges_by_package",
+                   side_effect=lambda packages, **kwargs: deps_by_project if packages else {}), \
+                patch("generate_dependency_table.get_spec0_packages", return_value=SPEC0_PACKAGES):
+            return generate_dependency_table_data(list(deps_by_project))
+
+    table_data = _generate_table_data()
+
+    def _write_spreadsheet():
+        buffer = io.BytesIO()
+        excel_spreadsheet_from_table_data(table_data).save(buffer)
+        return buffer.tell()
+
+    benchmarks = {
+        'parse_uv_tree_output': (_parse_trees, len(uv_trees)),
+        'combine_ranges': (_combine_ranges, len(range_pairs)),
+        'reduce_environment_requirements': (lambda: reduce_environment_requirements(deps_by_project), len(deps_by_project)),
+        'generate_dependency_table_data': (_generate_table_data, len(deps_by_project)),
+        'excel_spreadsheet_from_table_data': (_write_spreadsheet, sum(map(len, deps_by_project.values()))),
+    }
+
+    results = {}
+    for name, (function, items) in benchmarks.items():
+        timings, _ = _time(function, repeat)
+        results[name] = {
+            'min': min(timings),
+            'median': statistics.median(timings),
+            'repeat': repeat,
+            'items': items,
+        }
+        print(f"{name:36s} median {results[name]['median']:.4f}s  min {results[name]['min']:.4f}s  ({items} items)")
+
+    return {
+        'metadata': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'projects': n_projects,
+            'dependencies': n_dependencies,
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+
+def compare_results(baseline, current, threshold=0.2):
+    """
+    Compare median timings of two result sets.
+    :param baseline: Results dict from `run_benchmarks()` (or a saved JSON baseline)
+    :param current: Results dict to check
+    :param threshold: Allowed slowdown as a fraction (0.2 = 20% slower)
+    :return: List of (name, baseline median, current median, ratio, regressed) tuples
+    """
+    rows = []
+    for name, current_result in current['results'].items():
+        baseline_result = baseline['results'].get(name)
+        if not baseline_result:
+            continue
+        ratio = current_result['median'] / baseline_result['median'] if baseline_result['median'] else float('inf')
+        rows.append((name, baseline_result['median'], current_result['median'], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dependency table benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmarks and save the results as JSON")
+    run_parser.add_argument("--projects", type=int, default=300)
+    run_parser.add_argument("--dependencies", type=int, default=2000)
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--output", help="Where to save the results (e.g. a baseline file)")
+
+    compare_parser = subparsers.add_parser("compare", help="Flag regressions against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.2,
+                                help="Allowed slowdown as a fraction of the baseline median (default: 0.2)")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run_benchmarks(args.projects, args.dependencies, args.repeat, args.seed)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+            print(f"Saved benchmark results to {args.output}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    regressions = 0
+    for name, baseline_median, current_median, ratio, regressed in compare_results(baseline, current, args.threshold):
+        flag = "REGRESSION" if regressed else "ok"
+        print(f"{name:36s} {baseline_median:.4f}s -> {current_median:.4f}s  x{ratio:.2f}  {flag}")
+        regressions += regressed
+    if regressions:
+        print(f"{regressions} benchmark(s) regressed by more than {args.threshold:.0%}.")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+Content hash of a Docker image's effective build context, to skip rebuilding images whose inputs haven't changed.
+
+The hash covers every file Docker would send as the build context (honouring the image's .dockerignore), except
+the wheel binaries in contents/wheelhouse, the digests of the external base images in the Dockerfile's FROM lines,
+and the build arguments. docker_operations.py
+stores it as a label on each image it builds; when `latest` in the registry already carries the hash of the current
+context, the build is skipped and that image is tagged with the new version instead.
+"""
+
+import hashlib
+import os
+import re
+import stat
+
+DOCKERIGNORE_NAME = ".dockerignore"
+
+# Context directories left out of the hash. The wheelhouse is restored from the CI cache and grows after every build
+# (wheelhouse.merge_built_wheels()), so its contents depend on cache state, not on the repository; which wheels the
+# build uses is fixed by install-tiers/wheelhouse.txt, whose keys are content addresses and which is hashed.
+HASH_EXCLUDED_DIRS = ("contents/wheelhouse/",)
+
+FROM_RE = re.compile(r"^\s*FROM\s+(?:--platform=\S+\s+)?(\S+)(?:\s+AS\s+(\S+))?\s*$", re.IGNORECASE)
+
+
+def _pattern_to_regex(pattern: str):
+    """Translate a .dockerignore pattern ("**", "*", "?") into a regex over slash-separated relative paths."""
+    regex = ""
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+        elif pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+        elif pattern[i] == "*":
+            regex += "[^/]*"
+            i += 1
+        elif pattern[i] == "?":
+            regex += "[^/]"
+            i += 1
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    return re.compile(f"^{regex}$")
+
+
+def load_dockerignore(context_dir: str) -> list:
+    """Read a build context's .dockerignore.
+
+    Returns:
+        List of (exclude, regex) in file order; exclude is False for "!" (re-include) patterns
+    """
+    patterns = []
+    path = os.path.join(context_dir, DOCKERIGNORE_NAME)
+    if not os.path.exists(path):
+        return patterns
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            exclude = not line.startswith("!")
+            pattern = os.path.normpath(line.lstrip("!").strip()).replace(os.sep, "/").lstrip("/")
+            patterns.append((exclude, _pattern_to_regex(pattern)))
+    return patterns
+
+
+def is_ignored(relpath: str, patterns: list) -> bool:
+    """Whether Docker leaves a file out of the build context: the last pattern matching the path, or one of its
+    parent directories, decides."""
+    parts = relpath.split("/")
+    ignored = False
+    for exclude, regex in patterns:
+        if any(regex.match("/".join(parts[:depth])) for depth in range(1, len(parts) + 1)):
+            ignored = exclude
+    return ignored
+
+
+def iter_context_files(context_dir: str):
+    """Yield the slash-separated relative paths of the files in the build context, sorted."""
+    patterns = load_dockerignore(context_dir)
+    files = []
+    for dirpath, dirnames, filenames in os.walk(context_dir):
+        dirnames.sort()
+        for filename in filenames:
+            relpath = os.path.relpath(os.path.join(dirpath, filename), context_dir).replace(os.sep, "/")
+            # Docker always sends the Dockerfile and .dockerignore
+            if relpath in ("Dockerfile", DOCKERIGNORE_NAME) or not is_ignored(relpath, patterns):
+                files.append(relpath)
+    yield from sorted(files)
+
+
+def parse_base_images(dockerfile_path: str) -> list:
+    """List the external images a Dockerfile builds FROM, skipping its own stages and `scratch`."""
+    images = []
+    stages = {"scratch"}
+    with open(dockerfile_path, "r") as f:
+        for line in f:
+            match = FROM_RE.match(line)
+            if not match:
+                continue
+            image, stage = match.group(1), match.group(2)
+            if image.lower() not in stages and image not in images:
+                images.append(image)
+            if stage:
+                stages.add(stage.lower())
+    return images
+
+
+def compute_context_hash(context_dir: str, base_digests: dict, build_args: dict = None) -> str:
+    """Hash everything that determines what a build of the context produces.
+
+    Args:
+        context_dir: Image folder with the Dockerfile
+        base_digests: Dict mapping each of parse_base_images() to its current digest in the registry
+        build_args: --build-arg values passed to the build, if any
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    for relpath in iter_context_files(context_dir):
+        if relpath.startswith(HASH_EXCLUDED_DIRS):
+            continue
+        path = os.path.join(context_dir, relpath)
+        info = os.lstat(path)
+        mode = info.st_mode
+        digest.update(f"file {relpath} {'x' if mode & stat.S_IXUSR else '-'} {info.st_size}\n".encode("utf-8"))
+        if stat.S_ISLNK(mode):
+            digest.update(os.readlink(path).encode("utf-8"))
+            continue
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    for image, image_digest in sorted(base_digests.items()):
+        digest.update(f"base {image} {image_digest}\n".encode("utf-8"))
+    for name, value in sorted((build_args or {}).items()):
+        digest.update(f"arg {name}={value}\n".encode("utf-8"))
+    return digest.hexdigest()
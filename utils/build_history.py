@@ -0,0 +1,178 @@
+"""
+History of Docker build performance, and detection of steps that got slower or larger.
+
+After each image build, docker_operations.py reduces the build report (see write_build_report()) to a few tracked
+metrics: the duration and layer size of the conda environment, uv install, ownership and pre-import steps, plus the
+total build time and image size. Records are appended to build-history/<image>.jsonl in the pipeline cache, which
+the workflow cache persists between runs. A metric regresses when it is more than PYHC_BUILD_REGRESSION_THRESHOLD
+(default 25%) above its median over the last PYHC_BUILD_HISTORY_WINDOW (default 10) builds; regressions are added
+to the issue #2 comment.
+"""
+
+import json
+import os
+import re
+from statistics import median
+
+try:
+    from .pipeline_utils import get_pipeline_cache_dir
+except ImportError:
+    from pipeline_utils import get_pipeline_cache_dir
+
+# Tracked build steps: metric name → pattern matched against the BuildKit step name. Steps matching the same
+# pattern (e.g. the uv install tiers) are added together.
+TRACKED_STEPS = {
+    "conda env": re.compile(r"\bconda env create\b"),
+    "uv install": re.compile(r"\buv pip install\b"),
+    "ownership": re.compile(r"\] RUN .*\bchown\b"),  # Not COPY --chown
+    "pre-import": re.compile(r"""python -c ['"]import """),
+}
+
+DEFAULT_REGRESSION_THRESHOLD = 0.25
+DEFAULT_HISTORY_WINDOW = 10
+
+# Fewer earlier builds than this and there is no baseline yet
+MIN_HISTORY_SAMPLES = 3
+
+# Changes smaller than these are noise, whatever the percentage
+MIN_SECONDS_CHANGE = 30.0
+MIN_BYTES_CHANGE = 50 * 1024 ** 2
+
+# Records kept per image
+MAX_HISTORY_RECORDS = 200
+
+
+def summarize_build(report: dict) -> dict:
+    """Reduce a build report to the tracked metrics.
+
+    Args:
+        report: Build report from docker_operations.build_and_push_docker_images(), with "image", "built_at",
+            "build_seconds", "size" and "steps" (each with "step", "cached", "seconds" and "layer_size")
+
+    Returns:
+        Dict {"image", "built_at", "metrics": {name: {"seconds": ..., "bytes": ...}}}. "seconds" is None when the
+        step didn't run (all matching steps came from the layer cache), "bytes" when no layer was matched.
+    """
+    metrics = {
+        "build": {"seconds": report.get("build_seconds"), "bytes": None},
+        "image": {"seconds": None, "bytes": report.get("size")},
+    }
+    for name, pattern in TRACKED_STEPS.items():
+        steps = [step for step in report.get("steps", []) if pattern.search(step["step"])]
+        run = [step["seconds"] for step in steps if not step["cached"] and step["seconds"] is not None]
+        sizes = [step["layer_size"] for step in steps if step.get("layer_size") is not None]
+        metrics[name] = {
+            "seconds": round(sum(run), 1) if run else None,
+            "bytes": sum(sizes) if sizes else None,
+        }
+    return {"image": report.get("image"), "built_at": report.get("built_at"), "metrics": metrics}
+
+
+def get_history_path(image_name: str, cache_dir: str = None) -> str:
+    return os.path.join(cache_dir or get_pipeline_cache_dir(), "build-history", f"{image_name}.jsonl")
+
+
+def load_history(path: str) -> list:
+    """Read a build history file, oldest record first. Unreadable lines are skipped."""
+    records = []
+    if not os.path.exists(path):
+        return records
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+def append_history(path: str, record: dict, max_records: int = MAX_HISTORY_RECORDS) -> None:
+    """Append a summarize_build() record to a build history file, keeping the newest max_records."""
+    records = load_history(path)[-(max_records - 1):] + [record]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        for entry in records:
+            f.write(json.dumps(entry) + "\n")
+    os.replace(tmp_path, path)
+
+
+def detect_regressions(history: list, record: dict, threshold: float = DEFAULT_REGRESSION_THRESHOLD,
+                       window: int = DEFAULT_HISTORY_WINDOW) -> list:
+    """Find the metrics of a build that are more than threshold above their rolling median.
+
+    Args:
+        history: Earlier records from load_history(), oldest first (not including record)
+        record: This build's summarize_build() record
+        threshold: Allowed increase over the median, as a fraction
+        window: Number of most recent earlier builds the median is taken over
+
+    Returns:
+        List of dicts {"metric", "kind" ("seconds" or "bytes"), "value", "median", "change"}
+    """
+    regressions = []
+    for name, values in record["metrics"].items():
+        for kind, minimum in (("seconds", MIN_SECONDS_CHANGE), ("bytes", MIN_BYTES_CHANGE)):
+            value = values.get(kind)
+            if value is None:
+                continue
+            earlier = [entry["metrics"].get(name, {}).get(kind) for entry in history]
+            earlier = [sample for sample in earlier if sample is not None][-window:]
+            if len(earlier) < MIN_HISTORY_SAMPLES:
+                continue
+            baseline = median(earlier)
+            if baseline > 0 and value - baseline > minimum and (value - baseline) / baseline > threshold:
+                regressions.append({"metric": name, "kind": kind, "value": value, "median": baseline,
+                                    "change": (value - baseline) / baseline})
+    return regressions
+
+
+def _format_value(kind, value):
+    if kind == "seconds":
+        return f"{value:.0f}s"
+    return f"{value / 1024 ** 2:.0f} MB" if value < 1024 ** 3 else f"{value / 1024 ** 3:.2f} GB"
+
+
+def format_regressions(image_name: str, regressions: list) -> list:
+    """Lines like "pyhc-environment: uv install took 320s vs median 230s (+39%)"."""
+    lines = []
+    for regression in regressions:
+        verb = "took" if regression["kind"] == "seconds" else "is"
+        lines.append(f"{image_name}: {regression['metric']} {verb} {_format_value(regression['kind'], regression['value'])} "
+                     f"vs median {_format_value(regression['kind'], regression['median'])} ({regression['change']:+.0%})")
+    return lines
+
+
+def format_build_summary(record: dict) -> str:
+    """One line per tracked metric, for the build log."""
+    lines = [f"Build performance of {record['image']}:"]
+    for name, values in record["metrics"].items():
+        parts = [_format_value(kind, values[kind]) for kind in ("seconds", "bytes") if values.get(kind) is not None]
+        lines.append(f"  {name:>10}  {', '.join(parts) if parts else 'cached'}")
+    return "\n".join(lines)
+
+
+def get_regression_settings() -> tuple:
+    """(threshold, window) from PYHC_BUILD_REGRESSION_THRESHOLD and PYHC_BUILD_HISTORY_WINDOW."""
+    threshold = float(os.environ.get("PYHC_BUILD_REGRESSION_THRESHOLD", DEFAULT_REGRESSION_THRESHOLD))
+    window = max(1, int(os.environ.get("PYHC_BUILD_HISTORY_WINDOW", DEFAULT_HISTORY_WINDOW)))
+    return threshold, window
+
+
+def record_build_performance(image_name: str, report: dict, cache_dir: str = None) -> tuple:
+    """Add a build to the image's history and check it against the earlier builds.
+
+    Args:
+        image_name: Image name like "pyhc-environment"
+        report: Build report written by docker_operations.py
+        cache_dir: Pipeline cache directory (default: get_pipeline_cache_dir())
+
+    Returns:
+        Tuple (summarize_build() record, detect_regressions() result)
+    """
+    threshold, window = get_regression_settings()
+    path = get_history_path(image_name, cache_dir)
+    record = summarize_build(report)
+    regressions = detect_regressions(load_history(path), record, threshold, window)
+    append_history(path, record)
+    return record, regressions
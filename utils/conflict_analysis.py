@@ -0,0 +1,278 @@
+"""
+Minimal explanations for dependency conflicts in the dependency table, computed from version intervals and
+cached PyPI metadata (see package_metadata.py) without invoking uv or installing anything.
+
+`find_dependency_conflicts()` lists every project's range for a conflicting dependency. Here each conflict is
+reduced to its unsatisfiable cores: the smallest sets of projects whose ranges can't all hold at once. Ranges
+are intervals with excluded points, so by Helly's theorem in one dimension every core has at most three members:
+a project whose range is empty on its own, two projects with disjoint ranges, or two ranges that meet at a single
+version which a third project excludes. For each core member, the newest earlier release whose own declared
+requirement fits the other members is then looked up, like a resolver backtracking on that one package.
+
+Dependencies the table marks as conflicting but whose intervals do intersect are reported separately;
+the table's pairwise range combination is more conservative than interval intersection.
+"""
+
+from itertools import combinations
+
+import requests
+from packaging.requirements import Requirement
+from packaging.utils import canonicalize_name
+from packaging.version import Version, InvalidVersion
+
+try:
+    from utils.generate_dependency_table import _get_dependency_index, normalize_declared_range
+    from utils.package_metadata import (
+        applicable_requirements,
+        fetch_release_history,
+        load_requires_dist,
+        marker_environment,
+    )
+    from utils.version_intervals import IncrementalRequirementReducer, parse_range_bounds
+except ModuleNotFoundError:
+    from generate_dependency_table import _get_dependency_index, normalize_declared_range
+    from package_metadata import (
+        applicable_requirements,
+        fetch_release_history,
+        load_requires_dist,
+        marker_environment,
+    )
+    from version_intervals import IncrementalRequirementReducer, parse_range_bounds
+
+# Maximum cores listed per dependency (all of them are still counted)
+MAX_CORES_PER_DEPENDENCY = 10
+
+
+def intersect_bounds(bounds_list):
+    """
+    Intersect parsed version ranges.
+    :param bounds_list: Iterable of (lower, upper, exclusions) tuples from `version_intervals.parse_range_bounds()`
+    :return: The intersection as (lower, upper, exclusions), or None if it's empty
+    """
+    lower = upper = None
+    exclusions = set()
+    for bounds_lower, bounds_upper, bounds_exclusions in bounds_list:
+        if bounds_lower is not None and (lower is None or bounds_lower > lower):
+            lower = bounds_lower
+        if bounds_upper is not None and (upper is None or bounds_upper < upper):
+            upper = bounds_upper
+        exclusions |= bounds_exclusions
+
+    if lower is not None and upper is not None:
+        if lower[0] > upper[0]:
+            return None
+        if lower[0] == upper[0] and (lower[1] or not upper[1] or lower[0] in exclusions):
+            return None
+    return lower, upper, frozenset(exclusions)
+
+
+def _single_version(bounds):
+    lower, upper, _ = bounds
+    if lower is not None and upper is not None and lower[0] == upper[0]:
+        return lower[0]
+    return None
+
+
+def minimal_conflicting_subsets(contributors, max_cores=MAX_CORES_PER_DEPENDENCY):
+    """
+    Find the minimal unsatisfiable subsets of one dependency's ranges.
+    :param contributors: Dict like {'sunpy==7.0.0': '<2.0', 'pkg==1.0': '>=2.0', ...}
+    :param max_cores: Maximum number of cores to return
+    :return: Tuple (cores, total) where cores is a list of tuples like (('pkg==1.0', '>=2.0'), ('sunpy==7.0.0', '<2.0')),
+             smallest first, and total counts every core found
+    """
+    parsed = []
+    for project, version_range in sorted(contributors.items()):
+        bounds = parse_range_bounds(str(version_range))
+        if bounds is not None:
+            parsed.append((project, version_range, bounds))
+
+    cores = []
+    consistent = []
+    for project, version_range, bounds in parsed:
+        if intersect_bounds([bounds]) is None:
+            cores.append(((project, version_range),))
+        else:
+            consistent.append((project, version_range, bounds))
+
+    conflicting_pairs = set()
+    for (i, a), (j, b) in combinations(enumerate(consistent), 2):
+        if intersect_bounds([a[2], b[2]]) is None:
+            conflicting_pairs.add((i, j))
+            cores.append(((a[0], a[1]), (b[0], b[1])))
+
+    # Triples: two ranges that only share one version, which a third range excludes
+    triples = set()
+    for (i, a), (j, b) in combinations(enumerate(consistent), 2):
+        if (i, j) in conflicting_pairs:
+            continue
+        point = _single_version(intersect_bounds([a[2], b[2]]))
+        if point is None:
+            continue
+        for k, c in enumerate(consistent):
+            if k in (i, j) or point not in c[2][2]:
+                continue
+            if tuple(sorted((i, k))) in conflicting_pairs or tuple(sorted((j, k))) in conflicting_pairs:
+                continue
+            triples.add(tuple(sorted((i, j, k))))
+    for triple in triples:
+        cores.append(tuple((consistent[x][0], consistent[x][1]) for x in triple))
+
+    cores.sort(key=lambda core: (len(core), [project.lower() for project, _ in core]))
+    return cores[:max_cores], len(cores)
+
+
+def _declared_range(requirement_strings, extras, dependency, environment):
+    version_range = None
+    for requirement in applicable_requirements(requirement_strings, extras, environment):
+        if canonicalize_name(requirement.name) == dependency:
+            declared = normalize_declared_range(requirement.specifier)
+            version_range = declared if version_range is None or version_range == "any" else f"{version_range},{declared}"
+    return version_range or "any"
+
+
+def newest_compatible_release(project, dependency, other_ranges, environment=None, max_releases=50, batch_size=8):
+    """
+    Find the newest release of a project, up to its current version, whose own declared requirement on a dependency
+    intersects the other ranges. Release metadata is fetched newest first in small concurrent batches.
+    :param project: Project key like 'sunpy[all]==7.0.0'
+    :param dependency: Canonical dependency name like 'numpy'
+    :param other_ranges: Range strings the release has to be compatible with, like ['>=2.0']
+    :param environment: Marker environment from `package_metadata.marker_environment()`
+    :param max_releases: Maximum number of releases to check
+    :param batch_size: Releases fetched per batch
+    :return: Tuple (version, declared range) like ('6.1.0', '>=1.21'), 'inherited' if the current release's own
+             requirement already fits (the conflicting range comes from one of its dependencies), or None
+    """
+    environment = environment or marker_environment()
+    requirement = Requirement(project)
+    name = canonicalize_name(requirement.name)
+    current = next(iter(requirement.specifier), None)
+    current = Version(current.version) if current is not None and current.operator == "==" else None
+    others = [parse_range_bounds(str(r)) for r in other_ranges]
+    others = [bounds for bounds in others if bounds is not None]
+
+    candidates = []
+    for version in fetch_release_history(name):
+        try:
+            parsed_version = Version(version)
+        except InvalidVersion:
+            continue
+        if current is None or parsed_version <= current:
+            candidates.append((parsed_version, version))
+    candidates = [version for _, version in sorted(candidates, reverse=True)]
+    candidates = candidates[:max_releases]
+
+    for start in range(0, len(candidates), batch_size):
+        batch = candidates[start:start + batch_size]
+        requires_dist = load_requires_dist([(name, version) for version in batch], max_workers=batch_size)
+        for version in batch:
+            declared = _declared_range(requires_dist[(name, version)], requirement.extras, dependency, environment)
+            bounds = parse_range_bounds(declared)
+            if bounds is None or intersect_bounds([bounds] + others) is None:
+                continue
+            if current is not None and Version(version) == current:
+                return "inherited"
+            return version, declared
+    return None
+
+
+def analyze_dependency_conflicts(table_data, python_version=None, suggest_releases=True, max_cores=MAX_CORES_PER_DEPENDENCY):
+    """
+    Explain the conflicting dependencies in table_data.
+    :param table_data: Dict from `generate_dependency_table_data()`
+    :param python_version: Target Python version like "3.12" for evaluating environment markers
+    :param suggest_releases: Whether to look up the newest co-installable release of each core member (cached PyPI metadata)
+    :param max_cores: Maximum number of cores listed per dependency
+    :return: Dict like {'numpy': {
+                 'allowed_range': None,                          # interval intersection; a string when not a real conflict
+                 'cores': [(('pkg==1.0', '>=2.0'), ('sunpy==7.0.0', '<2.0'))],
+                 'core_count': 1,
+                 'suggestions': {'sunpy==7.0.0': None, 'pkg==1.0': ('0.9.0', '<2'), ...},  # or 'inherited'
+             }, ...}
+    """
+    conflicting_packages = set()
+    for deps_key in ["core_dependencies", "other_dependencies"]:
+        for package_name, values in table_data.get(deps_key, {}).items():
+            version_range = values[1] if isinstance(values, tuple) else values
+            if version_range is None:
+                conflicting_packages.add(package_name)
+    if not conflicting_packages:
+        return {}
+
+    index = _get_dependency_index(table_data)
+    project_dependencies = {}
+    for dependency in conflicting_packages:
+        for project, cell in index.get(dependency, []):
+            if cell.version_range is not None:
+                project_dependencies.setdefault(project, {})[dependency] = cell.version_range
+
+    # Ranges the interval engine can't represent are left out of the analysis
+    reducer = IncrementalRequirementReducer()
+    for project, requirements in project_dependencies.items():
+        reducer.set_project_requirements(project, {
+            dependency: version_range for dependency, version_range in requirements.items()
+            if parse_range_bounds(str(version_range)) is not None
+        })
+
+    environment = marker_environment(python_version)
+    analysis = {}
+    for dependency in sorted(conflicting_packages):
+        contributors = reducer.contributors(dependency)
+        if not contributors:
+            continue
+        allowed_range = reducer.allowed_range(dependency)
+        cores, core_count = ([], 0) if allowed_range is not None else minimal_conflicting_subsets(contributors, max_cores)
+
+        suggestions = {}
+        if suggest_releases:
+            for core in cores:
+                for project, _ in core:
+                    if project in suggestions or project.startswith("git+"):
+                        continue
+                    other_ranges = [version_range for other, version_range in core if other != project]
+                    try:
+                        suggestions[project] = newest_compatible_release(project, dependency, other_ranges, environment)
+                    except (RuntimeError, requests.RequestException) as e:
+                        print(f"Could not look up releases of {project}: {e}")
+                        suggestions[project] = None
+
+        analysis[dependency] = {
+            'allowed_range': allowed_range,
+            'cores': cores,
+            'core_count': core_count,
+            'suggestions': suggestions,
+        }
+    return analysis
+
+
+def _project_name(project):
+    return project.split("==")[0]
+
+
+def format_conflict_analysis(analysis):
+    """
+    :param analysis: Dict from `analyze_dependency_conflicts()`
+    :return: List of human-readable lines
+    """
+    lines = []
+    for dependency, result in analysis.items():
+        if result['allowed_range'] is not None:
+            lines.append(f"'{dependency}': not a real conflict; the ranges intersect at {dependency}{result['allowed_range']}"
+                         if result['allowed_range'] != "any" else f"'{dependency}': not a real conflict; the ranges intersect")
+            continue
+
+        for core in result['cores']:
+            requirements = " + ".join(f"{_project_name(project)} requires {dependency}{version_range}" for project, version_range in core)
+            lines.append(f"'{dependency}': {requirements}")
+            for project, _ in core:
+                suggestion = result['suggestions'].get(project)
+                if suggestion == "inherited":
+                    lines.append(f"    {_project_name(project)}: range comes from one of its dependencies")
+                elif suggestion is not None:
+                    version, declared = suggestion
+                    lines.append(f"    newest co-installable {_project_name(project)}: {Requirement(project).name}=={version} ({dependency}{declared if declared != 'any' else ''})")
+        hidden = result['core_count'] - len(result['cores'])
+        if hidden > 0:
+            lines.append(f"    ... and {hidden} more conflicting set(s)")
+    return lines
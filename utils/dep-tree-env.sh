@@ -0,0 +1,126 @@
+#!/bin/bash
+# Shared scratch-venv setup for the get-dep-tree-*.sh scripts. Source it, then call `dep_tree_setup "$PACKAGE"`.
+#
+# - All workers share one uv cache (uv's default, already warmed by `uv pip compile`, or $PYHC_UV_CACHE_DIR),
+#   so packages are downloaded and unpacked once per run.
+# - Scratch venvs go next to the uv cache, on the same filesystem, so uv hardlinks files out of the cache
+#   instead of copying them.
+# - With PYHC_DEP_TREE_TMPFS=1, venvs go on tmpfs instead, together with their own shared uv cache (so
+#   installs still hardlink) in $PYHC_DEP_TREE_TMPFS_ROOT. Each worker reserves PYHC_DEP_TREE_TMPFS_MIN_MB
+#   (default 4096) of memory under a lock first, so concurrent workers can't together exhaust RAM; workers
+#   that find no room left use disk scratch.
+# - On exit each worker appends one JSON line of disk/IO usage to $PYHC_DEP_TREE_STATS_FILE (if set).
+#
+# UV_LINK_MODE overrides the chosen link mode.
+
+_dep_tree_available_mb() {
+  df -Pm "$1" 2>/dev/null | awk 'NR == 2 { mb = $4 } END { print mb + 0 }'
+}
+
+_dep_tree_mem_available_mb() {
+  [[ -r /proc/meminfo ]] || { echo 0; return; }
+  awk '/^MemAvailable:/ { mb = int($2 / 1024) } END { print mb + 0 }' /proc/meminfo
+}
+
+# Reserve $2 MB of tmpfs for this worker in the reservations file $1 ("<pid> <MB>" lines); fails if the free
+# memory, less what live workers have already reserved, is smaller
+_dep_tree_reserve_tmpfs() {
+  local reservations="$1" mb="$2"
+  (
+    flock 9 || exit 1
+    touch "$reservations"
+    local pid reserved_mb reserved=0 live=""
+    while read -r pid reserved_mb; do
+      if [[ -n "$pid" ]] && kill -0 "$pid" 2>/dev/null; then
+        reserved=$(( reserved + reserved_mb ))
+        live+="$pid $reserved_mb"$'\n'
+      fi
+    done < "$reservations"
+    local free_mb shm_mb
+    free_mb=$(_dep_tree_mem_available_mb)
+    shm_mb=$(_dep_tree_available_mb "$(dirname "$reservations")")
+    (( shm_mb < free_mb )) && free_mb=$shm_mb
+    printf '%s' "$live" > "$reservations"
+    (( free_mb - reserved >= mb )) || exit 1
+    echo "$$ $mb" >> "$reservations"
+  ) 9>"$reservations.lock"
+}
+
+_dep_tree_release_tmpfs() {
+  local reservations="$1"
+  [[ -f "$reservations" ]] || return 0
+  (
+    flock 9
+    grep -v "^$$ " "$reservations" > "$reservations.tmp"
+    mv "$reservations.tmp" "$reservations"
+  ) 9>"$reservations.lock"
+}
+
+_dep_tree_io_counter() {
+  # /proc/<pid>/io includes the IO of reaped children (uv), so this covers the whole extraction
+  [[ -r "/proc/$$/io" ]] || { echo 0; return; }
+  awk -v key="$1:" '$1 == key { n = $2 } END { print n + 0 }' "/proc/$$/io"
+}
+
+dep_tree_setup() {
+  DEP_TREE_PACKAGE="$1"
+  DEP_TREE_START_NS=$(date +%s%N)
+  DEP_TREE_READ_START=$(_dep_tree_io_counter read_bytes)
+  DEP_TREE_WRITE_START=$(_dep_tree_io_counter write_bytes)
+
+  if [[ -n "${PYHC_UV_CACHE_DIR:-}" ]]; then
+    export UV_CACHE_DIR="$PYHC_UV_CACHE_DIR"
+  fi
+
+  local tmpfs_root="${PYHC_DEP_TREE_TMPFS_ROOT:-/dev/shm/pyhc-dep-tree}"
+  local scratch_root
+  DEP_TREE_SCRATCH="disk"
+  DEP_TREE_RESERVATIONS=""
+  if [[ "${PYHC_DEP_TREE_TMPFS:-0}" == "1" ]] && mkdir -p "$tmpfs_root" 2>/dev/null \
+      && _dep_tree_reserve_tmpfs "$tmpfs_root/reservations" "${PYHC_DEP_TREE_TMPFS_MIN_MB:-4096}"; then
+    DEP_TREE_RESERVATIONS="$tmpfs_root/reservations"
+    DEP_TREE_SCRATCH="tmpfs"
+    export UV_CACHE_DIR="$tmpfs_root/uv-cache"
+    scratch_root="$tmpfs_root/scratch"
+  fi
+  local cache_dir
+  cache_dir=$(uv cache dir 2>/dev/null || echo "${UV_CACHE_DIR:-$HOME/.cache/uv}")
+  mkdir -p "$cache_dir"
+  scratch_root="${scratch_root:-$(dirname "$cache_dir")/pyhc-dep-tree-scratch}"
+  mkdir -p "$scratch_root"
+
+  # Hardlinks only work within one filesystem; across filesystems (e.g. a custom UV_CACHE_DIR) uv has to copy
+  if [[ -z "${UV_LINK_MODE:-}" ]]; then
+    if [[ "$(stat -c %d "$cache_dir")" == "$(stat -c %d "$scratch_root")" ]]; then
+      export UV_LINK_MODE=hardlink
+    else
+      export UV_LINK_MODE=copy
+    fi
+  fi
+
+  TEMP_DIR=$(mktemp -d -p "$scratch_root")
+  trap dep_tree_cleanup EXIT
+  pushd "$TEMP_DIR" >/dev/null
+}
+
+dep_tree_cleanup() {
+  local status=$?
+  set +e  # Reporting must never mask the extraction's own exit status or skip the cleanup
+  popd >/dev/null 2>&1 || true
+
+  if [[ -n "${PYHC_DEP_TREE_STATS_FILE:-}" ]]; then
+    local read_bytes write_bytes venv_kb elapsed_ms package
+    read_bytes=$(( $(_dep_tree_io_counter read_bytes) - ${DEP_TREE_READ_START:-0} ))
+    write_bytes=$(( $(_dep_tree_io_counter write_bytes) - ${DEP_TREE_WRITE_START:-0} ))
+    venv_kb=$(du -sk "$TEMP_DIR/.venv" 2>/dev/null | cut -f1)
+    elapsed_ms=$(( ($(date +%s%N) - DEP_TREE_START_NS) / 1000000 ))
+    package=$(printf '%s' "$DEP_TREE_PACKAGE" | sed 's/\\/\\\\/g; s/"/\\"/g')
+    printf '{"package": "%s", "scratch": "%s", "link_mode": "%s", "venv_kb": %s, "read_bytes": %s, "write_bytes": %s, "elapsed_ms": %s, "status": %s}\n' \
+      "$package" "$DEP_TREE_SCRATCH" "${UV_LINK_MODE:-}" "${venv_kb:-0}" "$read_bytes" "$write_bytes" "$elapsed_ms" "$status" \
+      >> "$PYHC_DEP_TREE_STATS_FILE"
+  fi
+
+  rm -rf "$TEMP_DIR"
+  [[ -n "${DEP_TREE_RESERVATIONS:-}" ]] && _dep_tree_release_tmpfs "$DEP_TREE_RESERVATIONS"
+  return $status
+}
@@ -1,12 +1,32 @@
+import base64
+import os
+import shutil
 import subprocess
 import sys
 import re
+import json
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
+
+try:
+    import docker  # Docker SDK for Python (Engine API); optional, the docker CLI is used without it
+    from docker.errors import DockerException
+except ImportError:
+    docker = None
 
 try:
     from .pipeline_utils import *
+    from .build_context import compute_context_hash, parse_base_images
+    from .build_history import format_build_summary, format_regressions, record_build_performance
+    from .wheelhouse import PLAN_NAME, format_wheelhouse_report, merge_built_wheels
 except ImportError:
     from pipeline_utils import *
+    from build_context import compute_context_hash, parse_base_images
+    from build_history import format_build_summary, format_regressions, record_build_performance
+    from wheelhouse import PLAN_NAME, format_wheelhouse_report, merge_built_wheels
 
 
 def normalize_tag_suffix(tag_suffix):
@@ -28,6 +48,648 @@ def normalize_tag_suffix(tag_suffix):
     return normalized
 
 
+# Dedicated tag holding each image's exported BuildKit layer cache
+BUILD_CACHE_TAG = "buildcache"
+
+# Image label holding the hash of the build context the image was built from (see build_context.py)
+CONTEXT_HASH_LABEL = "org.heliophysicspy.pyhc.build-context"
+
+# slim-image.py output, either raw or as a `--progress=plain` log line
+SLIM_LINE_RE = re.compile(r"^(?:#\d+ \d+(?:\.\d+)? )?slim: (\d+)\t(\d+)\t([^\t]*)\t(.+)$")
+
+# warm-image.py's time to first plot without and with the baked-in bytecode and caches
+FIRST_PLOT_LINE_RE = re.compile(r"^(?:#\d+ \d+(?:\.\d+)? )?first-plot: (\d+(?:\.\d+)?)\t(\d+(?:\.\d+)?)$")
+
+# Maximum growth of an image's size over the last build that was published, as a fraction; override with
+# PYHC_IMAGE_SIZE_BUDGET (e.g. 0.1, or "off")
+DEFAULT_IMAGE_SIZE_BUDGET = 0.05
+
+# Maximum number of images pushed at the same time; override with PYHC_PUSH_CONCURRENCY
+DEFAULT_PUSH_CONCURRENCY = 2
+
+PUSH_LAYER_RE = re.compile(r"^([0-9a-f]{12}): (Pushed|Layer already exists|Mounted from .+)$")
+PUSH_DIGEST_RE = re.compile(r"^\S+: digest: (sha256:[0-9a-f]{64}) size: \d+$")
+
+# BuildKit vertices for Dockerfile instructions are named like "[toolchain 4/21] RUN ..."; internal ones like
+# "[internal] load build context" or "[auth] ..." and unbracketed ones like "exporting to image" are not
+BUILD_STEP_NAME_RE = re.compile(r"^\[(?!internal\]|auth\])[^\]]+\] ")
+
+# Directory for the per-run build reports; override with PYHC_BUILD_REPORT_DIR
+DEFAULT_BUILD_REPORT_DIR = "build-reports"
+
+
+def build_cache_args(cache_ref=None, cache_dir=None):
+    """Build the buildx cache import/export arguments.
+
+    Args:
+        cache_ref: Registry reference for the layer cache (e.g. user/pyhc-environment:buildcache), or None
+        cache_dir: Local directory for the layer cache, or None. The new cache is exported next to it
+            (as <cache_dir>-new) and swapped in by rotate_local_build_cache() so stale layers don't accumulate.
+
+    Returns:
+        List of command-line arguments, one "--flag=value" element each
+    """
+    args = []
+    if cache_ref:
+        args += [f"--cache-from=type=registry,ref={cache_ref}", f"--cache-to=type=registry,ref={cache_ref},mode=max"]
+    if cache_dir:
+        if os.path.isdir(cache_dir):
+            args.append(f"--cache-from=type=local,src={cache_dir}")
+        args.append(f"--cache-to=type=local,dest={cache_dir}-new,mode=max")
+    return args
+
+
+def rotate_local_build_cache(cache_dir):
+    """Replace a local build cache with the one just exported by build_cache_args()."""
+    new_cache_dir = f"{cache_dir}-new"
+    if os.path.isdir(new_cache_dir):
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        os.replace(new_cache_dir, cache_dir)
+
+
+def _parse_timestamp(value):
+    # BuildKit timestamps have nanoseconds, e.g. "2026-10-19T12:00:01.123456789Z"
+    return datetime.fromisoformat(re.sub(r"(\.\d{6})\d+", r"\1", value).replace("Z", "+00:00"))
+
+
+def parse_build_events(lines):
+    """Parse the BuildKit status stream printed by `docker buildx build --progress=rawjson`.
+
+    Each line is a JSON SolveStatus with "vertexes" (build steps, updated as they start, finish or hit the cache)
+    and "logs" (base64-encoded output of a step). Lines that aren't JSON are ignored.
+
+    Args:
+        lines: Lines of rawjson progress output
+
+    Returns:
+        Tuple (steps, logs). steps is a list of dicts like {"step": "[toolchain 4/21] RUN conda env create ...",
+        "cached": False, "seconds": 287.4, "error": None} for the Dockerfile instructions, in build order
+        ("seconds" is None for cached steps). logs is the output of all steps, as a list of lines.
+    """
+    vertexes = {}
+    output = {}
+    for line in lines:
+        try:
+            status = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(status, dict):
+            continue
+        for vertex in status.get("vertexes") or []:
+            entry = vertexes.setdefault(vertex["digest"], {"name": vertex.get("name", "")})
+            for key in ("started", "completed", "cached", "error"):
+                if vertex.get(key):
+                    entry[key] = vertex[key]
+        for log in status.get("logs") or []:
+            output.setdefault(log["vertex"], []).append(base64.b64decode(log.get("data") or ""))
+
+    steps = []
+    for vertex in vertexes.values():
+        if not BUILD_STEP_NAME_RE.match(vertex["name"]):
+            continue
+        seconds = None
+        if not vertex.get("cached") and vertex.get("started") and vertex.get("completed"):
+            elapsed = _parse_timestamp(vertex["completed"]) - _parse_timestamp(vertex["started"])
+            seconds = round(elapsed.total_seconds(), 1)
+        steps.append({"step": vertex["name"], "cached": bool(vertex.get("cached")), "seconds": seconds,
+                      "error": vertex.get("error")})
+
+    logs = []
+    for chunks in output.values():
+        logs += b"".join(chunks).decode("utf-8", "replace").splitlines()
+    return steps, logs
+
+
+def format_build_event(line, seen):
+    """Render one line of rawjson progress as `--progress=plain`-style text for the build log.
+
+    Args:
+        line: Line of rawjson progress output
+        seen: Dict shared across calls, mapping vertex digest → step number
+
+    Returns:
+        Text to print (possibly empty)
+    """
+    try:
+        status = json.loads(line)
+    except ValueError:
+        return line
+    if not isinstance(status, dict):
+        return line
+    text = []
+    for vertex in status.get("vertexes") or []:
+        if vertex["digest"] not in seen:
+            seen[vertex["digest"]] = len(seen) + 1
+            text.append(f"#{seen[vertex['digest']]} {vertex.get('name', '')}\n")
+        number = seen[vertex["digest"]]
+        if vertex.get("error"):
+            text.append(f"#{number} ERROR: {vertex['error']}\n")
+        elif vertex.get("cached"):
+            text.append(f"#{number} CACHED\n")
+        elif vertex.get("completed") and vertex.get("started"):
+            elapsed = _parse_timestamp(vertex["completed"]) - _parse_timestamp(vertex["started"])
+            text.append(f"#{number} DONE {elapsed.total_seconds():.1f}s\n")
+    for log in status.get("logs") or []:
+        number = seen.setdefault(log["vertex"], len(seen) + 1)
+        data = base64.b64decode(log.get("data") or "").decode("utf-8", "replace")
+        text += [f"#{number} {part}\n" for part in data.splitlines()]
+    return "".join(text)
+
+
+def normalize_instruction(text):
+    """Reduce a build step name or a `docker history` CreatedBy to the bare Dockerfile instruction, so they compare.
+
+    "[toolchain 9/21] RUN --mount=type=bind,... pip install x" and "RUN |1 A=b /bin/sh -c pip install x # buildkit"
+    both become "RUN pip install x".
+    """
+    text = BUILD_STEP_NAME_RE.sub("", text.strip())
+    text = re.sub(r"\s*# buildkit$", "", text)
+    keyword, *tokens = text.split()
+    if keyword == "RUN" and tokens and re.fullmatch(r"\|\d+", tokens[0]):
+        tokens = tokens[1 + int(tokens[0][1:]):]  # Build args: "|<count> NAME=value ..."
+    while tokens and tokens[0].startswith("--"):
+        tokens.pop(0)
+    if keyword == "RUN" and tokens[:2] == ["/bin/sh", "-c"]:
+        tokens = tokens[2:]
+    return " ".join([keyword] + tokens)
+
+
+def attach_layer_sizes(steps, layers):
+    """Add each build step's layer size from the image history.
+
+    Args:
+        steps: From parse_build_events(); updated in place with "layer_size" (None for steps that produced no layer
+            of the image, e.g. in other stages, or that couldn't be matched)
+        layers: From parse_docker_history(), newest layer first
+
+    Returns:
+        steps
+    """
+    history = [(normalize_instruction(layer["created_by"]), layer["size"]) for layer in reversed(layers)
+               if layer["created_by"]]
+    position = 0
+    for step in steps:
+        step["layer_size"] = None
+        instruction = normalize_instruction(step["step"])
+        for index in range(position, len(history)):
+            if history[index][0] == instruction:
+                step["layer_size"] = history[index][1]
+                position = index + 1
+                break
+    return steps
+
+
+def write_build_report(report_dir, image_name, version_tag, report):
+    """Write one image's build report as JSON and return its path."""
+    os.makedirs(report_dir, exist_ok=True)
+    path = os.path.join(report_dir, f"{image_name}-{version_tag}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=1)
+    return path
+
+
+def format_build_cache_report(steps):
+    """Summarize parse_build_events() steps, e.g. "Layer cache hits: 9/14 steps"."""
+    cached = sum(step["cached"] for step in steps)
+    lines = [f"Layer cache hits: {cached}/{len(steps)} steps"]
+    for step in steps:
+        status = "CACHED" if step["cached"] else (f"built in {step['seconds']:.1f}s" if step["seconds"] is not None else "built")
+        lines.append(f"  {status:>16}  {step['step']}")
+    return "\n".join(lines)
+
+
+# Dockerfile stage holding the locally built wheels (see wheelhouse.py)
+WHEELHOUSE_EXPORT_STAGE = "wheelhouse-export"
+
+
+def update_wheelhouse(image_path, cache_args):
+    """Export the wheelhouse stage of a just-built image and merge new wheels into contents/wheelhouse.
+
+    Args:
+        image_path: Path to the image folder (with the Dockerfile and contents/)
+        cache_args: Arguments from build_cache_args(); only the imports are used, so the stage comes from
+            the layers of the build that just ran and the exported cache isn't overwritten
+
+    Returns:
+        Report from format_wheelhouse_report(), or None if the image has no wheelhouse stage
+    """
+    with open(os.path.join(image_path, "Dockerfile"), "r") as f:
+        if f" AS {WHEELHOUSE_EXPORT_STAGE}" not in f.read():
+            return None
+
+    export_dir = tempfile.mkdtemp(prefix="pyhc-wheelhouse-")
+    try:
+        subprocess.run([
+            "docker", "buildx", "build", "--progress=plain", "--target", WHEELHOUSE_EXPORT_STAGE,
+            *[arg for arg in cache_args if arg.startswith("--cache-from")],
+            "--output", f"type=local,dest={export_dir}", image_path,
+        ], check=True)
+        report = merge_built_wheels(
+            export_dir,
+            os.path.join(image_path, "contents", "wheelhouse"),
+            os.path.join(image_path, "contents", "install-tiers", PLAN_NAME),
+        )
+    finally:
+        shutil.rmtree(export_dir, ignore_errors=True)
+    return format_wheelhouse_report(report)
+
+
+def parse_slim_report(lines):
+    """Collect the per-rule savings printed by slim-image.py from `--progress=plain` build output.
+
+    Returns:
+        Dict mapping rule (e.g. "deny **/site-packages/**/tests/") → {"bytes": ..., "files": ..., "layers": [...]},
+        summed over the layers that were rebuilt (cached layers print nothing)
+    """
+    rules = {}
+    for line in lines:
+        match = SLIM_LINE_RE.match(line.rstrip("\n"))
+        if not match:
+            continue
+        saved, files, layer, rule = int(match.group(1)), int(match.group(2)), match.group(3), match.group(4)
+        entry = rules.setdefault(rule, {"bytes": 0, "files": 0, "layers": []})
+        entry["bytes"] += saved
+        entry["files"] += files
+        if layer and layer not in entry["layers"]:
+            entry["layers"].append(layer)
+    return rules
+
+
+def format_slim_report(rules):
+    """Summarize parse_slim_report() results, largest savings first."""
+    total = sum(entry["bytes"] for entry in rules.values())
+    lines = [f"Slimming saved {_format_bytes(total)} in the rebuilt layers"]
+    for rule, entry in sorted(rules.items(), key=lambda item: item[1]["bytes"], reverse=True):
+        if entry["files"]:
+            lines.append(f"  {_format_bytes(entry['bytes']):>9}  {entry['files']:>6} files  {rule}")
+    return "\n".join(lines)
+
+
+def parse_first_plot(lines):
+    """Find warm-image.py's time-to-first-plot measurement in the build output.
+
+    Returns:
+        Dict {"cold_seconds": ..., "warm_seconds": ...}, or None if the step was restored from the layer cache
+    """
+    for line in lines:
+        match = FIRST_PLOT_LINE_RE.match(line.rstrip("\n"))
+        if match:
+            return {"cold_seconds": float(match.group(1)), "warm_seconds": float(match.group(2))}
+    return None
+
+
+def format_first_plot_report(first_plot):
+    if first_plot is None:
+        return "Time to first plot: not measured (warm-up step cached)"
+    saved = first_plot["cold_seconds"] - first_plot["warm_seconds"]
+    return (f"Time to first plot: {first_plot['warm_seconds']:.1f}s with baked-in bytecode and caches, "
+            f"{first_plot['cold_seconds']:.1f}s without ({saved:.1f}s saved)")
+
+
+def get_image_size_budget():
+    """Allowed growth over the last published build from PYHC_IMAGE_SIZE_BUDGET, or None if the check is off."""
+    value = os.environ.get("PYHC_IMAGE_SIZE_BUDGET", str(DEFAULT_IMAGE_SIZE_BUDGET)).strip().lower()
+    if value in ("", "off", "none", "false"):
+        return None
+    return float(value)
+
+
+def check_size_budget(new_size, previous_size, budget):
+    """Compare a new image's size with the last published build's.
+
+    Returns:
+        Tuple (within_budget, message)
+    """
+    if budget is None or not previous_size or not new_size:
+        return True, "Size budget: not checked" + ("" if budget is None else " (no published build to compare with)")
+    growth = (new_size - previous_size) / previous_size
+    message = (f"Size budget: {_format_bytes(new_size)} vs {_format_bytes(previous_size)} for the last published build "
+               f"({growth:+.1%}, budget +{budget:.0%})")
+    return growth <= budget, message
+
+
+def get_push_concurrency():
+    """Number of concurrent image pushes from PYHC_PUSH_CONCURRENCY (at least 1)."""
+    return max(1, int(os.environ.get("PYHC_PUSH_CONCURRENCY", DEFAULT_PUSH_CONCURRENCY)))
+
+
+def parse_push_output(lines):
+    """Count the layers `docker push` uploaded and skipped.
+
+    Returns:
+        Dict {"pushed": n, "existing": n, "mounted": n, "digest": "sha256:..." or None}
+    """
+    result = {"pushed": 0, "existing": 0, "mounted": 0, "digest": None}
+    for line in lines:
+        line = line.strip()
+        match = PUSH_LAYER_RE.match(line)
+        if match:
+            status = match.group(2)
+            result["pushed" if status == "Pushed" else "existing" if status.startswith("Layer") else "mounted"] += 1
+            continue
+        match = PUSH_DIGEST_RE.match(line)
+        if match:
+            result["digest"] = match.group(1)
+    return result
+
+
+def _inspect_raw_manifest(ref):
+    result = subprocess.run(["docker", "buildx", "imagetools", "inspect", "--raw", ref],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        return {}
+    try:
+        return json.loads(result.stdout)
+    except ValueError:
+        return {}
+
+
+def get_manifest_layers(ref):
+    """Get the compressed layer sizes of an image in its registry.
+
+    Args:
+        ref: Image reference like "user/pyhc-environment:latest"
+
+    Returns:
+        Dict mapping layer digest → size in bytes, of the linux/amd64 image if ref is an image index; empty if the
+        tag doesn't exist
+    """
+    manifest = _inspect_raw_manifest(ref)
+    if manifest.get("manifests"):  # Image index: follow its linux/amd64 manifest
+        platforms = {(entry.get("platform", {}).get("os"), entry.get("platform", {}).get("architecture")): entry["digest"]
+                     for entry in manifest["manifests"]}
+        images = [digest for platform, digest in platforms.items() if platform[0] != "unknown"]  # Not attestations
+        digest = platforms.get(("linux", "amd64")) or (images[0] if len(images) == 1 else None)
+        if digest is None:
+            return {}
+        repository = ref.split("@")[0]
+        if ":" in repository.rsplit("/", 1)[-1]:
+            repository = repository.rsplit(":", 1)[0]
+        manifest = _inspect_raw_manifest(f"{repository}@{digest}")
+    return {layer["digest"]: layer["size"] for layer in manifest.get("layers", [])}
+
+
+def parse_push_events(events):
+    """Summarize the Engine API's structured push progress (`client.api.push(..., stream=True, decode=True)`).
+
+    Returns:
+        Tuple (dict like parse_push_output() plus "uploaded_bytes", the bytes of the layers that were pushed,
+        list of "<layer>: <status>" lines like the CLI prints)
+
+    Raises:
+        RuntimeError: If the stream reports an error
+    """
+    result = {"pushed": 0, "existing": 0, "mounted": 0, "digest": None}
+    sizes = {}
+    pushed = set()
+    lines = []
+    for event in events:
+        if "error" in event:
+            raise RuntimeError(f"Push failed: {event['error']}")
+        status, layer = event.get("status", ""), event.get("id")
+        if status == "Pushing":
+            progress = event.get("progressDetail") or {}
+            sizes[layer] = max(sizes.get(layer, 0), progress.get("total") or progress.get("current") or 0)
+            continue
+        if status == "Pushed":
+            result["pushed"] += 1
+            pushed.add(layer)
+        elif status == "Layer already exists":
+            result["existing"] += 1
+        elif status.startswith("Mounted from"):
+            result["mounted"] += 1
+        digest = (event.get("aux") or {}).get("Digest")
+        if digest:
+            result["digest"] = digest
+        if status:
+            lines.append(f"{layer}: {status}" if layer else status)
+    result["uploaded_bytes"] = sum(sizes.get(layer, 0) for layer in pushed)
+    return result, lines
+
+
+def publish_image(date_tag, latest_tag, client=None):
+    """Push an image's date tag, then point `latest` at it without uploading the layers again.
+
+    The push goes through the Engine API when there is a client, whose structured progress gives the uploaded
+    bytes; with the docker CLI they are worked out from the registry manifests of `latest` and the date tag.
+    `latest` is created in the registry as a copy of the pushed manifest (`docker buildx imagetools create
+    --prefer-index=false`; by default imagetools would wrap it in a new one-entry index), and the local
+    image is removed afterwards. Runs in a worker thread of build_and_push_docker_images(), so output is captured and
+    printed in one block per image.
+
+    Args:
+        date_tag: Local image to push, like "user/pyhc-environment:v2026.10.19"
+        latest_tag: Tag to move to it, like "user/pyhc-environment:latest"
+        client: Docker SDK client from get_docker_client(), or None to use the docker CLI
+
+    Returns:
+        Dict {"tag", "seconds", "uploaded_bytes" (None if unknown), "pushed", "existing", "mounted", "digest"}
+    """
+    start = time.monotonic()
+    if client is not None:
+        repository, tag = date_tag.rsplit(":", 1)
+        result, output = parse_push_events(client.api.push(repository, tag=tag, stream=True, decode=True))
+        result = {"tag": date_tag, "seconds": time.monotonic() - start, **result}
+    else:
+        previous_layers = get_manifest_layers(latest_tag)
+        push = subprocess.run(["docker", "push", date_tag], check=True, capture_output=True, text=True)
+        output = push.stdout.splitlines()
+        result = {"tag": date_tag, "seconds": time.monotonic() - start, **parse_push_output(output)}
+        layers = get_manifest_layers(date_tag)
+        result["uploaded_bytes"] = sum(size for digest, size in layers.items() if digest not in previous_layers) if layers else None
+    print(f"Pushed {date_tag}:\n" + "\n".join(output), flush=True)
+
+    print(f"Tagging {date_tag} as {latest_tag} in the registry", flush=True)
+    subprocess.run(["docker", "buildx", "imagetools", "create", "--prefer-index=false", "--tag", latest_tag, date_tag],
+                   check=True)
+
+    # Remove the image locally to free up disk space
+    remove_local_image(date_tag, client)
+    return result
+
+
+def remove_local_image(image, client=None):
+    if client is not None:
+        client.api.remove_image(image)
+    else:
+        subprocess.run(["docker", "rmi", image], check=True)
+
+
+def format_push_report(result):
+    """Summarize a publish_image() result, e.g. "Pushed user/img:v2026.10.19 in 312s: 4 layers (1.2 GB) uploaded, ..."."""
+    uploaded = "unknown size" if result["uploaded_bytes"] is None else _format_bytes(result["uploaded_bytes"])
+    line = (f"Pushed {result['tag']} in {result['seconds']:.0f}s: {result['pushed']} layers ({uploaded}) uploaded, "
+            f"{result['existing'] + result['mounted']} already in the registry")
+    return line + "; latest copied in the registry"
+
+
+def parse_docker_history(lines):
+    """Parse `docker history --human=false --no-trunc --format '{{.Size}}\t{{.CreatedBy}}'` output.
+
+    Returns:
+        List of dicts like {"size": 123456, "created_by": "RUN /bin/sh -c conda env create ..."}, newest layer first
+    """
+    layers = []
+    for line in lines:
+        size, _, created_by = line.rstrip("\n").partition("\t")
+        if size.strip().isdigit():
+            layers.append({"size": int(size), "created_by": " ".join(created_by.split())})
+    return layers
+
+
+def _format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def format_image_metrics_report(current, previous=None, max_layers=5):
+    """Summarize an image's size and build time, compared with the previous build of the same image.
+
+    Args:
+        current: Dict {"size": bytes, "build_seconds": ..., "layers": parse_docker_history() rows}
+        previous: The same dict from the previous build, or None
+        max_layers: Number of largest layers to list
+
+    Returns:
+        Report like "Image size: 9.8 GB (-2.1 GB vs previous build), build time 812s (-140s)" plus the largest layers
+    """
+    size_line = f"Image size: {_format_bytes(current['size'])}"
+    time_line = f"build time {current['build_seconds']:.0f}s"
+    if previous:
+        size_delta = current["size"] - previous["size"]
+        time_delta = current["build_seconds"] - previous["build_seconds"]
+        size_line += f" ({'+' if size_delta >= 0 else '-'}{_format_bytes(abs(size_delta))} vs previous build)"
+        time_line += f" ({time_delta:+.0f}s)"
+    lines = [f"{size_line}, {time_line}", "Largest layers:"]
+    for layer in sorted(current["layers"], key=lambda layer: layer["size"], reverse=True)[:max_layers]:
+        lines.append(f"  {_format_bytes(layer['size']):>9}  {layer['created_by'][:100]}")
+    return "\n".join(lines)
+
+
+def _image_metrics_path(image_name, cache_dir=None):
+    return os.path.join(cache_dir or get_pipeline_cache_dir(), "image-metrics", f"{image_name}.json")
+
+
+def load_image_metrics(image_name, cache_dir=None):
+    """The metrics stored by record_image_metrics() for the last published build of an image, or None."""
+    path = _image_metrics_path(image_name, cache_dir)
+    if os.path.exists(path):
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+    return None
+
+
+def record_image_metrics(image_name, metrics, cache_dir=None):
+    """Store an image's metrics in the pipeline cache and return the previous build's, if any."""
+    path = _image_metrics_path(image_name, cache_dir)
+    previous = load_image_metrics(image_name, cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({key: metrics[key] for key in ("size", "build_seconds")}, f)
+    return previous
+
+
+def get_docker_client():
+    """Docker Engine API client configured from the environment (DOCKER_HOST etc.), or None to use the docker CLI."""
+    if docker is None:
+        return None
+    try:
+        client = docker.from_env()
+        client.ping()
+        return client
+    except DockerException as e:
+        print(f"Docker Engine API unavailable, using the docker CLI: {e}")
+        return None
+
+
+def inspect_image_layers(image, client=None):
+    """Get an image's size and layers from the Engine API, or from the docker CLI without a client.
+
+    Returns:
+        Tuple (size in bytes, parse_docker_history() rows)
+    """
+    if client is not None:
+        size = client.api.inspect_image(image)["Size"]
+        history = [f"{layer['Size']}\t{layer.get('CreatedBy', '')}" for layer in client.api.history(image)]
+        return size, parse_docker_history(history)
+    size = subprocess.run(["docker", "image", "inspect", "-f", "{{.Size}}", image], check=True,
+                          capture_output=True, text=True).stdout.strip()
+    history = subprocess.run(["docker", "history", "--human=false", "--no-trunc", "--format", "{{.Size}}\t{{.CreatedBy}}", image],
+                             check=True, capture_output=True, text=True).stdout.splitlines()
+    return int(size), parse_docker_history(history)
+
+
+def get_registry_image(ref):
+    """Look up an image in its registry without pulling it.
+
+    Args:
+        ref: Image reference like "user/pyhc-environment:latest"
+
+    Returns:
+        Dict {"digest": "sha256:...", "labels": {...}}, or None if it doesn't exist or can't be read
+    """
+    result = subprocess.run(["docker", "buildx", "imagetools", "inspect", ref, "--format", "{{json .}}"],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    try:
+        data = json.loads(result.stdout)
+    except ValueError:
+        return None
+    digest = (data.get("manifest") or {}).get("digest")
+    image = data.get("image") or {}
+    if "config" not in image and image:
+        # Multi-platform index: a config per platform, all built from the same context
+        image = image.get("linux/amd64") or next(iter(image.values()))
+    labels = (image.get("config") or {}).get("Labels") or {}
+    return {"digest": digest, "labels": labels} if digest else None
+
+
+def resolve_base_digests(dockerfile_path):
+    """Map each external base image of a Dockerfile to its current registry digest (None if it can't be resolved)."""
+    digests = {}
+    for ref in parse_base_images(dockerfile_path):
+        image = get_registry_image(ref)
+        digests[ref] = image["digest"] if image else None
+    return digests
+
+
+def find_reusable_image(ref, context_hash):
+    """Digest of the image at ref if it was built from a context with this hash, else None."""
+    image = get_registry_image(ref)
+    if image and image["labels"].get(CONTEXT_HASH_LABEL) == context_hash:
+        return image["digest"]
+    return None
+
+
+def run_streaming(command, render=None):
+    """Run a command, echoing its combined output as it arrives.
+
+    Args:
+        command: Command as an argument list
+        render: Optional function turning an output line into the text to echo (e.g. format_build_event)
+
+    Returns:
+        List of output lines
+
+    Raises:
+        subprocess.CalledProcessError: If the command fails
+    """
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    lines = []
+    for line in process.stdout:
+        print(line if render is None else render(line), end="", flush=True)
+        lines.append(line)
+    if process.wait() != 0:
+        raise subprocess.CalledProcessError(process.returncode, command)
+    return lines
+
+
 def build_and_push_docker_images(docker_folder_path, docker_username, docker_token, tag_suffix=""):
     """Build and push Docker images to Docker Hub.
 
@@ -35,56 +697,180 @@ def build_and_push_docker_images(docker_folder_path, docker_username, docker_tok
         docker_folder_path: Path to the docker folder containing image subdirectories.
         docker_username: Docker Hub username.
         docker_token: Docker Hub access token.
+
+    Images are built with BuildKit (docker buildx), whose structured progress stream (rawjson) is turned into a
+    JSON build report per image in PYHC_BUILD_REPORT_DIR (default build-reports/): duration, cache hit and layer
+    size of every Dockerfile instruction. Builds import and export the layer cache from the
+    `buildcache` tag of each image (disable with PYHC_REGISTRY_BUILD_CACHE=false) and from a local
+    directory if PYHC_BUILD_CACHE_DIR is set, so unchanged layers are restored instead of rebuilt.
+    Newly compiled wheels are then exported into the image's wheelhouse (see wheelhouse.py).
+    An image whose build context hash (see build_context.py) matches the label on its 'latest' image isn't rebuilt:
+    'latest' is tagged with the new version in the registry (disable with PYHC_SKIP_UNCHANGED_BUILDS=false).
+    An image more than PYHC_IMAGE_SIZE_BUDGET larger than the last published build isn't pushed at all, and the run
+    fails. Each other image is pushed once, by date tag, while the next one builds (at most PYHC_PUSH_CONCURRENCY at a
+    time), and 'latest' is copied from it in the registry.
     """
     today = datetime.now().strftime("%Y.%m.%d")
     normalized_suffix = normalize_tag_suffix(tag_suffix)
     version_tag = f"v{today}{normalized_suffix}"
     docker_image_names = get_docker_image_names(docker_folder_path)
+    registry_cache = os.environ.get("PYHC_REGISTRY_BUILD_CACHE", "true").lower() != "false"
+    local_cache_root = os.environ.get("PYHC_BUILD_CACHE_DIR")
+    report_dir = os.environ.get("PYHC_BUILD_REPORT_DIR", DEFAULT_BUILD_REPORT_DIR)
+    cache_reports = []
+    wheelhouse_reports = []
+    size_reports = []
+    slim_reports = []
+    push_reports = []
+    regression_lines = []
+    first_plot_reports = []
+    context_reports = []
+    skip_unchanged = os.environ.get("PYHC_SKIP_UNCHANGED_BUILDS", "true").lower() != "false"
+    build_args = {}  # --build-arg values; part of the build context hash
+    over_budget = []
+    budget = get_image_size_budget()
+    push_pool = ThreadPoolExecutor(max_workers=get_push_concurrency())
+    publish_jobs = []
 
     try:
-        # Docker login
-        login_command = f"echo {docker_token} | docker login -u {docker_username} --password-stdin"
-        subprocess.run(login_command, shell=True, check=True)
+        # Docker login (the CLI's credentials are also used by buildx for the registry cache and 'latest')
+        subprocess.run(["docker", "login", "-u", docker_username, "--password-stdin"],
+                       input=docker_token, text=True, check=True)
+        client = get_docker_client()
 
         for image_name in docker_image_names:
             date_tag = f"{docker_username}/{image_name}:{version_tag}"
             latest_tag = f"{docker_username}/{image_name}:latest"
 
-            # Build the Docker image with the date-based tag
-            build_command = f"docker build -t {date_tag} {docker_folder_path}/{image_name}"
+            # Skip the build if 'latest' was built from exactly this context; tag it with today's version instead
+            context_dir = f"{docker_folder_path}/{image_name}"
+            base_digests = resolve_base_digests(os.path.join(context_dir, "Dockerfile"))
+            context_hash = compute_context_hash(context_dir, base_digests, build_args)
+            reusable_digest = None
+            if skip_unchanged and all(base_digests.values()):
+                reusable_digest = find_reusable_image(latest_tag, context_hash)
+            if reusable_digest:
+                subprocess.run(["docker", "buildx", "imagetools", "create", "--prefer-index=false", "--tag", date_tag,
+                                f"{docker_username}/{image_name}@{reusable_digest}"], check=True)
+                context_reports.append(f"{image_name}: skip (build context {context_hash[:12]} unchanged; "
+                                       f"tagged {reusable_digest} as {version_tag})")
+                print(context_reports[-1])
+                continue
+            reason = "unchanged-build skipping disabled" if not skip_unchanged else (
+                "base image digest unknown" if not all(base_digests.values()) else "no image with this context")
+            context_reports.append(f"{image_name}: build (build context {context_hash[:12]}, {reason})")
+            print(context_reports[-1])
+
+            # Build the Docker image with the date-based tag, reusing cached layers
+            cache_ref = f"{docker_username}/{image_name}:{BUILD_CACHE_TAG}" if registry_cache else None
+            cache_dir = os.path.join(local_cache_root, image_name) if local_cache_root else None
+            cache_args = build_cache_args(cache_ref, cache_dir)
+            build_command = [
+                "docker", "buildx", "build", "--load", "--progress=rawjson",
+                *cache_args,
+                *[f"--build-arg={name}={value}" for name, value in sorted(build_args.items())],
+                f"--label={CONTEXT_HASH_LABEL}={context_hash}",
+                "-t", date_tag, context_dir,
+            ]
             print(f"Building image: {date_tag}")
-            subprocess.run(build_command, shell=True, check=True)
+            build_start = time.monotonic()
+            build_output = run_streaming(build_command, partial(format_build_event, seen={}))
+            build_seconds = time.monotonic() - build_start
+            build_steps, build_logs = parse_build_events(build_output)
+            slim_report = format_slim_report(parse_slim_report(build_logs))
+            print(slim_report)
+            slim_reports.append(f"{image_name}: {slim_report}")
+            wheelhouse_report = update_wheelhouse(context_dir, cache_args)
+            if wheelhouse_report:
+                print(wheelhouse_report)
+                wheelhouse_reports.append(f"{image_name}: {wheelhouse_report}")
+            if cache_dir:
+                rotate_local_build_cache(cache_dir)
+            cache_report = format_build_cache_report(build_steps)
+            print(cache_report)
+            cache_reports.append(f"{image_name}: {cache_report}")
+
+            # Report the image's size and largest layers against the previous build
+            size, layers = inspect_image_layers(date_tag, client)
+            metrics = {"size": size, "build_seconds": build_seconds, "layers": layers}
+            previous_metrics = load_image_metrics(image_name)
+            size_report = format_image_metrics_report(metrics, previous_metrics)
+            print(size_report)
+            size_reports.append(f"{image_name}: {size_report}")
 
-            # Push the date-based tagged image
-            push_command_date = f"docker push {date_tag}"
-            print(f"Pushing image: {date_tag}")
-            subprocess.run(push_command_date, shell=True, check=True)
+            # Machine-readable report of every Dockerfile instruction: duration, cache hit and layer size
+            build_report = {
+                "image": date_tag,
+                "built_at": datetime.now().isoformat(timespec="seconds"),
+                "build_seconds": round(build_seconds, 1),
+                "size": size,
+                "steps": attach_layer_sizes(build_steps, layers),
+                "first_plot": parse_first_plot(build_logs),
+            }
+            first_plot_report = format_first_plot_report(build_report["first_plot"])
+            print(first_plot_report)
+            first_plot_reports.append(f"{image_name}: {first_plot_report}")
+            print(f"Build report: {write_build_report(report_dir, image_name, version_tag, build_report)}")
 
-            # Tag the newly built image as 'latest'
-            retag_command = f"docker tag {date_tag} {latest_tag}"
-            print(f"Tagging {date_tag} as {latest_tag}")
-            subprocess.run(retag_command, shell=True, check=True)
+            # Compare the tracked steps with their rolling median over earlier builds (see build_history.py)
+            performance, regressions = record_build_performance(image_name, build_report)
+            print(format_build_summary(performance))
+            regression_lines += format_regressions(image_name, regressions)
 
-            # Push the 'latest' tagged image
-            push_command_latest = f"docker push {latest_tag}"
-            print(f"Pushing image: {latest_tag}")
-            subprocess.run(push_command_latest, shell=True, check=True)
+            # Nothing is pushed if the image grew more than the size budget over the last published build
+            within_budget, budget_message = check_size_budget(
+                size, (previous_metrics or {}).get("size"), budget)
+            print(budget_message)
+            size_reports.append(f"{image_name}: {budget_message}")
+            if not within_budget:
+                over_budget.append(date_tag)
+                remove_local_image(date_tag, client)
+                continue
+            record_image_metrics(image_name, metrics)
 
-            # Remove the images locally to free up disk space
-            remove_command_date = f"docker rmi {date_tag}"
-            print(f"Removing image: {date_tag}")
-            subprocess.run(remove_command_date, shell=True, check=True)
+            # Push while the next image builds
+            publish_jobs.append(push_pool.submit(publish_image, date_tag, latest_tag, client))
 
-            remove_command_latest = f"docker rmi {latest_tag}"
-            print(f"Removing image: {latest_tag}")
-            subprocess.run(remove_command_latest, shell=True, check=True)
+        for job in publish_jobs:
+            result = job.result()
+            push_report = format_push_report(result)
+            print(push_report)
+            push_reports.append(push_report)
+            print(f"Successfully processed: {result['tag']} and latest")
 
-            print(f"Successfully processed: {date_tag} and {latest_tag}")
+        if over_budget:
+            print(f"ERROR: {', '.join(over_budget)} exceeded the image size budget and {'was' if len(over_budget) == 1 else 'were'} "
+                  f"not pushed (raise PYHC_IMAGE_SIZE_BUDGET if the growth is expected)", flush=True)
+            set_github_output("image_size_report", "\n".join(size_reports))
+            set_github_output("slim_report", "\n".join(slim_reports))
+            set_github_output("push_report", "\n".join(push_reports))
+            set_github_output("should_run", "false")
+            sys.exit(1)
 
         # If we reach this point, we have successfully built and pushed today's images.
         # Set the output variable to the date-based version tag (e.g., v2024.12.19).
         # This assumes all images use the same date tag.
         set_github_output("docker_version", version_tag)
+        set_github_output("build_cache_report", "\n".join(cache_reports))
+        set_github_output("wheelhouse_report", "\n".join(wheelhouse_reports))
+        set_github_output("slim_report", "\n".join(slim_reports))
+        set_github_output("image_size_report", "\n".join(size_reports))
+        set_github_output("push_report", "\n".join(push_reports))
+        set_github_output("build_report_dir", report_dir)
+        set_github_output("first_plot_report", "\n".join(first_plot_reports))
+        set_github_output("build_context_report", "\n".join(context_reports))
+        set_github_output("build_skipped", str(bool(docker_image_names) and not publish_jobs).lower())
+        if regression_lines:
+            print("Build performance regressions:\n" + "\n".join(regression_lines))
+            set_github_output("build_regression_comment", "\n".join([
+                "**Build performance regressions (vs rolling median of earlier builds):**",
+                "```",
+                *regression_lines,
+                "```",
+            ]))
+        else:
+            print("No build performance regressions.")
+            set_github_output("build_regression_comment", "")
 
     except subprocess.CalledProcessError as e:
         print(f"Error during Docker operations: {e}", flush=True)
@@ -94,6 +880,8 @@ def build_and_push_docker_images(docker_folder_path, docker_username, docker_tok
         print(f"Unhandled exception: {e}", flush=True)
         set_github_output("should_run", "false")
         sys.exit(1)  # Exit the script with an error status
+    finally:
+        push_pool.shutdown()
 
 
 if __name__ == '__main__':
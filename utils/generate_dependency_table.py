@@ -7,22 +7,40 @@ __authors__ = ["Shawn Polson"]
 
 
 import openpyxl
-from openpyxl.styles import PatternFill
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import NamedStyle, PatternFill
+from packaging.requirements import Requirement
 from packaging.specifiers import SpecifierSet
 from packaging.specifiers import Specifier
+from packaging.utils import canonicalize_name
 from packaging.version import Version
 from packaging.version import InvalidVersion
+import numpy as np
 import pandas as pd
 
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import json
+import os
 import re
 import shlex
+import shutil
 import subprocess
+import tempfile
 
 try:
-    from utils.pipeline_utils import get_spec0_packages
+    from utils.pipeline_utils import get_spec0_packages, spec0_requirements_on
+    from utils.version_intervals import evaluate_range_grid
+    from utils.installed_distributions import get_installed_distributions
+    from utils.package_metadata import (
+        parse_resolved_versions, load_requires_dist, marker_environment, applicable_requirements,
+    )
 except ModuleNotFoundError:
-    from pipeline_utils import get_spec0_packages
+    from pipeline_utils import get_spec0_packages, spec0_requirements_on
+    from version_intervals import evaluate_range_grid
+    from installed_distributions import get_installed_distributions
+    from package_metadata import (
+        parse_resolved_versions, load_requires_dist, marker_environment, applicable_requirements,
+    )
 
 # Named fills for spreadsheet highlighting
 GREEN = PatternFill(start_color="00ff00", end_color="00ff00", fill_type="solid")
@@ -32,6 +50,47 @@ RED = PatternFill(start_color="ff0000", end_color="ff0000", fill_type="solid")
 GRAY = PatternFill(start_color="aaaaaa", end_color="aaaaaa", fill_type="solid")
 DARK_GRAY = PatternFill(start_color="333333", end_color="333333", fill_type="solid")
 
+# Shared named styles registered once per workbook by the streaming spreadsheet writer
+FILL_STYLES = {
+    "PyHC Green": GREEN,
+    "PyHC Yellow": YELLOW,
+    "PyHC Orange": ORANGE,
+    "PyHC Red": RED,
+    "PyHC Gray": GRAY,
+    "PyHC Dark Gray": DARK_GRAY,
+}
+
+
+class DependencyCell:
+    """
+    One project's requirement on one dependency in table_data['project_data'].
+    The table is sparse: a project that doesn't use a dependency has no cell for it.
+    Unpacks like the (compatible, spec0_compliant, version_range) tuples it replaces.
+    """
+    __slots__ = ('compatible', 'spec0_compliant', 'version_range')
+
+    def __init__(self, compatible, spec0_compliant, version_range):
+        self.compatible = compatible
+        self.spec0_compliant = spec0_compliant
+        self.version_range = version_range
+
+    def __iter__(self):
+        return iter((self.compatible, self.spec0_compliant, self.version_range))
+
+    def __len__(self):
+        return 3
+
+    def __eq__(self, other):
+        if isinstance(other, (DependencyCell, tuple)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        return f"DependencyCell{tuple(self)!r}"
+
 
 # TODO: get fisspy pipdeptree via conda (get-dep-tree-for-fisspy-w-conda.sh)
 # TODO: sort final spreadsheet by lowercased names.
@@ -174,16 +233,12 @@ def spreadsheet_to_requirements_file(spreadsheet_path):
     return requirements_txt
 
 
-def get_packages_installed_in_environment():
+def get_packages_installed_in_environment(environment=None):
     """
-    :return: A lowercased list of the package names output by `pip list`.
+    :param environment: Path to a virtual environment to inspect (default: the current interpreter's)
+    :return: A list of the canonical names of the installed distributions (read from their metadata, not `pip list`).
     """
-    def parse_package_name(line):
-        return line.strip().split(" ")[0].lower()
-
-    pip_list_output = subprocess.check_output('pip list', shell=True).decode('utf-8')
-    package_lines = pip_list_output.split("\n")[2:]
-    return list(map(parse_package_name, package_lines))
+    return list(get_installed_distributions(environment))
 
 
 def test_combine_ranges():
@@ -783,9 +838,8 @@ def parse_uv_tree_output(package, output_str):
 
 def _build_dependency_tree_command(package, use_installed, installed_packages):
     base_package = get_base_package_name(package)
-    base_package_lower = base_package.lower()
 
-    if use_installed and base_package_lower in installed_packages:
+    if use_installed and canonicalize_name(base_package) in installed_packages:
         return f"uv pip tree --show-version-specifiers --package {shlex.quote(base_package)}"
 
     if package.startswith("git+"):
@@ -807,9 +861,9 @@ def _build_dependency_tree_command(package, use_installed, installed_packages):
     return f"./utils/get-dep-tree-for-package.sh {shlex.quote(package)}"
 
 
-def _get_package_dependencies(package, use_installed, installed_packages):
+def _get_package_dependencies(package, use_installed, installed_packages, env=None):
     command = _build_dependency_tree_command(package, use_installed, installed_packages)
-    output_str = subprocess.check_output(command, shell=True, text=True)
+    output_str = subprocess.check_output(command, shell=True, text=True, env=env)
     package_version, dependencies = parse_uv_tree_output(package, output_str)
     dependencies[get_base_package_name(package)] = f"=={package_version}"
     sorted_dependencies = {key: value for key, value in sorted(dependencies.items())}
@@ -817,12 +871,56 @@ def _get_package_dependencies(package, use_installed, installed_packages):
     return package_w_version, sorted_dependencies
 
 
+def summarize_extraction_stats(stats_path):
+    """
+    Summarize the per-worker disk and IO usage lines written by utils/dep-tree-env.sh.
+    :param stats_path: Path of the JSON lines file passed to the workers as PYHC_DEP_TREE_STATS_FILE
+    :return: Dict like {'venvs': 80, 'tmpfs': 0, 'venv_mb': 41000.0, 'largest_venv': ('sunpy[all]', 2100.0),
+             'read_mb': 120.5, 'write_mb': 35.2, 'link_modes': {'hardlink': 80}}, or None if no worker reported
+    """
+    try:
+        with open(stats_path, 'r') as f:
+            stats = [json.loads(line) for line in f if line.strip()]
+    except (OSError, ValueError):
+        return None
+    if not stats:
+        return None
+
+    largest = max(stats, key=lambda s: s['venv_kb'])
+    link_modes = {}
+    for s in stats:
+        link_modes[s['link_mode']] = link_modes.get(s['link_mode'], 0) + 1
+    return {
+        'venvs': len(stats),
+        'tmpfs': sum(s['scratch'] == "tmpfs" for s in stats),
+        'venv_mb': sum(s['venv_kb'] for s in stats) / 1024,
+        'largest_venv': (largest['package'], largest['venv_kb'] / 1024),
+        'read_mb': sum(s['read_bytes'] for s in stats) / 1024 ** 2,
+        'write_mb': sum(s['write_bytes'] for s in stats) / 1024 ** 2,
+        'link_modes': link_modes,
+    }
+
+
+def _print_extraction_stats(stats_path):
+    summary = summarize_extraction_stats(stats_path)
+    if summary is None:
+        return
+    link_modes = ", ".join(f"{mode or 'default'}: {count}" for mode, count in sorted(summary['link_modes'].items()))
+    print(
+        f"Extraction IO: {summary['venvs']} venvs ({summary['tmpfs']} on tmpfs; link modes {link_modes}), "
+        f"{summary['venv_mb']:.0f} MB of venvs, {summary['read_mb']:.0f} MB read / {summary['write_mb']:.0f} MB written to disk; "
+        f"largest venv {summary['largest_venv'][0]} ({summary['largest_venv'][1]:.0f} MB)",
+        flush=True,
+    )
+
+
 def get_dependency_ranges_by_package(packages, use_installed=False, max_workers=1):
     """
     TODO: rename func to "get_dependency_ranges/requirements_for_packages()"?
     TODO: go back to "by project" wording?
     Gets each package's dependency requirements by creating temporary python environments to ensure pip installs work.
     Pre-installed package versions get used when use_installed is True, otherwise the latest package versions get used.
+    Each worker's disk and IO usage is summarized at the end (see utils/dep-tree-env.sh).
     :param packages: List of packages like ['hapiclient', 'sunpy'] that may not be compatible together
     :param use_installed A Boolean for whether to try to use pre-installed package versions
     :param max_workers: Number of worker threads to use when extracting package trees.
@@ -832,6 +930,20 @@ def get_dependency_ranges_by_package(packages, use_installed=False, max_workers=
         max_workers = 1
 
     installed_packages = set(get_packages_installed_in_environment())
+    stats_fd, stats_path = tempfile.mkstemp(prefix="pyhc-dep-tree-stats-", suffix=".jsonl")
+    os.close(stats_fd)
+    # Per-run tmpfs scratch and uv cache, only used with PYHC_DEP_TREE_TMPFS=1
+    tmpfs_root = f"/dev/shm/pyhc-dep-tree-{os.getpid()}"
+    env = {**os.environ, "PYHC_DEP_TREE_STATS_FILE": stats_path, "PYHC_DEP_TREE_TMPFS_ROOT": tmpfs_root}
+    try:
+        return _extract_dependency_ranges(packages, use_installed, installed_packages, max_workers, env)
+    finally:
+        _print_extraction_stats(stats_path)
+        os.remove(stats_path)
+        shutil.rmtree(tmpfs_root, ignore_errors=True)
+
+
+def _extract_dependency_ranges(packages, use_installed, installed_packages, max_workers, env):
     all_dependencies = {}
     total_packages = len(packages)  # for progress tracking output
 
@@ -841,7 +953,7 @@ def get_dependency_ranges_by_package(packages, use_installed=False, max_workers=
             flush=True,
         )
         package_w_version, dependencies = _get_package_dependencies(
-            package, use_installed, installed_packages
+            package, use_installed, installed_packages, env
         )
         return index, package_w_version, dependencies
 
@@ -872,6 +984,87 @@ def get_dependency_ranges_by_package(packages, use_installed=False, max_workers=
     return all_dependencies
 
 
+def normalize_declared_range(specifier):
+    """
+    Normalize a Requires-Dist specifier the same way `parse_uv_tree_output()` normalizes uv's "[required: ...]" ranges.
+    """
+    version_range = str(specifier)
+    if not version_range:
+        return "any"
+    version_range = remove_wildcards(version_range)
+    return reorder_requirements(normalize_compatible_releases(version_range))
+
+
+def get_dependency_ranges_from_lockfile(packages, resolved_versions, python_version=None, max_workers=8):
+    """
+    Lockfile-only equivalent of `get_dependency_ranges_by_package()`: walks each package's dependency tree through
+    the resolved set using cached Requires-Dist metadata, so nothing gets installed and no venvs are created.
+    :param packages: List of packages.txt entries like ['hapiclient==0.3.3', 'pyhc-core[tests]==0.0.8']
+    :param resolved_versions: Dict like {'numpy': '2.2.6', ...} from `package_metadata.parse_resolved_versions()`
+    :param python_version: Target Python version like "3.12" for evaluating environment markers
+    :param max_workers: Maximum concurrent PyPI metadata requests for uncached distributions
+    :return: Dict like {'hapiclient==0.3.3': {'package1': '>=1.0'}, ...} (dependencies sorted alphabetically)
+    """
+    environment = marker_environment(python_version)
+    requires_dist = {}
+
+    def _requirements(name, extras):
+        return [
+            requirement for requirement in applicable_requirements(requires_dist[(name, resolved_versions[name])], extras, environment)
+            if canonicalize_name(requirement.name) in resolved_versions
+        ]
+
+    # Resolve the roots, then fetch metadata for the reachable part of the resolved set one level at a time
+    roots = []
+    for package in packages:
+        if package.startswith("git+"):
+            print(f"Skipping {package}: no resolved metadata for git packages")
+            continue
+        root = Requirement(package)
+        name = canonicalize_name(root.name)
+        if name not in resolved_versions:
+            print(f"Skipping {package}: not in the resolved set")
+            continue
+        roots.append((package, name, frozenset(root.extras)))
+
+    frontier = {(name, extras) for _, name, extras in roots}
+    seen = set()
+    while frontier:
+        requires_dist.update(load_requires_dist(
+            [(name, resolved_versions[name]) for name, _ in frontier if (name, resolved_versions[name]) not in requires_dist],
+            max_workers=max_workers,
+        ))
+        seen |= frontier
+        frontier = {
+            (canonicalize_name(requirement.name), frozenset(requirement.extras))
+            for name, extras in frontier
+            for requirement in _requirements(name, extras)
+        } - seen
+
+    all_dependencies = {}
+    for package, name, extras in roots:
+        dependencies = {}
+        stack = [(name, extras)]
+        visited = set()
+        while stack:
+            node = stack.pop()
+            if node in visited:
+                continue
+            visited.add(node)
+            for requirement in _requirements(*node):
+                dependency = canonicalize_name(requirement.name)
+                dependencies[dependency] = determine_version_range(
+                    dependencies, dependency, normalize_declared_range(requirement.specifier)
+                )
+                stack.append((dependency, frozenset(requirement.extras)))
+
+        version = resolved_versions[name]
+        dependencies[get_base_package_name(package)] = f"=={version}"
+        package_w_version = f"{package}=={version}" if "==" not in package else package
+        all_dependencies[package_w_version] = {key: value for key, value in sorted(dependencies.items())}
+    return all_dependencies
+
+
 def get_dependency_ranges_for_environment(env_packages, full_path_to_pipdeptree=None):
     """
     TODO: rename func to "find_common_environment_dependency_ranges/requirements()"
@@ -903,6 +1096,7 @@ def reduce_environment_requirements(project_dependencies, allow_conflicts=True):
     :param allow_conflicts: Boolean that, when False, will raise an exception the moment a conflict is found.
     :return: Dict like {'package1': '>=1.0,<2.0', 'package2': 'None', ...} made by combining all package requirements (sorted alphabetically).
              Note: if dependency conflicts exist for a package and allow_conflicts=True, its allowed range will be None.
+             See `version_intervals.IncrementalRequirementReducer` to update the result when one project changes.
     """
     all_dependencies = {}
     for project, project_dependencies in project_dependencies.items():
@@ -938,19 +1132,13 @@ def are_compatible(allowed_range, package_range):
         return False
 
 
-def is_spec0_compliant(package_name, version_range, spec0_requirements):
+def _prepare_spec0_range(version_range):
     """
-    Check if a package's version range is compatible with SPEC 0 requirements.
-
-    :param package_name: String like "numpy"
+    Normalize a project's version range for a SPEC 0 check.
     :param version_range: String like ">=1.5.0,<2.0" or None
-    :param spec0_requirements: Dict like {"numpy": ">=2.0.0", "scipy": ">=1.12.0", ...}
-    :return: Boolean or None (None if package not in SPEC 0)
+    :return: Either a Boolean when the range decides compliance on its own (e.g. "any" or None),
+             or the normalized range String to compare against the SPEC 0 requirement.
     """
-    spec0_key = package_name.lower()
-    if spec0_key not in spec0_requirements:
-        return None  # Not a SPEC 0 package
-
     if version_range is None or not isinstance(version_range, str):
         return False
 
@@ -966,12 +1154,111 @@ def is_spec0_compliant(package_name, version_range, spec0_requirements):
     normalized_range = reorder_requirements(normalized_range)
     if not normalized_range:
         return False
+    return normalized_range
+
+
+def is_spec0_compliant(package_name, version_range, spec0_requirements):
+    """
+    Check if a package's version range is compatible with SPEC 0 requirements.
+
+    :param package_name: String like "numpy"
+    :param version_range: String like ">=1.5.0,<2.0" or None
+    :param spec0_requirements: Dict like {"numpy": ">=2.0.0", "scipy": ">=1.12.0", ...}
+    :return: Boolean or None (None if package not in SPEC 0)
+    """
+    spec0_key = package_name.lower()
+    if spec0_key not in spec0_requirements:
+        return None  # Not a SPEC 0 package
+
+    normalized_range = _prepare_spec0_range(version_range)
+    if isinstance(normalized_range, bool):
+        return normalized_range
 
     # Check if ranges are compatible (SPEC 0 requirement first, project range second)
     spec0_specifier = spec0_requirements[spec0_key]
     return are_compatible(spec0_specifier, normalized_range)
 
 
+def compatibility_grid(allowed_ranges, range_grid):
+    """
+    Array version of calling `are_compatible(allowed_ranges[d], range_grid[p][d])` for every cell.
+    :param allowed_ranges: List of D allowed range Strings (None where the dependency has a conflict)
+    :param range_grid: List of P lists of D project range Strings (None where the project doesn't use the dependency)
+    :return: (P, D) boolean array; False for unused cells and for every cell of a conflicting dependency
+    """
+    compatible, fallback = evaluate_range_grid(allowed_ranges, range_grid)
+    # Ranges the interval encoding can't express go through the scalar range logic
+    for p, d in zip(*np.nonzero(fallback)):
+        compatible[p, d] = are_compatible(allowed_ranges[d], range_grid[p][d])
+    return compatible
+
+
+def spec0_compliance_grid(dependency_names, range_grid, spec0_requirements):
+    """
+    Array version of calling `is_spec0_compliant()` for every used cell of range_grid.
+    :param dependency_names: List of D package names like ["numpy", "requests", ...]
+    :param range_grid: List of P lists of D project range Strings (None where the project doesn't use the dependency)
+    :param spec0_requirements: Dict like {"numpy": ">=2.0.0", "scipy": ">=1.12.0", ...}
+    :return: (P, D) object array of True/False/None (None for unused cells and non-SPEC 0 packages)
+    """
+    n_projects = len(range_grid)
+    compliance = np.full((n_projects, len(dependency_names)), None, dtype=object)
+    spec0_columns = [d for d, name in enumerate(dependency_names) if name.lower() in spec0_requirements]
+    if not spec0_columns or not n_projects:
+        return compliance
+
+    spec0_ranges = [spec0_requirements[dependency_names[d].lower()] for d in spec0_columns]
+    normalized_grid = []
+    decided = []
+    for p, row in enumerate(range_grid):
+        normalized_row = []
+        for d in spec0_columns:
+            version_range = row[d]
+            if version_range is None:
+                normalized_row.append(None)
+                continue
+            prepared = _prepare_spec0_range(version_range)
+            if isinstance(prepared, bool):
+                decided.append((p, d, prepared))
+                normalized_row.append(None)
+            else:
+                normalized_row.append(prepared)
+        normalized_grid.append(normalized_row)
+
+    compatible = compatibility_grid(spec0_ranges, normalized_grid)
+    for k, d in enumerate(spec0_columns):
+        for p in range(n_projects):
+            if normalized_grid[p][k] is not None:
+                compliance[p, d] = bool(compatible[p, k])
+    for p, d, verdict in decided:
+        compliance[p, d] = verdict
+    return compliance
+
+
+def build_dependency_index(project_data):
+    """
+    Invert project_data into dependency -> cells, so reports only visit the cells of the dependencies they ask about.
+    :param project_data: table_data['project_data'] (legacy cell shapes are accepted)
+    :return: Dict like {'numpy': [('sunpy==7.0.0', DependencyCell(True, True, '>=1.25')), ...], ...}
+             with each dependency's cells in project order
+    """
+    index = {}
+    for project, package_name, compatible, spec0_compliant, version_range in _iter_project_cells(project_data):
+        index.setdefault(package_name, []).append((project, DependencyCell(compatible, spec0_compliant, version_range)))
+    return index
+
+
+def _get_dependency_index(table_data):
+    """
+    :return: The dependency index built by `generate_dependency_table_data()`, or one built from project_data
+    """
+    index = table_data.get("dependency_index")
+    if index is None:
+        project_data = table_data.get("project_data")
+        index = build_dependency_index(project_data) if isinstance(project_data, dict) else {}
+    return index
+
+
 def _format_requirement_for_text(package_name, version_range):
     """
     Format a package requirement like "numpy>=2.0.0" for text output.
@@ -984,37 +1271,117 @@ def _format_requirement_for_text(package_name, version_range):
     return f"{package_name}{cleaned}"
 
 
+def _iter_project_cells(project_data):
+    """
+    Iterate the populated cells of project_data, accepting DependencyCell records as well as legacy
+    (compatible, spec0_compliant, version_range) / (compatible, version_range) tuples and bare range strings.
+    :return: Generator of (project, package_name, compatible, spec0_compliant, version_range)
+    """
+    for project, dependency_data in project_data.items():
+        for package_name, values in dependency_data.items():
+            if isinstance(values, (DependencyCell, tuple)):
+                if len(values) >= 3:
+                    compatible, spec0_compliant, version_range = tuple(values)[:3]
+                elif len(values) == 2:
+                    (compatible, version_range), spec0_compliant = values, None
+                else:
+                    compatible = spec0_compliant = version_range = None
+            else:
+                compatible, spec0_compliant, version_range = None, None, values
+            yield project, package_name, compatible, spec0_compliant, version_range
+
+
 def find_spec0_problems(table_data):
     """
     Return a list of human-readable SPEC 0 incompatibilities found in table_data.
     """
     if not isinstance(table_data, dict):
         return []
-    project_data = table_data.get("project_data")
     spec0_requirements = table_data.get("spec0_requirements", {})
-    if not isinstance(project_data, dict) or not spec0_requirements:
+    if not spec0_requirements:
         return []
 
     problems = []
-    for project, dependency_data in project_data.items():
-        project_name = project.split("==")[0] if isinstance(project, str) else str(project)
-        for package_name, values in dependency_data.items():
-            if not isinstance(values, tuple) or len(values) < 3:
-                continue
-            _, spec0_compliant, version_range = values
-            if spec0_compliant is False:
-                spec0_req = spec0_requirements.get(package_name.lower())
-                if not spec0_req:
-                    continue
-                project_req = _format_requirement_for_text(package_name, version_range)
-                spec0_req_text = _format_requirement_for_text(package_name, spec0_req)
+    index = _get_dependency_index(table_data)
+    for package_name, cells in index.items():
+        spec0_req = spec0_requirements.get(package_name.lower())
+        if not spec0_req:
+            continue
+        spec0_req_text = _format_requirement_for_text(package_name, spec0_req)
+        for project, cell in cells:
+            if cell.spec0_compliant is False:
+                project_name = project.split("==")[0] if isinstance(project, str) else str(project)
+                project_req = _format_requirement_for_text(package_name, cell.version_range)
                 problems.append((project_name, package_name, project_req, spec0_req_text))
 
+    return _format_spec0_problems(problems)
+
+
+def _format_spec0_problems(problems):
+    """
+    :param problems: List of (project_name, package_name, project_req, spec0_req) tuples
+    :return: Sorted problem strings like "sunpy: requires numpy>=1.23 but SPEC 0 requires numpy>=2.0.0"
+    """
     problems = sorted(problems, key=lambda x: (x[0].lower(), x[1].lower()))
     return [f"{project}: requires {project_req} but SPEC 0 requires {spec0_req}"
             for project, _, project_req, spec0_req in problems]
 
 
+def forecast_spec0_problems(table_data, drop_schedule, dates):
+    """
+    Evaluate every project's SPEC 0 compliance against several (e.g. future) dates in one array pass.
+    :param table_data: The data structure returned from `generate_dependency_table_data()`
+    :param drop_schedule: Dict from `build_spec0_drop_schedule()` like {"numpy": [(Version('2.0.0'), released, dropped), ...]}
+    :param dates: List of datetimes to evaluate SPEC 0 at
+    :return: Dict mapping each date to a list of problems formatted like `find_spec0_problems()`
+    """
+    requirements_by_date = [spec0_requirements_on(drop_schedule, date) for date in dates]
+    forecast = {date: [] for date in dates}
+
+    # One column per (SPEC 0 package, date) pair, one row per project cell on a SPEC 0 package
+    columns = []
+    for t, requirements in enumerate(requirements_by_date):
+        for package_name, spec0_range in requirements.items():
+            columns.append((t, package_name, spec0_range))
+    column_index = {}
+    for c, (t, package_name, _) in enumerate(columns):
+        column_index.setdefault(package_name, []).append(c)
+
+    rows = []
+    range_grid = []
+    for package_name, cells in _get_dependency_index(table_data).items():
+        package_columns = column_index.get(package_name.lower())
+        if not package_columns:
+            continue
+        for project, cell in cells:
+            prepared = _prepare_spec0_range(cell.version_range)
+            row = [None] * len(columns)
+            if not isinstance(prepared, bool):
+                for c in package_columns:
+                    row[c] = prepared
+            rows.append((project, package_name, cell.version_range, prepared))
+            range_grid.append(row)
+
+    if not rows:
+        return forecast
+
+    compliant = compatibility_grid([spec0_range for _, _, spec0_range in columns], range_grid)
+    for r, (project, package_name, version_range, prepared) in enumerate(rows):
+        project_name = project.split("==")[0] if isinstance(project, str) else str(project)
+        for c in column_index[package_name.lower()]:
+            verdict = prepared if isinstance(prepared, bool) else bool(compliant[r, c])
+            if verdict is False:
+                t, _, spec0_range = columns[c]
+                forecast[dates[t]].append((
+                    project_name,
+                    package_name,
+                    _format_requirement_for_text(package_name, version_range),
+                    _format_requirement_for_text(package_name, spec0_range),
+                ))
+
+    return {date: _format_spec0_problems(problems) for date, problems in forecast.items()}
+
+
 def find_dependency_conflicts(table_data):
     """
     Return a list of human-readable dependency conflicts found in table_data.
@@ -1048,29 +1415,16 @@ def find_dependency_conflicts(table_data):
     if not conflicting_packages:
         return []
 
-    project_data = table_data.get("project_data", {})
-    if not isinstance(project_data, dict):
-        return []
-
+    # Find which projects require each conflicting package and what their requirements are
+    index = _get_dependency_index(table_data)
     conflicts = []
     for conflicting_pkg in sorted(conflicting_packages):
-        # Find which projects require this package and what their requirements are
         involved_projects = []
-        for project, dependency_data in project_data.items():
-            project_name = project.split("==")[0] if isinstance(project, str) else str(project)
-            if conflicting_pkg in dependency_data:
-                values = dependency_data[conflicting_pkg]
-                if isinstance(values, tuple):
-                    if len(values) >= 3:
-                        version_range = values[2]  # Third element is project requirement range.
-                    elif len(values) >= 2:
-                        version_range = values[1]
-                    else:
-                        version_range = None
-                else:
-                    version_range = values
-                if version_range and str(version_range).lower() != "any":
-                    involved_projects.append(f"{project_name} requires {conflicting_pkg}{version_range}")
+        for project, cell in index.get(conflicting_pkg, []):
+            version_range = cell.version_range
+            if version_range and str(version_range).lower() != "any":
+                project_name = project.split("==")[0] if isinstance(project, str) else str(project)
+                involved_projects.append(f"{project_name} requires {conflicting_pkg}{version_range}")
 
         if involved_projects:
             conflict_desc = f"Conflict for '{conflicting_pkg}': " + "; ".join(involved_projects)
@@ -1245,10 +1599,6 @@ def merge_dependencies(core_dependencies, other_dependencies):
     return merged_dict
 
 
-# TODO: Need func table_data_to_2D_array(table_data) that flattens table_data
-#       (biggest change: lots of {'package': (None, None, None)} cells where projects don't use that dependency).
-
-
 def generate_dependency_table_data(packages, core_env_packages=[], max_workers=1):
     """
     Generates a data structure that can populate a dependency conflict table.
@@ -1262,11 +1612,15 @@ def generate_dependency_table_data(packages, core_env_packages=[], max_workers=1
                           'project_data':
                               {
                                'PyHC Package 1':
-                                  {'package1': (True,'>=1.0'), 'package2': (False,'<23.0')},
+                                  {'package1': DependencyCell(True, None, '>=1.0'), 'package2': DependencyCell(False, None, '<23.0')},
                                'PyHC Package 2': ...
-                              }
+                              },
+                          'spec0_requirements':
+                              {'numpy': '>=2.0.0', ...},
+                          'dependency_index':
+                              {'package1': [('PyHC Package 1', DependencyCell(True, None, '>=1.0')), ...], ...}
                          }
-             with version range data cleaned for Excel.
+             with version range data cleaned for Excel. project_data is sparse: dependencies a project doesn't use are absent.
     """
     core_deps_by_project = get_dependency_ranges_by_package(
         core_env_packages,
@@ -1277,6 +1631,52 @@ def generate_dependency_table_data(packages, core_env_packages=[], max_workers=1
         packages,
         max_workers=max_workers,
     )
+    return build_dependency_table_data(core_deps_by_project, other_deps_by_project)
+
+
+def generate_dependency_table_data_from_lockfile(packages, lockfile_path, python_version=None, max_workers=8):
+    """
+    Fast variant of `generate_dependency_table_data()` that reads the resolved set from a lockfile and each
+    distribution's declared requirements from cached PyPI metadata instead of installing packages into venvs.
+    :param packages: A list of PyHC packages from packages.txt
+    :param lockfile_path: Path to resolved-versions.txt (or the fresh compile output)
+    :param python_version: Target Python version like "3.12" for evaluating environment markers
+    :param max_workers: Maximum concurrent PyPI metadata requests
+    :return: table_data dict (see `generate_dependency_table_data()`)
+    """
+    resolved_versions = parse_resolved_versions(lockfile_path)
+    deps_by_project = get_dependency_ranges_from_lockfile(
+        packages, resolved_versions, python_version=python_version, max_workers=max_workers
+    )
+    return build_dependency_table_data({}, deps_by_project)
+
+
+def get_spec0_requirements():
+    """
+    :return: Current SPEC 0 requirements as a dict like {"numpy": ">=2.0.0", "scipy": ">=1.11.0", ...}
+    """
+    spec0_reqs_list = get_spec0_packages()  # ["numpy>=2.0.0", "scipy>=1.11.0", ...]
+    spec0_requirements = {}
+    for req in spec0_reqs_list:
+        # Parse "numpy>=2.0.0" into {"numpy": ">=2.0.0"}
+        match = re.match(r'^([a-zA-Z0-9_-]+)(.*)$', req)
+        if match:
+            pkg_name = match.group(1).lower()
+            version_spec = match.group(2).strip()
+            if version_spec:
+                spec0_requirements[pkg_name] = version_spec
+    return spec0_requirements
+
+
+def build_dependency_table_data(core_deps_by_project, other_deps_by_project, spec0_requirements=None):
+    """
+    Builds the dependency conflict table data from already-extracted project requirements
+    (see `generate_dependency_table_data()` for the returned structure).
+    :param core_deps_by_project: Dict like {'sunpy==7.0.0': {'numpy': '>=1.25', ...}, ...} for projects that must not conflict
+    :param other_deps_by_project: Dict like {'aiapy==0.12.1': {'numpy': '>=1.23', ...}, ...}
+    :param spec0_requirements: Dict like {"numpy": ">=2.0.0", ...} (default: current SPEC 0 requirements)
+    :return: table_data dict
+    """
     all_deps_by_project = {**core_deps_by_project, **other_deps_by_project}
 
     # import pickle  # TODO: delete pickling
@@ -1305,16 +1705,8 @@ def generate_dependency_table_data(packages, core_env_packages=[], max_workers=1
     all_dependencies = merge_dependencies(core_dependencies, other_dependencies)
 
     # Parse SPEC 0 requirements once
-    spec0_reqs_list = get_spec0_packages()  # ["numpy>=2.0.0", "scipy>=1.11.0", ...]
-    spec0_requirements = {}
-    for req in spec0_reqs_list:
-        # Parse "numpy>=2.0.0" into {"numpy": ">=2.0.0"}
-        match = re.match(r'^([a-zA-Z0-9_-]+)(.*)$', req)
-        if match:
-            pkg_name = match.group(1).lower()
-            version_spec = match.group(2).strip()
-            if version_spec:
-                spec0_requirements[pkg_name] = version_spec
+    if spec0_requirements is None:
+        spec0_requirements = get_spec0_requirements()
 
     table_data = {
         'core_dependencies': core_dependencies,
@@ -1322,18 +1714,36 @@ def generate_dependency_table_data(packages, core_env_packages=[], max_workers=1
         'project_data': {},
         'spec0_requirements': spec0_requirements
     }
-    for project, project_dependencies in all_deps_by_project.items():
-        table_data['project_data'][project] = {}
-        for package_name, version_range in project_dependencies.items():
-            allowed_range = all_dependencies[package_name]
-            # Always check SPEC 0 compliance for the individual package's version range
-            spec0_compliant = is_spec0_compliant(package_name, version_range, spec0_requirements)
-            if allowed_range is not None:
-                compatible = are_compatible(allowed_range, version_range)
-                table_data['project_data'][project][package_name] = (compatible, spec0_compliant, clean_range_str(version_range))
-            else:
-                # Conflict: allowed_range is None, but we still check SPEC 0 compliance
-                table_data['project_data'][project][package_name] = (False, spec0_compliant, clean_range_str(version_range))
+
+    # Evaluate compatibility and SPEC 0 compliance for the whole project x dependency grid at once
+    projects = list(all_deps_by_project.keys())
+    dependency_names = list(all_dependencies.keys())
+    dependency_columns = {name: d for d, name in enumerate(dependency_names)}
+    range_grid = [[None] * len(dependency_names) for _ in projects]
+    for p, project in enumerate(projects):
+        for package_name, version_range in all_deps_by_project[project].items():
+            range_grid[p][dependency_columns[package_name]] = version_range
+    allowed_ranges = [all_dependencies[name] for name in dependency_names]
+    compatible_grid = compatibility_grid(allowed_ranges, range_grid)  # always False where allowed range is None (conflict)
+    spec0_grid = spec0_compliance_grid(dependency_names, range_grid, spec0_requirements)
+
+    # Sparse cells: only dependencies a project actually uses get a record. Dependency names are shared
+    # with the allowed-range dicts and identical cleaned ranges are reused across projects.
+    # The dependency index shares the same cells, inverted (dependency -> projects) for the reports.
+    cleaned_ranges = {}
+    dependency_index = {name: [] for name in dependency_names}
+    for p, project in enumerate(projects):
+        project_cells = {}
+        for package_name, version_range in all_deps_by_project[project].items():
+            d = dependency_columns[package_name]
+            cleaned_range = cleaned_ranges.get(version_range)
+            if cleaned_range is None:
+                cleaned_range = cleaned_ranges[version_range] = clean_range_str(version_range)
+            cell = DependencyCell(bool(compatible_grid[p, d]), spec0_grid[p, d], cleaned_range)
+            project_cells[dependency_names[d]] = cell
+            dependency_index[dependency_names[d]].append((project, cell))
+        table_data['project_data'][project] = project_cells
+    table_data['dependency_index'] = dependency_index
 
     # Clean data and add row numbers (and SPEC 0 compliance for "Allowed Version Range" column)
     core_dependencies = clean_dependencies(table_data['core_dependencies'])
@@ -1348,44 +1758,6 @@ def generate_dependency_table_data(packages, core_env_packages=[], max_workers=1
     return table_data
 
 
-def pad_table_project_data(table_data):
-    """
-    TODO: consider using collections.OrderedDict if order becomes a problem.
-    TODO: put a bunk "N/A" -> (None, None, None) <unlikely-separator-val> entry in project_data between core and other deps, if there are core deps
-    :param table_data: The data structure returned from `generate_dependency_table_data()`
-    :return: table_data but with its project_data padded with None data for dependencies that projects don't use.
-    """
-    core_dependencies = table_data['core_dependencies']
-    other_dependencies = table_data['other_dependencies']
-    project_data = table_data['project_data']
-    temp_data = project_data
-
-    for project, dependency_data in project_data.items():
-        if core_dependencies:
-            # pad cells for core_dependencies,
-            # add {"N/A": (None, None, None)} as separator
-            for package_name in core_dependencies.keys():
-                if package_name not in dependency_data:
-                    temp_data[project][package_name] = (None, None, None)
-            sorted_data = {k: v for k, v in sorted(temp_data[project].items())}
-            temp_data[project] = sorted_data
-            temp_data[project]["N/A"] = (None, None, None)  # separator between core and other dependencies
-
-        # pad for other_dependencies
-        other_temp_data = {}
-        for package_name in other_dependencies.keys():
-            if package_name not in dependency_data:
-                #temp_data[project][package_name] = (None, None, None)
-                other_temp_data[package_name] = (None, None, None)
-            else:
-                other_temp_data[package_name] = dependency_data[package_name]
-
-        temp_data[project] = merge_dependencies(temp_data[project], other_temp_data)
-
-    table_data['project_data'] = temp_data
-    return table_data
-
-
 # def excel_spreadsheet_from_table_data(table_data):
 #     """
 #     :param table_data: The data structure returned from `generate_dependency_table_data()`
@@ -1453,8 +1825,41 @@ def pad_table_project_data(table_data):
 #     return workbook
 
 
+def register_fill_styles(workbook):
+    """
+    Register one shared named style per highlight fill so cells reference a style instead of each carrying a fill.
+    :param workbook: An openpyxl Workbook
+    """
+    for name, fill in FILL_STYLES.items():
+        workbook.add_named_style(NamedStyle(name=name, fill=fill))
+
+
+def styled_cell(worksheet, value, style_name=None):
+    cell = WriteOnlyCell(worksheet, value=value)
+    if style_name:
+        cell.style = style_name
+    return cell
+
+
+def _project_cell_style(compatible, spec0_compliant, allowed_spec0_compliant):
+    """
+    :return: The named fill style for a project's cell based on compatibility and SPEC 0 compliance
+    """
+    # Only check SPEC 0 if the "Allowed Version Range" is NOT definitively compliant
+    spec0_problem = allowed_spec0_compliant is not True and spec0_compliant is False
+    if compatible:
+        # Yellow: Compatible but SPEC 0 non-compliant
+        # Green: Compatible (and either SPEC 0 compliant or not a SPEC 0 package)
+        return "PyHC Yellow" if spec0_problem else "PyHC Green"
+    # Orange: Incompatible AND SPEC 0 non-compliant
+    # Red: Incompatible (regardless of SPEC 0 status)
+    return "PyHC Orange" if spec0_problem else "PyHC Red"
+
+
 def excel_spreadsheet_from_table_data(table_data):
     """
+    Build the dependency conflict table as a write-only workbook, streaming one row at a time.
+    Note: write-only workbooks can only be saved once.
     :param table_data: The data structure returned from `generate_dependency_table_data()`
     :return: The Excel workbook that is the dependency conflict table
     """
@@ -1470,92 +1875,115 @@ def excel_spreadsheet_from_table_data(table_data):
     # Extract data for Excel
     core_dependencies = table_data['core_dependencies']
     other_dependencies = table_data['other_dependencies']
-    all_dependencies = {**other_dependencies, **core_dependencies}  # shouldn't be overlap, but core values would win
     project_data = table_data['project_data']
+    projects = list(project_data.keys())
 
-    # Create a new workbook
-    workbook = openpyxl.Workbook()
+    # Index rows by row number so they can be emitted in order (core values win on overlap)
+    rows = {}
+    for package_name, (row, version_range, spec0_compliant) in other_dependencies.items():
+        rows[row] = (package_name, version_range, spec0_compliant, False)
+    for package_name, (row, version_range, spec0_compliant) in core_dependencies.items():
+        rows[row] = (package_name, version_range, spec0_compliant, True)
+    # Dark gray separator between core and other dependencies
+    separator_row = max(row for row, _, _ in core_dependencies.values()) + 1 if core_dependencies else None
+    last_row = max(list(rows.keys()) + [separator_row or 1])
 
-    # Select the active worksheet
-    worksheet = workbook.active
+    workbook = openpyxl.Workbook(write_only=True)
+    worksheet = workbook.create_sheet()
+    register_fill_styles(workbook)
 
     # Write headers to the worksheet
-    worksheet['A1'] = 'Package'
-    worksheet['B1'] = 'Allowed Version Range'
+    worksheet.append(['Package', 'Allowed Version Range'] + projects)
 
-    # Write data to the worksheet
-    if core_dependencies:
-        # Write core environment dependencies to the first two columns of the worksheet (shaded light gray)
-        for package_name, (row, version_range, spec0_compliant) in core_dependencies.items():
-            # Column 1 - Package
-            cell = worksheet.cell(row=row, column=1)
-            cell.value = package_name
-            cell.fill = GRAY
-
-            # Column 2 - Allowed Version Range (with SPEC 0 highlighting if applicable)
-            cell = worksheet.cell(row=row, column=2)
-            cell.value = version_range  # TODO: shouldn't ever be "N/A" but should I consider that case here anyway?
-            # Keep gray background for core dependencies, but note SPEC 0 status is tracked
-            cell.fill = GRAY
-
-        # Add a dark gray separator before other dependencies
-        cell = worksheet.cell(row=row+1, column=1)
-        cell.fill = DARK_GRAY
-        cell = worksheet.cell(row=row+1, column=2)
-        cell.fill = DARK_GRAY
-
-    # Write other environment dependencies to the first two columns of the worksheet
-    for package_name, (row, version_range, spec0_compliant) in other_dependencies.items():
-        # Column 1 - Package
-        cell = worksheet.cell(row=row, column=1)
-        cell.value = package_name
-
-        # Column 2 - Allowed Version Range (with SPEC 0 highlighting)
-        cell = worksheet.cell(row=row, column=2)
-        if version_range is not None:
-            cell.value = version_range
+    for row_num in range(2, last_row + 1):
+        if row_num == separator_row:
+            worksheet.append([styled_cell(worksheet, None, "PyHC Dark Gray"),
+                              styled_cell(worksheet, None, "PyHC Dark Gray")])
+            continue
+        if row_num not in rows:
+            worksheet.append([])
+            continue
+
+        package_name, version_range, allowed_spec0_compliant, is_core = rows[row_num]
+        if is_core:
+            # Core environment dependencies are shaded light gray (SPEC 0 status is still tracked)
+            row_cells = [styled_cell(worksheet, package_name, "PyHC Gray"),
+                         styled_cell(worksheet, version_range, "PyHC Gray")]
+        elif version_range is not None:
             # Yellow if SPEC 0 non-compliant, no color if compliant
-            if spec0_compliant is False:
-                cell.fill = YELLOW
+            row_cells = [package_name,
+                         styled_cell(worksheet, version_range, "PyHC Yellow" if allowed_spec0_compliant is False else None)]
         else:
-            # "N/A" means dependency conflict
-            cell.value = "N/A"
-            # Always red for conflicts in the allowed range column
-            cell.fill = RED
-
-    # Write project data to the worksheet one column at a time
-    for j, (project, dependency_data) in enumerate(project_data.items(), start=3):
-        worksheet.cell(row=1, column=j, value=project)  # column header
-        for package_name, (compatible, spec0_compliant, version_range) in dependency_data.items():
-            row_num = all_dependencies[package_name][0]
-            allowed_spec0_compliant = all_dependencies[package_name][2]  # SPEC 0 status of "Allowed Version Range"
-            cell = worksheet.cell(row=row_num, column=j)
-            if compatible is not None:
-                cell.value = version_range
-
-                # Determine cell color based on compatibility and SPEC 0 compliance
-                if compatible:
-                    # Green or Yellow: Package is compatible with allowed range
-                    # Only check SPEC 0 if the "Allowed Version Range" is NOT definitively compliant
-                    if allowed_spec0_compliant is not True and spec0_compliant is False:
-                        # Yellow: Compatible but SPEC 0 non-compliant
-                        cell.fill = YELLOW
-                    else:
-                        # Green: Compatible (and either SPEC 0 compliant or not a SPEC 0 package)
-                        cell.fill = GREEN
-                else:
-                    # Red or Orange: Package is incompatible with allowed range
-                    # Only check SPEC 0 if the "Allowed Version Range" is NOT definitively compliant
-                    if allowed_spec0_compliant is not True and spec0_compliant is False:
-                        # Orange: Incompatible AND SPEC 0 non-compliant
-                        cell.fill = ORANGE
-                    else:
-                        # Red: Incompatible (regardless of SPEC 0 status)
-                        cell.fill = RED
+            # "N/A" means dependency conflict (always red in the allowed range column)
+            row_cells = [package_name, styled_cell(worksheet, "N/A", "PyHC Red")]
+
+        # One cell per project column; unused dependencies stay blank
+        for project in projects:
+            values = project_data[project].get(package_name)
+            if values is None:
+                row_cells.append(None)
+                continue
+            compatible, spec0_compliant, project_range = values
+            if compatible is None:
+                row_cells.append(None)
+                continue
+            style_name = _project_cell_style(compatible, spec0_compliant, allowed_spec0_compliant)
+            row_cells.append(styled_cell(worksheet, project_range, style_name))
+        worksheet.append(row_cells)
 
     return workbook
 
 
+def _export_range(version_range):
+    return version_range.replace(" ", "") if isinstance(version_range, str) else version_range
+
+
+def iter_table_records(table_data):
+    """
+    Flatten table_data into one record per (project, dependency) cell. Unused dependencies produce no record.
+    :param table_data: The data structure returned from `generate_dependency_table_data()`
+    :return: Generator of dicts like {'project': 'sunpy==7.0.0', 'dependency': 'numpy', 'range': '>=1.25',
+             'compatible': True, 'spec0_compliant': False, 'allowed_range': '>=2.0', 'allowed_spec0_compliant': True,
+             'spec0_requirement': '>=2.0.0', 'core': False, 'row': 14}
+    """
+    core_dependencies = table_data['core_dependencies']
+    all_dependencies = {**table_data['other_dependencies'], **core_dependencies}
+    spec0_requirements = table_data.get('spec0_requirements', {})
+
+    for project, dependency_data in table_data['project_data'].items():
+        for package_name, (compatible, spec0_compliant, version_range) in dependency_data.items():
+            if compatible is None:
+                continue
+            row, allowed_range, allowed_spec0_compliant = all_dependencies[package_name]
+            yield {
+                'project': project,
+                'dependency': package_name,
+                'range': _export_range(version_range),
+                'compatible': compatible,
+                'spec0_compliant': spec0_compliant,
+                'allowed_range': _export_range(allowed_range),
+                'allowed_spec0_compliant': allowed_spec0_compliant,
+                'spec0_requirement': spec0_requirements.get(package_name.lower()),
+                'core': package_name in core_dependencies,
+                'row': row,
+            }
+
+
+def write_table_data_jsonl(table_data, path):
+    """
+    Export table_data as compact JSON lines (see `iter_table_records()`), queryable with query_dependency_table.py.
+    :param table_data: The data structure returned from `generate_dependency_table_data()`
+    :param path: Output file path, e.g. "spreadsheets/PyHC-Dependency-Table-2025-01-01-00-00.jsonl"
+    :return: The number of records written
+    """
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in iter_table_records(table_data):
+            f.write(json.dumps(record, separators=(',', ':')) + "\n")
+            count += 1
+    return count
+
+
 if __name__ == '__main__':
     # Legacy direct script mode is intentionally disabled for now.
     # The workflow uses pipeline.py --generate-spreadsheet.
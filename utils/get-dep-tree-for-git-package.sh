@@ -11,14 +11,10 @@ else
   BASE_PACKAGE=$(echo "$BASE_PACKAGE" | sed -E 's/[<>=!].*$//')
 fi
 
-TEMP_DIR=$(mktemp -d)
-cleanup() {
-  popd >/dev/null 2>&1 || true
-  rm -rf "$TEMP_DIR"
-}
-trap cleanup EXIT
+SCRIPT_DIR="$(cd -- "$(dirname -- "${BASH_SOURCE[0]}")" && pwd)"
 
-pushd "$TEMP_DIR" >/dev/null
+source "$SCRIPT_DIR/dep-tree-env.sh"
+dep_tree_setup "$PACKAGE"
 
 uv venv --quiet .venv
 uv pip install --quiet --python .venv/bin/python "$PACKAGE"
@@ -5,15 +5,10 @@ set -euo pipefail
 PACKAGE=$1
 BASE_PACKAGE=$(echo "$PACKAGE" | sed 's/\[.*\]//')
 BASE_PACKAGE=$(echo "$BASE_PACKAGE" | sed -E 's/[<>=!].*$//')
+SCRIPT_DIR="$(cd -- "$(dirname -- "${BASH_SOURCE[0]}")" && pwd)"
 
-TEMP_DIR=$(mktemp -d)
-cleanup() {
-  popd >/dev/null 2>&1 || true
-  rm -rf "$TEMP_DIR"
-}
-trap cleanup EXIT
-
-pushd "$TEMP_DIR" >/dev/null
+source "$SCRIPT_DIR/dep-tree-env.sh"
+dep_tree_setup "$PACKAGE"
 
 uv venv --quiet .venv
 uv pip install --quiet --python .venv/bin/python "$PACKAGE"
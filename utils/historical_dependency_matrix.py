@@ -0,0 +1,195 @@
+"""
+Historical multi-version compatibility matrix: every release of each PyHC package from the last N years
+checked against the currently resolved environment.
+
+Built entirely from cached PyPI metadata (see package_metadata.py), so it scales to thousands of
+project columns. Only each release's own declared requirements are compared (not its transitive tree,
+which would need a resolver per release). Releases with identical requirement sets share one row of
+the compatibility arrays, and the spreadsheet is streamed one dependency row at a time.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import openpyxl
+from packaging.requirements import Requirement
+from packaging.utils import canonicalize_name
+
+try:
+    from utils.generate_dependency_table import (
+        compatibility_grid,
+        determine_version_range,
+        get_base_package_name,
+        normalize_declared_range,
+        register_fill_styles,
+        styled_cell,
+    )
+    from utils.package_metadata import (
+        applicable_requirements,
+        fetch_release_history,
+        load_requires_dist,
+        marker_environment,
+    )
+except ModuleNotFoundError:
+    from generate_dependency_table import (
+        compatibility_grid,
+        determine_version_range,
+        get_base_package_name,
+        normalize_declared_range,
+        register_fill_styles,
+        styled_cell,
+    )
+    from package_metadata import (
+        applicable_requirements,
+        fetch_release_history,
+        load_requires_dist,
+        marker_environment,
+    )
+
+# Excel's column limit minus the two leading columns
+MAX_RELEASE_COLUMNS = 16384 - 2
+
+
+def collect_release_requirements(packages, years, as_of=None, python_version=None, max_workers=8):
+    """
+    Collect the declared requirements of every release of each package from the last N years.
+    :param packages: List of packages.txt entries like ['sunpy[all]==7.0.0', 'hapiclient==0.3.3']
+    :param years: How many years of releases to include
+    :param as_of: End of the window (default: now)
+    :param python_version: Target Python version like "3.12" for evaluating environment markers
+    :param max_workers: Maximum concurrent PyPI metadata requests
+    :return: Dict like {'sunpy==7.0.0': {'numpy': '>=1.25', ...}, 'sunpy==6.1.0': {...}, ...}, newest release first per package
+    """
+    as_of = as_of or datetime.now()
+    cutoff = as_of - timedelta(days=int(365 * years))
+    environment = marker_environment(python_version)
+
+    releases = []  # (package name, extras, version)
+    for package in packages:
+        if package.startswith("git+"):
+            continue
+        root = Requirement(package)
+        history = fetch_release_history(root.name)
+        versions = [version for version, released in history.items() if cutoff <= released <= as_of]
+        releases.extend((get_base_package_name(package), frozenset(root.extras), version) for version in reversed(versions))
+
+    requires_dist = load_requires_dist(
+        [(name, version) for name, _, version in releases], max_workers=max_workers
+    )
+
+    release_requirements = {}
+    for name, extras, version in releases:
+        dependencies = {}
+        for requirement in applicable_requirements(requires_dist[(canonicalize_name(name), version)], extras, environment):
+            dependency = canonicalize_name(requirement.name)
+            dependencies[dependency] = determine_version_range(
+                dependencies, dependency, normalize_declared_range(requirement.specifier)
+            )
+        release_requirements[f"{name}=={version}"] = dependencies
+    return release_requirements
+
+
+def build_historical_matrix(release_requirements, resolved_versions):
+    """
+    Evaluate each release's requirements against the resolved environment, once per distinct requirement set.
+    :param release_requirements: Dict from `collect_release_requirements()`
+    :param resolved_versions: Dict like {'numpy': '2.2.6', ...} from `package_metadata.parse_resolved_versions()`
+    :return: Dict like {
+                 'projects': ['sunpy==7.0.0', ...],          # P release columns
+                 'dependencies': ['astropy', 'numpy', ...],   # D dependency rows (sorted)
+                 'allowed_ranges': ['==7.1.0', '==2.2.6', None, ...],  # None when not in the resolved set
+                 'project_set_ids': int array (P,),           # requirement set of each release
+                 'requirement_sets': [{'numpy': '>=1.25', ...}, ...],  # U distinct sets
+                 'ranges': object array (U, D),               # None where a set doesn't use a dependency
+                 'compatible': bool array (U, D),
+             }
+    """
+    projects = list(release_requirements)
+    set_ids = {}
+    requirement_sets = []
+    project_set_ids = np.empty(len(projects), dtype=np.intp)
+    for p, project in enumerate(projects):
+        key = frozenset(release_requirements[project].items())
+        if key not in set_ids:
+            set_ids[key] = len(requirement_sets)
+            requirement_sets.append(release_requirements[project])
+        project_set_ids[p] = set_ids[key]
+
+    dependencies = sorted({dep for requirements in requirement_sets for dep in requirements})
+    columns = {dep: d for d, dep in enumerate(dependencies)}
+    allowed_ranges = [
+        f"=={resolved_versions[dep]}" if dep in resolved_versions else None
+        for dep in dependencies
+    ]
+
+    ranges = np.full((len(requirement_sets), len(dependencies)), None, dtype=object)
+    for u, requirements in enumerate(requirement_sets):
+        for dep, version_range in requirements.items():
+            ranges[u, columns[dep]] = version_range
+    compatible = compatibility_grid(allowed_ranges, ranges.tolist()) if requirement_sets else np.zeros((0, len(dependencies)), dtype=bool)
+
+    return {
+        'projects': projects,
+        'dependencies': dependencies,
+        'allowed_ranges': allowed_ranges,
+        'project_set_ids': project_set_ids,
+        'requirement_sets': requirement_sets,
+        'ranges': ranges,
+        'compatible': compatible,
+    }
+
+
+def write_historical_spreadsheet(matrix, path):
+    """
+    Stream the historical matrix to an xlsx file, one dependency row at a time.
+    Cells are green when the release accepts the resolved version, red when it doesn't,
+    and unstyled when the dependency isn't in the resolved set.
+    :param matrix: Dict from `build_historical_matrix()`
+    :param path: Output .xlsx path
+    """
+    projects = matrix['projects']
+    if len(projects) > MAX_RELEASE_COLUMNS:
+        raise ValueError(f"Too many releases for one sheet ({len(projects)} > {MAX_RELEASE_COLUMNS}); use fewer years.")
+
+    workbook = openpyxl.Workbook(write_only=True)
+    worksheet = workbook.create_sheet()
+    register_fill_styles(workbook)
+    worksheet.append(['Package', 'Resolved Version'] + projects)
+
+    project_set_ids = matrix['project_set_ids']
+    for d, dependency in enumerate(matrix['dependencies']):
+        allowed_range = matrix['allowed_ranges'][d]
+        # Expand this dependency's distinct-set results to every release column
+        row_ranges = matrix['ranges'][project_set_ids, d]
+        row_compatible = matrix['compatible'][project_set_ids, d]
+
+        row_cells = [dependency, allowed_range if allowed_range is not None else "not installed"]
+        for version_range, compatible in zip(row_ranges, row_compatible):
+            if version_range is None:
+                row_cells.append(None)
+            elif allowed_range is None:
+                row_cells.append(version_range)
+            else:
+                row_cells.append(styled_cell(worksheet, version_range, "PyHC Green" if compatible else "PyHC Red"))
+        worksheet.append(row_cells)
+
+    workbook.save(path)
+
+
+def find_incompatible_releases(matrix):
+    """
+    :param matrix: Dict from `build_historical_matrix()`
+    :return: Dict like {'sunpy==5.0.0': ['numpy<2.0'], ...} for releases that reject a resolved version
+    """
+    incompatible_sets = {}
+    for u, d in zip(*np.nonzero(~matrix['compatible'])):
+        version_range = matrix['ranges'][u, d]
+        if version_range is not None and matrix['allowed_ranges'][d] is not None:
+            dependency = matrix['dependencies'][d]
+            incompatible_sets.setdefault(u, []).append(f"{dependency}{version_range}")
+
+    return {
+        project: incompatible_sets[u]
+        for project, u in zip(matrix['projects'], matrix['project_set_ids'])
+        if u in incompatible_sets
+    }
@@ -0,0 +1,218 @@
+"""
+Split the resolved environment into tiered requirement files, each installed in its own Docker layer.
+
+A patch bump of one PyHC package should only rebuild (and push, and pull) a small layer, not the whole
+site-packages. Tiers are derived from the lockfile's "# via" dependency graph and from each package's
+release frequency:
+
+- base: stable dependencies shared by a large fraction of the PyHC packages (numpy, scipy, astropy, matplotlib, ...)
+- mid:  the remaining stable dependencies
+- top:  the PyHC packages themselves, plus anything that releases often (e.g. botocore, astropy-iers-data)
+
+Every tier file pins exact versions (with the lockfile's `--hash` lines, when it was compiled with hashes) and is
+installed with `--no-deps`, so nothing is resolved inside the build, a layer only ever contains its own packages
+and together the layers install exactly the lockfile. verify-lockfile.py checks the result after the last tier.
+"""
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from packaging.utils import canonicalize_name
+
+try:
+    from .package_metadata import fetch_release_history
+except ImportError:
+    from package_metadata import fetch_release_history
+
+TIER_NAMES = ("base", "mid", "top")
+
+# Fraction of PyHC packages that must (transitively) depend on a package for it to be in the base tier
+BASE_MIN_SHARE = 0.25
+
+# Packages releasing more often than this (about every two weeks) are kept out of the base and mid tiers
+STABLE_MAX_RELEASES_PER_YEAR = 26
+
+# Window used to measure release frequency
+RELEASE_FREQUENCY_YEARS = 2
+
+
+def parse_lockfile_graph(lockfile_path: str):
+    """Read pins and the reverse dependency graph from a `uv pip compile` lockfile.
+
+    Args:
+        lockfile_path: Path to resolved-versions.txt (or the fresh compile output)
+
+    Returns:
+        Tuple (pins, dependents, roots): pins maps canonical name → "name==version" line, dependents maps
+        canonical name → set of canonical names that require it, and roots is the set of packages
+        requested directly by packages.txt
+    """
+    pins = {}
+    dependents = {}
+    roots = set()
+    current = None
+    with open(lockfile_path, "r") as f:
+        for line in f:
+            stripped = line.strip()
+            if not stripped:
+                continue
+            if not line.startswith((" ", "\t", "#")):
+                match = re.match(r"^([A-Za-z0-9][A-Za-z0-9._-]*)==([^\s#;]+)", stripped)
+                current = canonicalize_name(match.group(1)) if match else None
+                if current:
+                    pins[current] = f"{match.group(1)}=={match.group(2)}"
+                    dependents.setdefault(current, set())
+                continue
+            if current is None or not stripped.startswith("#"):
+                continue
+            # "# via numpy", "# via", "#   numpy", "#   -r packages.txt"
+            via = stripped.lstrip("#").strip()
+            if via.startswith("via"):
+                via = via[len("via"):].strip()
+            if not via:
+                continue
+            if via.startswith("-r "):
+                roots.add(current)
+            elif not via.startswith("-"):
+                dependents[current].add(canonicalize_name(via.split()[0]))
+    return pins, dependents, roots
+
+
+def parse_lockfile_hashes(lockfile_path: str) -> dict:
+    """Read the `--hash` options of a lockfile compiled with `uv pip compile --generate-hashes`.
+
+    Args:
+        lockfile_path: Path to resolved-versions.txt (or the fresh compile output)
+
+    Returns:
+        Dict mapping canonical name → list of "sha256:..." hashes; empty if the lockfile has no hashes
+    """
+    hashes = {}
+    current = None
+    with open(lockfile_path, "r") as f:
+        for line in f:
+            stripped = line.strip().rstrip("\\").strip()
+            if not stripped:
+                continue
+            if not line.startswith((" ", "\t", "#")):
+                match = re.match(r"^([A-Za-z0-9][A-Za-z0-9._-]*)==", stripped)
+                current = canonicalize_name(match.group(1)) if match else None
+            elif current is not None and stripped.startswith("--hash="):
+                hashes.setdefault(current, []).append(stripped[len("--hash="):])
+    return hashes
+
+
+def format_requirement(pin: str, hashes=None) -> str:
+    """Format one tier file entry, with its hashes as continuation lines like `uv pip compile` writes them.
+
+    Args:
+        pin: "name==version" line
+        hashes: Optional list of "sha256:..." hashes
+
+    Returns:
+        The entry, without a trailing newline
+    """
+    if not hashes:
+        return pin
+    return " \\\n".join([pin] + [f"    --hash={h}" for h in hashes])
+
+
+def releases_per_year(packages, years=RELEASE_FREQUENCY_YEARS, max_workers=8):
+    """Measure how often each package released over the last N years, from cached PyPI release histories.
+
+    Args:
+        packages: Iterable of package names
+        years: Length of the window
+        max_workers: Maximum concurrent PyPI requests for uncached histories
+
+    Returns:
+        Dict mapping canonical name → releases per year; packages whose history can't be fetched are left out
+    """
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=int(365 * years))
+
+    def _frequency(name):
+        try:
+            history = fetch_release_history(name)
+        except Exception as e:
+            print(f"Could not fetch the release history of {name}: {e}")
+            return name, None
+        return name, sum(released >= cutoff for released in history.values()) / years
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        results = executor.map(_frequency, sorted({canonicalize_name(p) for p in packages}))
+        return {name: frequency for name, frequency in results if frequency is not None}
+
+
+def assign_install_tiers(pins, dependents, roots, frequencies=None):
+    """Assign every pinned package to a tier.
+
+    Args:
+        pins: From parse_lockfile_graph()
+        dependents: From parse_lockfile_graph()
+        roots: From parse_lockfile_graph()
+        frequencies: Optional dict of releases per year from releases_per_year(); without it, only the graph is used
+
+    Returns:
+        Dict mapping tier name → sorted list of "name==version" lines
+    """
+    frequencies = frequencies or {}
+    requirements = {name: set() for name in pins}
+    for name, parents in dependents.items():
+        for parent in parents:
+            if parent in requirements:
+                requirements[parent].add(name)
+
+    # How many PyHC packages pull in each package, directly or transitively
+    reached_by = {name: 0 for name in pins}
+    for root in roots:
+        stack, seen = [root], {root}
+        while stack:
+            for dependency in requirements.get(stack.pop(), ()):
+                if dependency not in seen:
+                    seen.add(dependency)
+                    stack.append(dependency)
+        for name in seen - {root}:
+            reached_by[name] += 1
+
+    tiers = {tier: [] for tier in TIER_NAMES}
+    for name, pin in pins.items():
+        if name in roots or frequencies.get(name, 0) > STABLE_MAX_RELEASES_PER_YEAR:
+            tier = "top"
+        elif roots and reached_by[name] / len(roots) >= BASE_MIN_SHARE:
+            tier = "base"
+        else:
+            tier = "mid"
+        tiers[tier].append(pin)
+    return {tier: sorted(lines, key=str.lower) for tier, lines in tiers.items()}
+
+
+def write_install_tiers(lockfile_path: str, output_dir: str, use_release_history: bool = True,
+                        local_builds=None) -> dict:
+    """Generate one requirements file per tier from a lockfile.
+
+    Args:
+        lockfile_path: Path to resolved-versions.txt (or the fresh compile output)
+        output_dir: Directory for base.txt, mid.txt and top.txt
+        use_release_history: Whether to keep frequently released packages in the top tier (cached PyPI metadata)
+        local_builds: Canonical names installed from the wheelhouse instead (see wheelhouse.py), left out of the tiers
+
+    Returns:
+        Dict mapping tier name → number of packages
+    """
+    pins, dependents, roots = parse_lockfile_graph(lockfile_path)
+    hashes = parse_lockfile_hashes(lockfile_path)
+    frequencies = releases_per_year(set(pins) - roots) if use_release_history else None
+    tiers = assign_install_tiers(pins, dependents, roots, frequencies)
+    if local_builds:
+        local_pins = {pins[name] for name in local_builds if name in pins}
+        tiers = {tier: [pin for pin in lines if pin not in local_pins] for tier, lines in tiers.items()}
+
+    os.makedirs(output_dir, exist_ok=True)
+    for tier, lines in tiers.items():
+        with open(os.path.join(output_dir, f"{tier}.txt"), "w") as f:
+            f.write(f"# {tier} install tier of the resolved environment, generated by `pipeline.py --compile` (utils/install_tiers.py)\n")
+            for pin in lines:
+                f.write(format_requirement(pin, hashes.get(canonicalize_name(pin.split("==")[0]))) + "\n")
+    return {tier: len(lines) for tier, lines in tiers.items()}
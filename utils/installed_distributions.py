@@ -0,0 +1,100 @@
+"""
+In-process inventory of the distributions installed in a Python environment.
+
+Reads dist-info/egg-info metadata directly with importlib.metadata instead of shelling out to `pip list`,
+for the current interpreter or any virtual environment on disk. Inventories are cached on disk keyed by
+the site-packages directories' mtimes, which change whenever a distribution is installed or removed.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import site
+import sys
+from importlib import metadata
+
+from packaging.utils import canonicalize_name
+
+try:
+    from .pipeline_utils import get_pipeline_cache_dir
+except ImportError:
+    from pipeline_utils import get_pipeline_cache_dir
+
+
+def site_packages_dirs(environment: str = None) -> list:
+    """Find the directories distributions are installed into.
+
+    Args:
+        environment: Path to a virtual environment (or its python executable); default is the current interpreter
+
+    Returns:
+        List of existing site-packages directories in import precedence order
+    """
+    if environment is None:
+        candidates = [path for path in sys.path if path.endswith(("site-packages", "dist-packages"))]
+        candidates += site.getsitepackages() + [site.getusersitepackages()]
+    else:
+        if os.path.isfile(environment):
+            environment = os.path.dirname(os.path.dirname(environment))  # .venv/bin/python -> .venv
+        candidates = sorted(glob.glob(os.path.join(environment, "lib", "python*", "site-packages")))
+        candidates.append(os.path.join(environment, "Lib", "site-packages"))
+
+    dirs = []
+    for path in candidates:
+        path = os.path.realpath(path)
+        if os.path.isdir(path) and path not in dirs:
+            dirs.append(path)
+    return dirs
+
+
+def _scan_distributions(dirs: list) -> dict:
+    inventory = {}
+    for dist in metadata.distributions(path=dirs):
+        name = dist.metadata["Name"]
+        if not name:
+            continue
+        # Earlier directories shadow later ones, like on import
+        inventory.setdefault(canonicalize_name(name), {
+            "name": name,
+            "version": dist.version,
+            "requires": dist.requires or [],
+        })
+    return dict(sorted(inventory.items()))
+
+
+def get_installed_distributions(environment: str = None, cache_dir: str = None) -> dict:
+    """Inventory every distribution installed in an environment, from the cache when nothing changed.
+
+    Args:
+        environment: Path to a virtual environment (or its python executable); default is the current interpreter
+        cache_dir: Cache root (default: get_pipeline_cache_dir())
+
+    Returns:
+        Dict mapping canonical name → {"name": ..., "version": ..., "requires": [Requires-Dist strings]}
+    """
+    dirs = site_packages_dirs(environment)
+    mtimes = {path: os.stat(path).st_mtime_ns for path in dirs}
+
+    cache_dir = cache_dir or get_pipeline_cache_dir()
+    cache_key = hashlib.sha256("\n".join(dirs).encode("utf-8")).hexdigest()[:16]
+    cache_path = os.path.join(cache_dir, "installed", f"{cache_key}.json")
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, "r") as f:
+                cached = json.load(f)
+            if cached["mtimes"] == mtimes:
+                return cached["distributions"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    inventory = _scan_distributions(dirs)
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"mtimes": mtimes, "distributions": inventory}, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass  # A read-only cache only costs a rescan next time
+    return inventory
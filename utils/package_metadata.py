@@ -0,0 +1,236 @@
+"""
+Cached PyPI distribution metadata for building dependency tables without installing anything.
+
+Requires-Dist lists and file names are read from the PyPI JSON API (which reports the metadata of a
+release's first uploaded file) and cached on disk together per (name, version); released metadata never
+changes.
+"""
+
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+
+import requests
+from packaging.markers import default_environment
+from packaging.requirements import Requirement, InvalidRequirement
+from packaging.utils import canonicalize_name
+from packaging.version import Version, InvalidVersion
+
+try:
+    from .pipeline_utils import get_pipeline_cache_dir, parse_upload_time
+except ImportError:
+    from pipeline_utils import get_pipeline_cache_dir, parse_upload_time
+
+# Release lists change when packages publish, so cached ones are refreshed after this long
+RELEASE_HISTORY_MAX_AGE = timedelta(hours=24)
+
+
+def parse_resolved_versions(lockfile_path: str) -> dict:
+    """Read every pinned ``name==version`` entry from a uv lockfile.
+
+    Args:
+        lockfile_path: Path to resolved-versions.txt (or the fresh compile output)
+
+    Returns:
+        Dict mapping canonical package name → version
+    """
+    resolved_versions = {}
+    with open(lockfile_path, "r") as f:
+        for line in f:
+            if line.startswith((" ", "\t", "#")):
+                continue
+            match = re.match(r"^([A-Za-z0-9][A-Za-z0-9._-]*)==([^\s#;]+)", line.strip())
+            if match:
+                resolved_versions[canonicalize_name(match.group(1))] = match.group(2)
+    return resolved_versions
+
+
+def _release_cache_path(name: str, version: str, cache_dir: str) -> str:
+    return os.path.join(cache_dir, "pypi-releases", f"{canonicalize_name(name)}-{version}.json")
+
+
+def _fetch_release_json(name: str, version: str, cache_dir: str = None) -> dict:
+    """Get the parts of one release's PyPI JSON document the pipeline uses, from the cache when possible.
+
+    Args:
+        name: Distribution name
+        version: Released version
+        cache_dir: Cache root (default: get_pipeline_cache_dir())
+
+    Returns:
+        Dict {"requires_dist": [...], "files": [...]} (see fetch_requires_dist() and fetch_release_files())
+
+    Raises:
+        requests.HTTPError: If PyPI has no such release
+    """
+    cache_dir = cache_dir or get_pipeline_cache_dir()
+    cache_path = _release_cache_path(name, version, cache_dir)
+    if os.path.exists(cache_path):
+        with open(cache_path, "r") as f:
+            return json.load(f)
+
+    response = requests.get(f"https://pypi.org/pypi/{canonicalize_name(name)}/{version}/json", timeout=30)
+    response.raise_for_status()
+    data = response.json()
+    release = {
+        "requires_dist": data["info"].get("requires_dist") or [],
+        "files": [f["filename"] for f in data.get("urls", []) if not f.get("yanked")],
+    }
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(release, f)
+    os.replace(tmp_path, cache_path)
+    return release
+
+
+def fetch_requires_dist(name: str, version: str, cache_dir: str = None) -> list:
+    """Get the Requires-Dist entries of one released distribution, from the cache when possible.
+
+    Args:
+        name: Distribution name
+        version: Released version
+        cache_dir: Cache root (default: get_pipeline_cache_dir())
+
+    Returns:
+        List of requirement strings like ["numpy>=1.25", "pytest; extra == 'tests'"]
+
+    Raises:
+        requests.HTTPError: If PyPI has no such release
+    """
+    return _fetch_release_json(name, version, cache_dir)["requires_dist"]
+
+
+def fetch_release_files(name: str, version: str, cache_dir: str = None) -> list:
+    """Get the file names uploaded for one release (sdists and wheels), from the cache when possible.
+
+    Args:
+        name: Distribution name
+        version: Released version
+        cache_dir: Cache root (default: get_pipeline_cache_dir())
+
+    Returns:
+        List of non-yanked file names like ["numpy-2.2.6.tar.gz", "numpy-2.2.6-cp312-cp312-manylinux_2_17_x86_64.whl"]
+
+    Raises:
+        requests.HTTPError: If PyPI has no such release
+    """
+    return _fetch_release_json(name, version, cache_dir)["files"]
+
+
+def load_requires_dist(distributions, cache_dir: str = None, max_workers: int = 8) -> dict:
+    """Get Requires-Dist for many distributions, fetching uncached ones concurrently.
+
+    Args:
+        distributions: Iterable of (name, version) pairs
+        cache_dir: Cache root (default: get_pipeline_cache_dir())
+        max_workers: Maximum concurrent PyPI requests
+
+    Returns:
+        Dict mapping (canonical name, version) → list of requirement strings
+
+    Raises:
+        RuntimeError: If any distribution's metadata can't be fetched
+    """
+    cache_dir = cache_dir or get_pipeline_cache_dir()
+    distributions = sorted({(canonicalize_name(name), version) for name, version in distributions})
+    requires_dist = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {
+            executor.submit(fetch_requires_dist, name, version, cache_dir): (name, version)
+            for name, version in distributions
+        }
+        for future in as_completed(futures):
+            name, version = futures[future]
+            try:
+                requires_dist[(name, version)] = future.result()
+            except Exception as e:
+                raise RuntimeError(f"Failed to fetch metadata for {name}=={version}: {e}") from e
+    return requires_dist
+
+
+def fetch_release_history(name: str, cache_dir: str = None, max_age=RELEASE_HISTORY_MAX_AGE) -> dict:
+    """Get the upload date of every final, non-yanked release of a package.
+
+    Args:
+        name: Distribution name
+        cache_dir: Cache root (default: get_pipeline_cache_dir())
+        max_age: Cached release lists older than this are re-fetched
+
+    Returns:
+        Dict mapping version string → earliest upload datetime (naive UTC), oldest release first
+    """
+    cache_dir = cache_dir or get_pipeline_cache_dir()
+    cache_path = os.path.join(cache_dir, "release-history", f"{canonicalize_name(name)}.json")
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    cached = None
+    if os.path.exists(cache_path):
+        with open(cache_path, "r") as f:
+            cached = json.load(f)
+    if cached is None or now - datetime.fromisoformat(cached["fetched_at"]) > max_age:
+        response = requests.get(f"https://pypi.org/pypi/{canonicalize_name(name)}/json", timeout=30)
+        response.raise_for_status()
+        releases = {}
+        for version, files in response.json().get("releases", {}).items():
+            try:
+                if Version(version).is_prerelease:
+                    continue
+            except InvalidVersion:
+                continue
+            upload_times = [
+                parse_upload_time(f.get("upload_time_iso_8601"))
+                for f in files
+                if not f.get("yanked")
+            ]
+            upload_times = [t for t in upload_times if t is not None]
+            if upload_times:
+                releases[version] = min(upload_times).isoformat()
+        cached = {"fetched_at": now.isoformat(), "releases": releases}
+
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(cached, f)
+        os.replace(tmp_path, cache_path)
+
+    releases = {version: datetime.fromisoformat(date) for version, date in cached["releases"].items()}
+    return dict(sorted(releases.items(), key=lambda item: item[1]))
+
+
+def marker_environment(python_version: str = None) -> dict:
+    """Marker environment of this platform, optionally targeting another Python version like "3.12"."""
+    environment = default_environment()
+    if python_version:
+        environment["python_version"] = ".".join(python_version.split(".")[:2])
+        environment["python_full_version"] = python_version if python_version.count(".") >= 2 else f"{python_version}.0"
+    return environment
+
+
+def applicable_requirements(requirement_strings, extras=(), environment=None):
+    """Parse Requires-Dist entries, keeping those whose markers apply to the environment and requested extras.
+
+    Args:
+        requirement_strings: Requires-Dist entries
+        extras: Extras requested for the distribution
+        environment: Marker environment from marker_environment()
+
+    Returns:
+        List of packaging Requirement objects
+    """
+    environment = environment or marker_environment()
+    applicable = []
+    for requirement_string in requirement_strings:
+        try:
+            requirement = Requirement(requirement_string)
+        except InvalidRequirement:
+            continue
+        if requirement.marker is not None:
+            extra_values = [""] + [canonicalize_name(extra) for extra in extras]
+            if not any(requirement.marker.evaluate({**environment, "extra": extra}) for extra in extra_values):
+                continue
+        applicable.append(requirement)
+    return applicable
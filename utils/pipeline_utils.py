@@ -7,11 +7,13 @@ __author__ = "Shawn Polson"
 
 import os
 import re
+import json
 import requests
-import collections
-from datetime import datetime, timedelta
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
 import pandas as pd
-from packaging.version import Version
+from packaging.version import Version, InvalidVersion
 from packaging.specifiers import SpecifierSet, InvalidSpecifier
 
 
@@ -369,98 +371,256 @@ def specify_numpy_1_26_4(requirements_file_path):
         file.writelines(lines)
 
 
-def get_spec0_packages():
-    """
-    Returns a list of SPEC 0 core packages with minimum supported versions based on current date.
-    SPEC 0 policy: Drop support for core package dependencies 2 years after their initial release.
+# ============================================
+# SPEC 0 Functions
+# ============================================
 
-    :return: A list like ["numpy>=2.0.0", "scipy>=1.11.0", ...]
+# SPEC 0 core packages
+SPEC0_CORE_PACKAGES = [
+    "numpy",
+    "scipy",
+    "matplotlib",
+    "pandas",
+    "scikit-image",
+    "networkx",
+    "scikit-learn",
+    "xarray",
+    "ipython",
+    "zarr"
+]
+
+# SPEC 0: Drop support 2 years after release
+SPEC0_SUPPORT_WINDOW = timedelta(days=int(365 * 2))
+
+# Cached release-date tables older than this are revalidated against PyPI
+SPEC0_CACHE_MAX_AGE = timedelta(hours=24)
+
+
+def get_pipeline_cache_dir() -> str:
+    """Return (and create) the on-disk cache directory for pipeline data.
+
+    Set PYHC_PIPELINE_CACHE_DIR to override the default ~/.cache/pyhc-pipeline.
     """
-    # SPEC 0 core packages
-    core_packages = [
-        "numpy",
-        "scipy",
-        "matplotlib",
-        "pandas",
-        "scikit-image",
-        "networkx",
-        "scikit-learn",
-        "xarray",
-        "ipython",
-        "zarr"
-    ]
-
-    # SPEC 0: Drop support 2 years after release
-    # So minimum supported version = oldest version whose drop_date hasn't passed yet
-    plus24 = timedelta(days=int(365 * 2))  # 2 year support window for core packages
-    current_date = datetime.now()
+    cache_dir = os.environ.get("PYHC_PIPELINE_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "pyhc-pipeline"
+    )
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
 
-    spec0_requirements = []
 
-    for package in core_packages:
-        print(f"Querying PyPI for {package} SPEC 0 minimum version...", end="", flush=True)
+def parse_upload_time(value: str) -> datetime | None:
+    """Parse a PyPI ISO-8601 upload time like "2024-06-16T18:08:08.123456Z" into a naive UTC datetime."""
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+    except (AttributeError, ValueError):
+        return None
+
+
+def parse_release_dates(simple_api_data: dict) -> dict:
+    """Collect the earliest upload date of each X.Y.0 final release from a simple API response.
+
+    Args:
+        simple_api_data: JSON from https://pypi.org/simple/<package> (application/vnd.pypi.simple.v1+json)
+
+    Returns:
+        Dict mapping version string → earliest upload datetime, e.g. {"2.0.0": datetime(2024, 6, 16, ...)}
+    """
+    release_dates = {}
+    for f in simple_api_data.get("files", []):
+        filename = f["filename"]
+        if filename.endswith((".tar.gz", ".zip")):
+            # sdist: <name>-<version>.tar.gz
+            parts = filename.rsplit(".tar.gz" if filename.endswith(".tar.gz") else ".zip", 1)[0].rsplit("-", 1)
+        else:
+            # wheel: <name>-<version>-<tags>.whl
+            parts = filename.split("-")
+        if len(parts) < 2:
+            continue
+        try:
+            version = Version(parts[1])
+        except InvalidVersion:
+            continue
+
+        # Skip pre-releases and patch versions (only consider X.Y.0)
+        if version.is_prerelease or version.micro != 0:
+            continue
+
+        release_date = parse_upload_time(f.get("upload-time"))
+        if release_date is None:
+            continue
+
+        key = str(version)
+        if key not in release_dates or release_date < release_dates[key]:
+            release_dates[key] = release_date
+    return release_dates
+
+
+def _refresh_release_dates(package: str, cached: dict | None) -> dict:
+    """Fetch a package's release dates, revalidating with the cached ETag so unchanged packages aren't re-parsed."""
+    headers = {"Accept": "application/vnd.pypi.simple.v1+json"}
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+
+    response = requests.get(f"https://pypi.org/simple/{package}", headers=headers, timeout=30)
+    fetched_at = datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+    if response.status_code == 304 and cached:
+        return {**cached, "fetched_at": fetched_at}
+    response.raise_for_status()
+
+    # Merge into the cached table; an upload date never moves, so the earliest one wins
+    release_dates = dict(cached.get("release_dates", {})) if cached else {}
+    for version, release_date in parse_release_dates(response.json()).items():
+        iso_date = release_date.isoformat()
+        if version not in release_dates or iso_date < release_dates[version]:
+            release_dates[version] = iso_date
+    return {
+        "fetched_at": fetched_at,
+        "etag": response.headers.get("ETag"),
+        "release_dates": release_dates,
+    }
 
+
+def load_spec0_release_dates(packages=None, cache_path=None, max_age=SPEC0_CACHE_MAX_AGE, max_workers=8) -> dict:
+    """Load SPEC 0 release-date tables from the on-disk cache, refreshing stale entries concurrently.
+
+    Packages whose refresh fails fall back to their cached table (if any).
+
+    Args:
+        packages: Package names (default: SPEC0_CORE_PACKAGES)
+        cache_path: Cache file (default: spec0-release-dates.json in get_pipeline_cache_dir())
+        max_age: Entries fetched longer ago than this are revalidated against PyPI
+        max_workers: Maximum concurrent PyPI requests
+
+    Returns:
+        Dict mapping package name → {Version: release datetime}
+    """
+    packages = packages or SPEC0_CORE_PACKAGES
+    if cache_path is None:
+        cache_path = os.path.join(get_pipeline_cache_dir(), "spec0-release-dates.json")
+
+    cache = {}
+    if os.path.exists(cache_path):
         try:
-            # Query PyPI for package releases
-            response = requests.get(
-                f"https://pypi.org/simple/{package}",
-                headers={"Accept": "application/vnd.pypi.simple.v1+json"},
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            # Collect release dates for each version
-            file_date = collections.defaultdict(list)
-            for f in data["files"]:
-                ver = f["filename"].split("-")[1]
+            with open(cache_path, "r") as f:
+                cache = json.load(f).get("packages", {})
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable SPEC 0 cache {cache_path}: {e}")
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    stale = []
+    for package in packages:
+        entry = cache.get(package)
+        fetched_at = entry and entry.get("fetched_at")
+        if not fetched_at or now - datetime.fromisoformat(fetched_at) > max_age:
+            stale.append(package)
+
+    if stale:
+        print(f"Refreshing SPEC 0 release dates for {len(stale)} package(s): {', '.join(stale)}")
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(stale)))) as executor:
+            futures = {executor.submit(_refresh_release_dates, pkg, cache.get(pkg)): pkg for pkg in stale}
+            for future in as_completed(futures):
+                package = futures[future]
                 try:
-                    version = Version(ver)
-                except:
-                    continue
-
-                # Skip pre-releases and patch versions (only consider X.Y.0)
-                if version.is_prerelease or version.micro != 0:
-                    continue
-
-                # Parse upload time
-                release_date = None
-                for format in ["%Y-%m-%dT%H:%M:%S.%fZ", "%Y-%m-%dT%H:%M:%SZ"]:
-                    try:
-                        release_date = datetime.strptime(f["upload-time"], format)
-                        break
-                    except:
-                        pass
-
-                if not release_date:
-                    continue
-
-                file_date[version].append(release_date)
-
-            # Get earliest release date for each version
-            release_dates = {v: min(file_date[v]) for v in file_date}
-
-            # Filter versions that are still within support window
-            # (drop_date must be in the future)
-            supported_versions = []
-            for ver, release_date in sorted(release_dates.items()):
-                drop_date = release_date + plus24
-                if drop_date >= current_date:
-                    supported_versions.append(ver)
-
-            # Get minimum supported version
-            if supported_versions:
-                min_version = min(supported_versions)
-                spec0_requirements.append(f"{package}>={min_version}")
-                print(f"OK (>={min_version})")
-            else:
-                # No version meets criteria, don't add constraint
-                print("OK (no constraint)")
+                    cache[package] = future.result()
+                except Exception as e:
+                    print(f"FAILED to refresh SPEC 0 release dates for {package} ({e})")
+
+        tmp_path = f"{cache_path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"packages": cache}, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"Warning: Could not write SPEC 0 cache {cache_path}: {e}")
+
+    return {
+        package: {
+            Version(version): datetime.fromisoformat(release_date)
+            for version, release_date in cache[package]["release_dates"].items()
+        }
+        for package in packages
+        if package in cache
+    }
+
+
+def build_spec0_drop_schedule(release_dates: dict) -> dict:
+    """Build the SPEC 0 drop-schedule index: when each release stops being supported.
+
+    Args:
+        release_dates: Dict from load_spec0_release_dates()
+
+    Returns:
+        Dict mapping package name → list of (version, release_date, drop_date) tuples sorted by drop date
+    """
+    return {
+        package: sorted(
+            ((version, release_date, release_date + SPEC0_SUPPORT_WINDOW) for version, release_date in dates.items()),
+            key=lambda entry: (entry[2], entry[0]),
+        )
+        for package, dates in release_dates.items()
+    }
+
+
+def spec0_minimum_versions_from_schedule(drop_schedule: dict, on_date: datetime) -> dict:
+    """Look up the minimum SPEC 0 supported version of each package on a given date.
+
+    The minimum supported version is the oldest version whose drop date hasn't passed yet.
+
+    Args:
+        drop_schedule: Dict from build_spec0_drop_schedule()
+        on_date: Date to evaluate SPEC 0 at (may be in the future)
+
+    Returns:
+        Dict mapping package name → minimum supported Version (packages with no supported version are omitted)
+    """
+    minimum_versions = {}
+    for package, timeline in drop_schedule.items():
+        still_supported = timeline[bisect_left(timeline, on_date, key=lambda entry: entry[2]):]
+        if still_supported:
+            minimum_versions[package] = min(version for version, _, _ in still_supported)
+    return minimum_versions
+
+
+def spec0_requirements_on(drop_schedule: dict, on_date: datetime) -> dict:
+    """SPEC 0 requirements in effect on a given date, e.g. {"numpy": ">=2.0.0", "scipy": ">=1.12.0"}."""
+    return {
+        package.lower(): f">={version}"
+        for package, version in spec0_minimum_versions_from_schedule(drop_schedule, on_date).items()
+    }
 
-        except Exception as e:
-            print(f"FAILED ({e})")
-            # On error, continue without adding this package
-            continue
 
+def spec0_minimum_versions(release_dates: dict, on_date: datetime) -> dict:
+    """Compute the minimum SPEC 0 supported version of each package on a given date.
+
+    Args:
+        release_dates: Dict from load_spec0_release_dates()
+        on_date: Date to evaluate SPEC 0 at
+
+    Returns:
+        Dict mapping package name → minimum supported Version (packages with no supported version are omitted)
+    """
+    return spec0_minimum_versions_from_schedule(build_spec0_drop_schedule(release_dates), on_date)
+
+
+def get_spec0_packages(current_date=None):
+    """
+    Returns a list of SPEC 0 core packages with minimum supported versions based on current date.
+    SPEC 0 policy: Drop support for core package dependencies 2 years after their initial release.
+
+    :param current_date: Date to evaluate SPEC 0 at (default: now)
+    :return: A list like ["numpy>=2.0.0", "scipy>=1.11.0", ...]
+    """
+    release_dates = load_spec0_release_dates()
+    minimum_versions = spec0_minimum_versions(release_dates, current_date or datetime.now())
+
+    spec0_requirements = []
+    for package in SPEC0_CORE_PACKAGES:
+        if package in minimum_versions:
+            spec0_requirements.append(f"{package}>={minimum_versions[package]}")
+            print(f"SPEC 0 minimum for {package}: >={minimum_versions[package]}")
+        elif package in release_dates:
+            # No version meets criteria, don't add constraint
+            print(f"SPEC 0 minimum for {package}: no constraint")
     return spec0_requirements
 
 
@@ -580,7 +740,8 @@ def parse_direct_requirements_from_lockfile(lockfile_path: str) -> dict:
                 current_ver = None
                 current_is_direct = False
 
-                match = re.match(r"^([A-Za-z0-9][A-Za-z0-9._-]*)==([^\s#]+)$", stripped)
+                # A trailing backslash continues the entry with --hash lines (`uv pip compile --generate-hashes`)
+                match = re.match(r"^([A-Za-z0-9][A-Za-z0-9._-]*)==([^\s#\\]+)(?:\s*\\)?$", stripped)
                 if match:
                     current_pkg = match.group(1).lower()
                     current_ver = match.group(2)
@@ -0,0 +1,146 @@
+#! /usr/bin/env python
+"""
+Query the JSON lines dependency table written by `pipeline.py --generate-spreadsheet`
+(see `write_table_data_jsonl()` in generate_dependency_table.py) without parsing the xlsx.
+
+Usage:
+    python utils/query_dependency_table.py TABLE.jsonl constraints numpy
+    python utils/query_dependency_table.py TABLE.jsonl conflicts
+    python utils/query_dependency_table.py TABLE.jsonl spec0
+    python utils/query_dependency_table.py TABLE.jsonl requirements
+"""
+
+import argparse
+import json
+import sys
+
+
+def load_table_records(path):
+    """
+    Read the records of a JSON lines dependency table.
+
+    Args:
+        path: Path to the .jsonl file
+
+    Returns:
+        List of record dicts, one per (project, dependency) cell
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _project_name(project):
+    return project.split("==")[0]
+
+
+def _requirement(package_name, version_range):
+    if not version_range or version_range.lower() == "any":
+        return package_name
+    return f"{package_name}{version_range}"
+
+
+def dependency_constraints(records, dependency):
+    """
+    List every project constraining a dependency.
+
+    Args:
+        records: Records from load_table_records()
+        dependency: Dependency name (case-insensitive)
+
+    Returns:
+        List of (project, range, compatible) tuples in table order
+    """
+    dependency = dependency.lower()
+    return [
+        (record['project'], record['range'], record['compatible'])
+        for record in records
+        if record['dependency'].lower() == dependency
+    ]
+
+
+def find_conflicts(records):
+    """
+    Return human-readable dependency conflicts, formatted like find_dependency_conflicts().
+    """
+    involved = {}
+    for record in records:
+        if record['allowed_range'] is not None:
+            continue
+        projects = involved.setdefault(record['dependency'], [])
+        if record['range'] and record['range'].lower() != "any":
+            projects.append(f"{_project_name(record['project'])} requires {record['dependency']}{record['range']}")
+
+    return [f"Conflict for '{dependency}': " + "; ".join(projects)
+            for dependency, projects in sorted(involved.items()) if projects]
+
+
+def find_spec0_problems(records):
+    """
+    Return human-readable SPEC 0 incompatibilities, formatted like find_spec0_problems() in generate_dependency_table.py.
+    """
+    problems = [
+        (_project_name(record['project']), record['dependency'], record['range'], record['spec0_requirement'])
+        for record in records
+        if record['spec0_compliant'] is False and record['spec0_requirement']
+    ]
+    problems.sort(key=lambda x: (x[0].lower(), x[1].lower()))
+    return [f"{project}: requires {_requirement(dependency, version_range)} but SPEC 0 requires {dependency}{spec0_req}"
+            for project, dependency, version_range, spec0_req in problems]
+
+
+def requirements_file(records):
+    """
+    Build requirements.txt content from the allowed version ranges, like spreadsheet_to_requirements_file().
+
+    Raises:
+        ValueError: If any dependency has a conflict (no allowed range)
+    """
+    allowed_ranges = {}
+    for record in records:
+        allowed_ranges.setdefault(record['dependency'], record['allowed_range'])
+
+    requirements = []
+    for package, version_range in allowed_ranges.items():
+        if version_range is None:
+            raise ValueError(f"Cannot create a requirements file from the dependency table because there is a dependency conflict (with package `{package}`).")
+        requirements.append(_requirement(package, version_range))
+
+    requirements.sort(key=str.lower)
+    return "\n".join(requirements)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query a PyHC dependency table (.jsonl)")
+    parser.add_argument("table", help="Path to the .jsonl dependency table")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    constraints_parser = subparsers.add_parser("constraints", help="List the projects constraining a dependency")
+    constraints_parser.add_argument("dependency")
+    subparsers.add_parser("conflicts", help="List dependency conflicts")
+    subparsers.add_parser("spec0", help="List SPEC 0 problems")
+    subparsers.add_parser("requirements", help="Print a requirements file of allowed version ranges")
+    args = parser.parse_args(argv)
+
+    records = load_table_records(args.table)
+
+    if args.command == "constraints":
+        constraints = dependency_constraints(records, args.dependency)
+        if not constraints:
+            print(f"No projects depend on {args.dependency}.")
+        for project, version_range, compatible in constraints:
+            status = "compatible" if compatible else "INCOMPATIBLE"
+            print(f"{project}: {_requirement(args.dependency, version_range)} ({status})")
+    elif args.command == "conflicts":
+        print("\n".join(find_conflicts(records)) or "No dependency conflicts found.")
+    elif args.command == "spec0":
+        print("\n".join(find_spec0_problems(records)) or "No SPEC 0 problems detected.")
+    elif args.command == "requirements":
+        try:
+            print(requirements_file(records))
+        except ValueError as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
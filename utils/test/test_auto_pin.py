@@ -691,6 +691,22 @@ class TestParseDirectRequirementsFromLockfile(unittest.TestCase):
         finally:
             os.unlink(lockfile)
 
+    def test_parses_hashed_entries(self):
+        lockfile = self._write_lockfile(
+            "alpha==1.0.0 \\\n"
+            "    --hash=sha256:aaaa \\\n"
+            "    --hash=sha256:bbbb\n"
+            "    # via -r docker/pyhc-environment/contents/packages.txt\n"
+            "beta==2.0.0 \\\n"
+            "    --hash=sha256:cccc\n"
+            "    # via alpha\n"
+        )
+        try:
+            direct = parse_direct_requirements_from_lockfile(lockfile)
+            self.assertEqual(direct, {"alpha": "1.0.0"})
+        finally:
+            os.unlink(lockfile)
+
     def test_recognizes_packages_txt_without_path_prefix(self):
         lockfile = self._write_lockfile(
             "sciqlop==0.10.4\n"
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""
+Unit tests for the benchmark corpus and the baseline comparison in utils/benchmark.
+"""
+
+import os
+import sys
+import unittest
+
+# Add the utils directory to the path so we can import module functions.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark.corpus import generate_corpus
+from benchmark.run_benchmarks import compare_results, run_benchmarks
+from generate_dependency_table import parse_uv_tree_output, reduce_environment_requirements
+
+
+class TestBenchmarkCorpus(unittest.TestCase):
+    def test_corpus_is_deterministic(self):
+        self.assertEqual(generate_corpus(10, 50, 5, 10, seed=3), generate_corpus(10, 50, 5, 10, seed=3))
+        self.assertNotEqual(generate_corpus(10, 50, 5, 10, seed=3), generate_corpus(10, 50, 5, 10, seed=4))
+
+    def test_uv_trees_parse_to_compatible_ranges(self):
+        corpus = generate_corpus(n_projects=20, n_dependencies=60, min_deps=5, max_deps=15)
+        deps_by_project = {
+            project: parse_uv_tree_output(project, tree)[1] for project, tree in corpus['uv_trees'].items()
+        }
+        self.assertEqual(
+            {project: set(deps) for project, deps in deps_by_project.items()},
+            {project: set(deps) for project, deps in corpus['deps_by_project'].items()},
+        )
+        # Ranges are generated around one center version per dependency, so nothing conflicts
+        combined = reduce_environment_requirements(deps_by_project, allow_conflicts=False)
+        self.assertEqual(set(combined), set().union(*deps_by_project.values()))
+        self.assertNotIn(None, combined.values())
+
+
+class TestBenchmarkRun(unittest.TestCase):
+    def test_run_small_corpus(self):
+        results = run_benchmarks(n_projects=5, n_dependencies=30, repeat=1)
+        self.assertEqual(
+            set(results['results']),
+            {'parse_uv_tree_output', 'combine_ranges', 'reduce_environment_requirements',
+             'generate_dependency_table_data', 'excel_spreadsheet_from_table_data'},
+        )
+        self.assertEqual(results['metadata']['projects'], 5)
+
+    def test_compare_flags_regressions_beyond_threshold(self):
+        baseline = {'results': {'a': {'median': 1.0}, 'b': {'median': 1.0}, 'c': {'median': 1.0}}}
+        current = {'results': {'a': {'median': 1.1}, 'b': {'median': 1.5}, 'new': {'median': 9.0}}}
+        rows = {name: regressed for name, _, _, _, regressed in compare_results(baseline, current, threshold=0.2)}
+        self.assertEqual(rows, {'a': False, 'b': True})
+
+
+if __name__ == '__main__':
+    unittest.main()
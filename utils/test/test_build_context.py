@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""
+Unit tests for the build context hash in build_context.py.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the utils directory to the path so we can import module functions.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from build_context import (
+    compute_context_hash,
+    is_ignored,
+    iter_context_files,
+    load_dockerignore,
+    parse_base_images,
+)
+
+IMAGE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "docker", "pyhc-environment",
+)
+
+DOCKERIGNORE = """\
+# comment
+**/__pycache__
+contents/cdf/src
+contents/wheelhouse/manifest.json
+/docs/*.md
+!docs/README.md
+"""
+
+BASE = {"continuumio/miniconda3": "sha256:base"}
+
+
+class TestBuildContext(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.context = self._tmp.name
+        self._write(".dockerignore", DOCKERIGNORE)
+        self._write("Dockerfile", "FROM continuumio/miniconda3\n")
+        self._write("contents/environment.yml", "name: pyhc-all\n")
+        self._write("contents/__pycache__/x.cpython-312.pyc", "bytecode")
+        self._write("contents/cdf/src/lib.c", "int x;")
+        self._write("contents/cdf/lib/libcdf.so", "elf")
+        self._write("contents/wheelhouse/manifest.json", "{}")
+        self._write("docs/notes.md", "notes")
+        self._write("docs/README.md", "readme")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, relpath, content):
+        path = os.path.join(self.context, relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_dockerignore(self):
+        patterns = load_dockerignore(self.context)
+        self.assertEqual(len(patterns), 5)
+        self.assertTrue(is_ignored("__pycache__/a.pyc", patterns))
+        self.assertTrue(is_ignored("contents/__pycache__/x.cpython-312.pyc", patterns))
+        self.assertTrue(is_ignored("contents/cdf/src/lib.c", patterns))
+        self.assertFalse(is_ignored("contents/cdf/lib/libcdf.so", patterns))
+        self.assertTrue(is_ignored("docs/notes.md", patterns))
+        self.assertFalse(is_ignored("docs/README.md", patterns))
+        self.assertEqual(list(iter_context_files(self.context)), [
+            ".dockerignore", "Dockerfile", "contents/cdf/lib/libcdf.so", "contents/environment.yml", "docs/README.md",
+        ])
+
+    def test_hash_tracks_context_base_images_and_build_args(self):
+        context_hash = compute_context_hash(self.context, BASE)
+        self.assertEqual(context_hash, compute_context_hash(self.context, BASE, {}))
+
+        # Ignored files don't matter
+        self._write("contents/wheelhouse/manifest.json", '{"key": {}}')
+        self._write("contents/__pycache__/y.cpython-312.pyc", "bytecode")
+        self.assertEqual(context_hash, compute_context_hash(self.context, BASE))
+
+        self.assertNotEqual(context_hash, compute_context_hash(self.context, {"continuumio/miniconda3": "sha256:new"}))
+        self.assertNotEqual(context_hash, compute_context_hash(self.context, BASE, {"PYTHON": "3.12"}))
+        os.chmod(os.path.join(self.context, "contents", "environment.yml"), 0o755)
+        self.assertNotEqual(context_hash, compute_context_hash(self.context, BASE))
+        self._write("contents/environment.yml", "name: pyhc-all\ndependencies: []\n")
+        self.assertNotEqual(context_hash, compute_context_hash(self.context, BASE))
+
+    def test_hash_ignores_wheelhouse_binaries_but_not_the_plan(self):
+        self._write("contents/install-tiers/wheelhouse.txt", "apexpy==2.1.1  # apexpy-2.1.1-cp312-bff2264696b1\n")
+        context_hash = compute_context_hash(self.context, BASE)
+
+        # Wheels restored from the CI cache, or merged in after a build
+        self._write("contents/wheelhouse/apexpy-2.1.1-cp312-bff2264696b1/apexpy-2.1.1-cp312-cp312-linux_x86_64.whl", "wheel")
+        self._write("contents/wheelhouse/old-1.0-cp312-0123456789ab/old-1.0-cp312-cp312-linux_x86_64.whl", "stale")
+        self.assertIn("contents/wheelhouse/old-1.0-cp312-0123456789ab/old-1.0-cp312-cp312-linux_x86_64.whl",
+                      list(iter_context_files(self.context)))  # Still sent to Docker
+        self.assertEqual(context_hash, compute_context_hash(self.context, BASE))
+
+        self._write("contents/install-tiers/wheelhouse.txt", "apexpy==2.1.2  # apexpy-2.1.2-cp312-bff2264696b1\n")
+        self.assertNotEqual(context_hash, compute_context_hash(self.context, BASE))
+
+    def test_parse_base_images(self):
+        self.assertEqual(parse_base_images(os.path.join(IMAGE_DIR, "Dockerfile")), ["continuumio/miniconda3"])
+        path = self._write("Dockerfile.multi", "FROM --platform=linux/amd64 python:3.12-slim AS build\n"
+                                               "FROM build AS test\nfrom scratch\nFROM test\nFROM python:3.12-slim\n")
+        self.assertEqual(parse_base_images(path), ["python:3.12-slim"])
+
+    def test_repository_context_ignores_bytecode(self):
+        self.assertFalse(any("__pycache__" in path for path in iter_context_files(IMAGE_DIR)))
+        self.assertIn("contents/install-tiers/top.txt", list(iter_context_files(IMAGE_DIR)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+Unit tests for the build performance history in build_history.py.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add the utils directory to the path so we can import module functions.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from build_history import (
+    append_history,
+    detect_regressions,
+    format_build_summary,
+    format_regressions,
+    get_history_path,
+    load_history,
+    record_build_performance,
+    summarize_build,
+)
+
+MB = 1024 ** 2
+
+
+def _report(conda_seconds=400.0, uv_seconds=(120.0, 80.0), size=8000 * MB, conda_cached=False):
+    return {
+        "image": "user/pyhc-environment:v2026.10.19",
+        "built_at": "2026-10-19T12:00:00",
+        "build_seconds": 900.0,
+        "size": size,
+        "steps": [
+            {"step": "[toolchain 3/20] RUN useradd -m jovyan && chown jovyan:users /app", "cached": True, "seconds": None, "layer_size": 4096},
+            {"step": "[toolchain 6/20] COPY --chown=jovyan:users contents/environment.yml /app/environment.yml", "cached": False, "seconds": 0.1, "layer_size": 2048},
+            {"step": "[toolchain 7/20] RUN SLIM_SINCE=$(mktemp) && conda env create -f /app/environment.yml", "cached": conda_cached,
+             "seconds": None if conda_cached else conda_seconds, "layer_size": 3000 * MB},
+            {"step": "[stage-3 2/14] RUN SLIM_SINCE=$(mktemp) && uv pip install --system --no-deps -r /app/install-tiers/base.txt", "cached": False,
+             "seconds": uv_seconds[0], "layer_size": 2000 * MB},
+            {"step": "[stage-3 4/14] RUN SLIM_SINCE=$(mktemp) && uv pip install --system --no-deps -r /app/install-tiers/top.txt", "cached": False,
+             "seconds": uv_seconds[1], "layer_size": 500 * MB},
+            {"step": "[stage-3 12/14] RUN /bin/bash -c \"source activate pyhc-all && python -c 'import wmm2015'\"", "cached": False,
+             "seconds": 12.0, "layer_size": None},
+        ],
+    }
+
+
+class TestBuildHistory(unittest.TestCase):
+    def test_summarize_build(self):
+        metrics = summarize_build(_report())["metrics"]
+        self.assertEqual(metrics["conda env"], {"seconds": 400.0, "bytes": 3000 * MB})
+        self.assertEqual(metrics["uv install"], {"seconds": 200.0, "bytes": 2500 * MB})
+        # The COPY --chown step isn't the ownership step, and a cached step has no duration
+        self.assertEqual(metrics["ownership"], {"seconds": None, "bytes": 4096})
+        self.assertEqual(metrics["pre-import"], {"seconds": 12.0, "bytes": None})
+        self.assertEqual(metrics["image"], {"seconds": None, "bytes": 8000 * MB})
+        self.assertEqual(metrics["build"], {"seconds": 900.0, "bytes": None})
+        self.assertIn("  conda env  400s, 2.93 GB", format_build_summary(summarize_build(_report())))
+
+    def test_detect_regressions(self):
+        history = [summarize_build(_report(conda_seconds=seconds)) for seconds in (380.0, 420.0, 400.0)]
+        self.assertEqual(detect_regressions(history, summarize_build(_report(conda_seconds=480.0))), [])
+
+        regressions = detect_regressions(history, summarize_build(_report(conda_seconds=560.0, size=11000 * MB)))
+        self.assertEqual([(r["metric"], r["kind"]) for r in regressions], [("image", "bytes"), ("conda env", "seconds")])
+        self.assertAlmostEqual(regressions[1]["change"], 0.4)
+        self.assertEqual(format_regressions("pyhc-environment", regressions[1:]),
+                         ["pyhc-environment: conda env took 560s vs median 400s (+40%)"])
+
+        # Not enough history yet, a cached step, and changes too small to matter are not flagged
+        self.assertEqual(detect_regressions(history[:2], summarize_build(_report(conda_seconds=900.0))), [])
+        self.assertEqual(detect_regressions(history, summarize_build(_report(conda_cached=True))), [])
+        small = [summarize_build(_report(uv_seconds=(10.0, 10.0))) for _ in range(3)]
+        self.assertEqual(detect_regressions(small, summarize_build(_report(uv_seconds=(20.0, 20.0)))), [])
+
+    def test_window_uses_recent_builds(self):
+        history = [summarize_build(_report(conda_seconds=1000.0))] * 5 + [summarize_build(_report(conda_seconds=400.0))] * 3
+        current = summarize_build(_report(conda_seconds=600.0))
+        self.assertEqual(detect_regressions(history, current, window=10), [])
+        self.assertEqual([r["metric"] for r in detect_regressions(history, current, window=3)], ["conda env"])
+
+    def test_history_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = get_history_path("pyhc-environment", tmp)
+            self.assertEqual(load_history(path), [])
+            for seconds in range(5):
+                append_history(path, {"metrics": {"build": {"seconds": seconds}}}, max_records=3)
+            with open(path, "a") as f:
+                f.write("not json\n")
+            self.assertEqual([r["metrics"]["build"]["seconds"] for r in load_history(path)], [2, 3, 4])
+
+    def test_record_build_performance(self):
+        with tempfile.TemporaryDirectory() as tmp, patch.dict(os.environ, {"PYHC_BUILD_REGRESSION_THRESHOLD": "0.1"}):
+            for _ in range(3):
+                self.assertEqual(record_build_performance("pyhc-environment", _report(), tmp)[1], [])
+            record, regressions = record_build_performance("pyhc-environment", _report(uv_seconds=(180.0, 80.0)), tmp)
+            self.assertEqual([r["metric"] for r in regressions], ["uv install"])
+            self.assertEqual(len(load_history(get_history_path("pyhc-environment", tmp))), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
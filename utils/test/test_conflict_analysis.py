@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""
+Unit tests for the minimal conflict explanations in conflict_analysis.py.
+"""
+
+import os
+import sys
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+# Add the utils directory to the path so we can import module functions.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conflict_analysis import (
+    analyze_dependency_conflicts,
+    format_conflict_analysis,
+    minimal_conflicting_subsets,
+    newest_compatible_release,
+)
+
+
+def _table_data(allowed_ranges, project_ranges):
+    return {
+        "core_dependencies": {},
+        "other_dependencies": {dep: (i + 3, allowed, True) for i, (dep, allowed) in enumerate(allowed_ranges.items())},
+        "project_data": {
+            project: {dep: (False, True, version_range) for dep, version_range in ranges.items()}
+            for project, ranges in project_ranges.items()
+        },
+    }
+
+
+class TestMinimalConflictingSubsets(unittest.TestCase):
+    def test_pairs_are_minimal(self):
+        cores, total = minimal_conflicting_subsets({"a==1": "<2.0", "b==1": ">=2.0", "c==1": ">=3.0", "d==1": "any"})
+        self.assertEqual(total, 2)
+        self.assertEqual(cores, [
+            (("a==1", "<2.0"), ("b==1", ">=2.0")),
+            (("a==1", "<2.0"), ("c==1", ">=3.0")),
+        ])
+
+    def test_single_version_excluded_by_third_project(self):
+        cores, total = minimal_conflicting_subsets({"a==1": ">=1.0", "b==1": "<=1.0", "c==1": ">=0.5,!=1.0"})
+        self.assertEqual(total, 1)
+        self.assertEqual(cores, [(("a==1", ">=1.0"), ("b==1", "<=1.0"), ("c==1", ">=0.5,!=1.0"))])
+
+    def test_empty_range_on_its_own(self):
+        cores, _ = minimal_conflicting_subsets({"a==1": ">=2.0,<1.0", "b==1": ">=1.0"})
+        self.assertEqual(cores, [(("a==1", ">=2.0,<1.0"),)])
+
+    def test_max_cores_still_counts_everything(self):
+        contributors = {f"low{i}==1": "<2.0" for i in range(4)}
+        contributors.update({f"high{i}==1": ">=2.0" for i in range(3)})
+        cores, total = minimal_conflicting_subsets(contributors, max_cores=5)
+        self.assertEqual((len(cores), total), (5, 12))
+
+
+RELEASES = {
+    "sunpy": {"6.0.0": datetime(2024, 5, 1), "6.1.0": datetime(2024, 9, 1), "7.0.0": datetime(2025, 6, 1)},
+    "legacy": {"1.0": datetime(2020, 1, 1)},
+}
+REQUIRES_DIST = {
+    ("sunpy", "7.0.0"): ["numpy>=2.0", "pytest; extra == 'tests'"],
+    ("sunpy", "6.1.0"): ["numpy>=1.25"],
+    ("sunpy", "6.0.0"): ["numpy>=1.23"],
+    ("legacy", "1.0"): ["numpy<2.0"],
+}
+
+
+def _load_requires_dist(distributions, **_kwargs):
+    return {distribution: REQUIRES_DIST[distribution] for distribution in distributions}
+
+
+@patch("conflict_analysis.load_requires_dist", side_effect=_load_requires_dist)
+@patch("conflict_analysis.fetch_release_history", side_effect=lambda name: RELEASES[name])
+class TestNewestCompatibleRelease(unittest.TestCase):
+    def test_backtracks_to_newest_fitting_release(self, _history, _requires_dist):
+        self.assertEqual(newest_compatible_release("sunpy[all]==7.0.0", "numpy", ["<2.0"]), ("6.1.0", ">=1.25"))
+
+    def test_inherited_when_current_release_fits(self, _history, _requires_dist):
+        self.assertEqual(newest_compatible_release("sunpy==7.0.0", "numpy", [">=2.1"]), "inherited")
+
+    def test_none_when_nothing_fits(self, _history, _requires_dist):
+        self.assertIsNone(newest_compatible_release("sunpy==7.0.0", "numpy", ["<1.0"]))
+
+    def test_analysis_and_report(self, _history, _requires_dist):
+        table_data = _table_data(
+            {"numpy": None, "astropy": None},
+            {
+                "sunpy==7.0.0": {"numpy": ">=2.0", "astropy": ">=6.0"},
+                "legacy==1.0": {"numpy": "<2.0", "astropy": ">=5.0"},
+            },
+        )
+        analysis = analyze_dependency_conflicts(table_data)
+
+        self.assertEqual(analysis["astropy"]["allowed_range"], ">=6.0")
+        self.assertEqual(analysis["astropy"]["cores"], [])
+        self.assertEqual(analysis["numpy"]["cores"], [(("legacy==1.0", "<2.0"), ("sunpy==7.0.0", ">=2.0"))])
+        self.assertEqual(analysis["numpy"]["suggestions"]["sunpy==7.0.0"], ("6.1.0", ">=1.25"))
+
+        self.assertEqual(format_conflict_analysis(analysis), [
+            "'astropy': not a real conflict; the ranges intersect at astropy>=6.0",
+            "'numpy': legacy requires numpy<2.0 + sunpy requires numpy>=2.0",
+            "    newest co-installable sunpy: sunpy==6.1.0 (numpy>=1.25)",
+        ])
+
+
+class TestAnalyzeWithoutConflicts(unittest.TestCase):
+    def test_no_conflicts(self):
+        table_data = _table_data({"numpy": ">=2.0"}, {"sunpy==7.0.0": {"numpy": ">=2.0"}})
+        self.assertEqual(analyze_dependency_conflicts(table_data, suggest_releases=False), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
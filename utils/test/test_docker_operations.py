@@ -3,14 +3,54 @@
 Unit tests for docker_operations.py helpers.
 """
 
+import base64
+import json
 import os
+import shutil
+import subprocess
 import sys
+import tempfile
 import unittest
+from unittest.mock import patch
 
 # Add the utils directory to the path so we can import module functions.
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from docker_operations import normalize_tag_suffix
+from docker_operations import (
+    normalize_tag_suffix,
+    build_cache_args,
+    parse_build_events,
+    format_build_event,
+    normalize_instruction,
+    attach_layer_sizes,
+    write_build_report,
+    inspect_image_layers,
+    parse_first_plot,
+    get_registry_image,
+    find_reusable_image,
+    resolve_base_digests,
+    CONTEXT_HASH_LABEL,
+    format_first_plot_report,
+    format_build_cache_report,
+    rotate_local_build_cache,
+    parse_docker_history,
+    format_image_metrics_report,
+    record_image_metrics,
+    load_image_metrics,
+    build_and_push_docker_images,
+    update_wheelhouse,
+    parse_slim_report,
+    format_slim_report,
+    check_size_budget,
+    get_image_size_budget,
+    parse_push_output,
+    get_manifest_layers,
+    publish_image,
+    parse_push_events,
+    get_docker_client,
+    run_streaming,
+    format_push_report,
+)
 
 
 class TestNormalizeTagSuffix(unittest.TestCase):
@@ -42,5 +82,477 @@ class TestNormalizeTagSuffix(unittest.TestCase):
             normalize_tag_suffix("@temp")
 
 
+def _event(vertexes=(), logs=()):
+    return json.dumps({"vertexes": list(vertexes),
+                       "logs": [{"vertex": digest, "stream": 1, "data": base64.b64encode(data.encode()).decode()}
+                                for digest, data in logs]})
+
+
+RAWJSON_OUTPUT = [
+    "#0 building with \"builder\" instance using docker-container driver\n",
+    _event([{"digest": "sha256:d1", "name": "[internal] load build definition from Dockerfile",
+             "started": "2026-10-19T12:00:00.000000000Z", "completed": "2026-10-19T12:00:00.100000000Z"}]),
+    _event([{"digest": "sha256:d4", "name": "[toolchain 1/16] FROM docker.io/continuumio/miniconda3@sha256:0123",
+             "started": "2026-10-19T12:00:01Z"}]),
+    _event([{"digest": "sha256:d4", "name": "[toolchain 1/16] FROM docker.io/continuumio/miniconda3@sha256:0123",
+             "started": "2026-10-19T12:00:01Z", "completed": "2026-10-19T12:00:01.123456789Z"},
+            {"digest": "sha256:d5", "name": "[toolchain 2/16] RUN apt-get update && apt-get install -y gcc",
+             "cached": True, "started": "2026-10-19T12:00:01Z", "completed": "2026-10-19T12:00:01Z"}]),
+    _event([{"digest": "sha256:d8", "name": "[toolchain 8/16] RUN uv pip install --system --no-deps -r /app/install-tiers/top.txt",
+             "started": "2026-10-19T12:00:02Z"}],
+           [("sha256:d8", "Resolved 412 packages in 2.98s\nslim: 1048"), ("sha256:d8", "576\t12\ttop\tdeny **/tests/\n")]),
+    _event([{"digest": "sha256:d8", "name": "[toolchain 8/16] RUN uv pip install --system --no-deps -r /app/install-tiers/top.txt",
+             "started": "2026-10-19T12:00:02Z", "completed": "2026-10-19T12:04:49.400000Z"}]),
+    _event([{"digest": "sha256:d9", "name": "[toolchain 9/16] RUN rm /app/environment.yml",
+             "started": "2026-10-19T12:04:50Z", "completed": "2026-10-19T12:04:50Z",
+             "error": "process did not complete successfully"}]),
+    _event([{"digest": "sha256:d12", "name": "exporting to image", "started": "2026-10-19T12:04:51Z"}]),
+]
+
+
+class TestBuildCache(unittest.TestCase):
+    """Tests for the BuildKit layer cache helpers."""
+
+    def test_registry_and_local_cache_args(self):
+        self.assertEqual(build_cache_args(), [])
+        self.assertEqual(build_cache_args("user/pyhc-environment:buildcache"), [
+            "--cache-from=type=registry,ref=user/pyhc-environment:buildcache",
+            "--cache-to=type=registry,ref=user/pyhc-environment:buildcache,mode=max",
+        ])
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_dir = os.path.join(tmp, "pyhc-environment")
+            # Nothing to import on the first run
+            self.assertEqual(build_cache_args(cache_dir=cache_dir), [f"--cache-to=type=local,dest={cache_dir}-new,mode=max"])
+            os.makedirs(cache_dir)
+            self.assertEqual(build_cache_args(cache_dir=cache_dir), [
+                f"--cache-from=type=local,src={cache_dir}",
+                f"--cache-to=type=local,dest={cache_dir}-new,mode=max",
+            ])
+
+    def test_rotate_local_build_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_dir = os.path.join(tmp, "cache")
+            os.makedirs(os.path.join(cache_dir, "stale"))
+            os.makedirs(os.path.join(f"{cache_dir}-new", "fresh"))
+            rotate_local_build_cache(cache_dir)
+            self.assertEqual(os.listdir(cache_dir), ["fresh"])
+            self.assertFalse(os.path.exists(f"{cache_dir}-new"))
+
+    def test_parse_build_events(self):
+        steps, logs = parse_build_events(RAWJSON_OUTPUT)
+        self.assertEqual(steps, [
+            {"step": "[toolchain 1/16] FROM docker.io/continuumio/miniconda3@sha256:0123", "cached": False, "seconds": 0.1, "error": None},
+            {"step": "[toolchain 2/16] RUN apt-get update && apt-get install -y gcc", "cached": True, "seconds": None, "error": None},
+            {"step": "[toolchain 8/16] RUN uv pip install --system --no-deps -r /app/install-tiers/top.txt", "cached": False, "seconds": 287.4, "error": None},
+            {"step": "[toolchain 9/16] RUN rm /app/environment.yml", "cached": False, "seconds": 0.0, "error": "process did not complete successfully"},
+        ])
+        # Log chunks are joined before splitting into lines
+        self.assertEqual(logs, ["Resolved 412 packages in 2.98s", "slim: 1048576\t12\ttop\tdeny **/tests/"])
+        self.assertEqual(parse_slim_report(logs), {"deny **/tests/": {"bytes": 1048576, "files": 12, "layers": ["top"]}})
+        report = format_build_cache_report(steps)
+        self.assertTrue(report.startswith("Layer cache hits: 1/4 steps"))
+        self.assertIn("built in 287.4s  [toolchain 8/16] RUN uv pip install", report)
+
+    def test_format_build_event(self):
+        seen = {}
+        text = "".join(format_build_event(line, seen) for line in RAWJSON_OUTPUT)
+        self.assertIn("#2 [toolchain 1/16] FROM docker.io/continuumio/miniconda3@sha256:0123\n", text)
+        self.assertIn("#3 CACHED\n", text)
+        self.assertIn("#4 Resolved 412 packages in 2.98s\n", text)
+        self.assertIn("#4 DONE 287.4s\n", text)
+        self.assertIn("#5 ERROR: process did not complete successfully\n", text)
+        self.assertTrue(text.startswith("#0 building with"))
+
+    def test_attach_layer_sizes(self):
+        steps = [
+            {"step": "[toolchain 1/4] FROM docker.io/continuumio/miniconda3@sha256:0123"},
+            {"step": "[toolchain 2/4] COPY --chown=jovyan:users contents/environment.yml /app/"},
+            {"step": "[wheels 1/2] RUN --mount=type=bind,source=contents/wheelhouse,target=/cache python /build.py"},
+            {"step": "[toolchain 3/4] RUN --mount=type=bind,from=wheels,target=/wheels uv pip install -r /wheels/install.txt"},
+            {"step": "[toolchain 4/4] USER jovyan"},
+        ]
+        layers = parse_docker_history([
+            "0\tUSER jovyan",
+            "52000000\tRUN |1 PYHC=1 /bin/sh -c uv pip install -r /wheels/install.txt # buildkit",
+            "4096\tCOPY contents/environment.yml /app/ # buildkit",
+            "80000000\t/bin/sh -c #(nop) ADD file:abc in /",
+        ])
+        self.assertEqual([step["layer_size"] for step in attach_layer_sizes(steps, layers)], [None, 4096, None, 52000000, 0])
+        self.assertEqual(normalize_instruction("RUN |1 PYHC=1 /bin/sh -c pip  install x # buildkit"), "RUN pip install x")
+
+    def test_run_streaming_takes_an_argument_list(self):
+        with patch("builtins.print"):
+            lines = run_streaming([sys.executable, "-c", "print('a b; echo c')"], render=str.upper)
+            self.assertEqual(lines, ["a b; echo c\n"])
+            with self.assertRaises(subprocess.CalledProcessError):
+                run_streaming([sys.executable, "-c", "raise SystemExit(3)"])
+
+    def test_inspect_image_layers_through_the_engine_api(self):
+        class FakeAPI:
+            def inspect_image(self, image):
+                return {"Size": 1234}
+
+            def history(self, image):
+                return [{"Size": 0, "CreatedBy": "USER jovyan"}, {"Size": 1000, "CreatedBy": "COPY a /app/ # buildkit"}]
+
+        client = type("FakeClient", (), {"api": FakeAPI()})()
+        self.assertEqual(inspect_image_layers("user/img:v1", client),
+                         (1234, [{"size": 0, "created_by": "USER jovyan"}, {"size": 1000, "created_by": "COPY a /app/ # buildkit"}]))
+
+    def test_parse_first_plot(self):
+        logs = ["Time to first plot: 14.2s without bytecode and caches, 1.9s in this image (12.3s saved)",
+                "first-plot: 14.20\t1.90"]
+        first_plot = parse_first_plot(logs)
+        self.assertEqual(first_plot, {"cold_seconds": 14.2, "warm_seconds": 1.9})
+        self.assertEqual(parse_first_plot(["#31 52.1 first-plot: 3\t1"]), {"cold_seconds": 3.0, "warm_seconds": 1.0})
+        self.assertEqual(format_first_plot_report(first_plot),
+                         "Time to first plot: 1.9s with baked-in bytecode and caches, 14.2s without (12.3s saved)")
+        self.assertIsNone(parse_first_plot(logs[:1]))
+        self.assertIn("not measured", format_first_plot_report(None))
+
+    def test_write_build_report(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_build_report(os.path.join(tmp, "reports"), "pyhc-environment", "v2026.10.19", {"steps": []})
+            self.assertTrue(path.endswith("pyhc-environment-v2026.10.19.json"))
+            with open(path) as f:
+                self.assertEqual(json.load(f), {"steps": []})
+
+
+class TestImageMetrics(unittest.TestCase):
+    """Tests for the image size and build time report."""
+
+    HISTORY = [
+        "0\tENTRYPOINT [\"/opt/pyhc/start\"]",
+        "412000000\tRUN /bin/sh -c uv pip install --system --no-deps --no-cache -r /app/install-tiers/top.txt # buildkit",
+        "2900000000\tRUN /bin/sh -c conda env create -f /app/environment.yml &&     conda clean -afy # buildkit",
+        "<missing>\tnot a layer",
+    ]
+
+    def test_parse_docker_history(self):
+        layers = parse_docker_history(self.HISTORY)
+        self.assertEqual(len(layers), 3)
+        self.assertEqual(layers[2], {"size": 2900000000, "created_by": "RUN /bin/sh -c conda env create -f /app/environment.yml && conda clean -afy # buildkit"})
+
+    def test_report_compares_with_previous_build(self):
+        current = {"size": 8 * 1024 ** 3, "build_seconds": 700.0, "layers": parse_docker_history(self.HISTORY)}
+        report = format_image_metrics_report(current, {"size": 10 * 1024 ** 3, "build_seconds": 820.0}, max_layers=2)
+        lines = report.splitlines()
+        self.assertEqual(lines[0], "Image size: 8.0 GB (-2.0 GB vs previous build), build time 700s (-120s)")
+        self.assertEqual(len(lines), 4)
+        self.assertIn("conda env create", lines[2])
+        self.assertTrue(format_image_metrics_report(current).startswith("Image size: 8.0 GB, build time 700s\n"))
+
+    def test_record_image_metrics(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            metrics = {"size": 100, "build_seconds": 5.0, "layers": []}
+            self.assertIsNone(record_image_metrics("pyhc-environment", metrics, tmp))
+            self.assertEqual(record_image_metrics("pyhc-environment", {**metrics, "size": 90}, tmp), {"size": 100, "build_seconds": 5.0})
+
+    def test_load_image_metrics(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertIsNone(load_image_metrics("pyhc-environment", tmp))
+            record_image_metrics("pyhc-environment", {"size": 100, "build_seconds": 5.0, "layers": []}, tmp)
+            self.assertEqual(load_image_metrics("pyhc-environment", tmp), {"size": 100, "build_seconds": 5.0})
+
+    def test_update_wheelhouse_skips_images_without_the_stage(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, "Dockerfile"), "w") as f:
+                f.write("FROM python:3.12\n")
+            self.assertIsNone(update_wheelhouse(tmp, []))
+
+
+
+class TestSizeBudgetBeforePush(unittest.TestCase):
+    """build_and_push_docker_images() checks the size budget before anything is pushed."""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.docker_folder = os.path.join(self._tmp.name, "docker")
+        os.makedirs(os.path.join(self.docker_folder, "pyhc-environment"))
+        with open(os.path.join(self.docker_folder, "pyhc-environment", "Dockerfile"), "w") as f:
+            f.write("FROM scratch\n")
+        self.cache_dir = os.path.join(self._tmp.name, "cache")
+        record_image_metrics("pyhc-environment", {"size": 1000, "build_seconds": 60.0}, self.cache_dir)
+        self.commands = []
+        self.outputs = {}
+
+    def _build(self, size):
+        environ = {"PYHC_PIPELINE_CACHE_DIR": self.cache_dir, "PYHC_IMAGE_SIZE_BUDGET": "0.05",
+                   "PYHC_SKIP_UNCHANGED_BUILDS": "false", "PYHC_REGISTRY_BUILD_CACHE": "false",
+                   "PYHC_BUILD_REPORT_DIR": os.path.join(self._tmp.name, "reports")}
+        run = lambda command, **kwargs: self.commands.append(command) or subprocess.CompletedProcess(command, 0, "", "")
+        with patch.dict(os.environ, environ), \
+                patch("docker_operations.subprocess.run", side_effect=run), \
+                patch("docker_operations.get_docker_client", return_value=None), \
+                patch("docker_operations.resolve_base_digests", return_value={}), \
+                patch("docker_operations.run_streaming", return_value=[]), \
+                patch("docker_operations.inspect_image_layers", return_value=(size, [])), \
+                patch("docker_operations.record_build_performance", return_value=({"image": "x", "metrics": {}}, [])), \
+                patch("docker_operations.set_github_output", side_effect=self.outputs.__setitem__), \
+                patch("docker_operations.publish_image", return_value={
+                    "tag": "user/pyhc-environment:v1", "seconds": 1.0, "uploaded_bytes": 0,
+                    "pushed": 0, "existing": 1, "mounted": 0, "digest": None}) as self.publish, \
+                patch("builtins.print"):
+            build_and_push_docker_images(self.docker_folder, "user", "token")
+
+    def test_over_budget_image_is_not_pushed(self):
+        with self.assertRaises(SystemExit):
+            self._build(1100)
+        self.publish.assert_not_called()
+        self.assertEqual(self.outputs["should_run"], "false")
+        self.assertIn("+10.0%", self.outputs["image_size_report"])
+        self.assertTrue(any(command[:2] == ["docker", "rmi"] for command in self.commands))
+        self.assertFalse(any("push" in command or "create" in command for command in self.commands))
+        # The rejected build doesn't become the baseline for the next one
+        self.assertEqual(load_image_metrics("pyhc-environment", self.cache_dir)["size"], 1000)
+
+    def test_image_within_budget_is_pushed(self):
+        self._build(1040)
+        self.publish.assert_called_once()
+        self.assertEqual(self.outputs["push_report"].count("Pushed"), 1)
+        self.assertEqual(load_image_metrics("pyhc-environment", self.cache_dir)["size"], 1040)
+
+
+class TestSlimmingAndSizeBudget(unittest.TestCase):
+    """Tests for the slimming report and the image size budget."""
+
+    def test_parse_slim_report(self):
+        lines = [
+            "#14 12.31 slim: 52428800\t812\tbase\tdeny **/site-packages/**/tests/",
+            "#14 12.31 slim: 1048576\t3\tbase\tstrip **/*.so",
+            "#14 12.40 Slimming base: 51.0 MB saved",
+            "#17 3.02 slim: 10485760\t90\ttop\tdeny **/site-packages/**/tests/",
+            "#17 3.02 slim: 0\t0\ttop\tstrip **/*.so",
+        ]
+        rules = parse_slim_report(lines)
+        self.assertEqual(rules["deny **/site-packages/**/tests/"], {"bytes": 62914560, "files": 902, "layers": ["base", "top"]})
+        report = format_slim_report(rules).splitlines()
+        self.assertEqual(report[0], "Slimming saved 61.0 MB in the rebuilt layers")
+        self.assertIn("902 files  deny **/site-packages/**/tests/", report[1])
+        self.assertEqual(len(report), 3)
+
+    def test_check_size_budget(self):
+        gb = 1024 ** 3
+        self.assertEqual(check_size_budget(4 * gb, 4 * gb, 0.05)[0], True)
+        within, message = check_size_budget(int(4.4 * gb), 4 * gb, 0.05)
+        self.assertFalse(within)
+        self.assertIn("+10.0%, budget +5%", message)
+        self.assertEqual(check_size_budget(4 * gb, None, 0.05), (True, "Size budget: not checked (no published build to compare with)"))
+        self.assertTrue(check_size_budget(8 * gb, 4 * gb, None)[0])
+
+    def test_get_image_size_budget(self):
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("PYHC_IMAGE_SIZE_BUDGET", None)
+            self.assertEqual(get_image_size_budget(), 0.05)
+        with patch.dict(os.environ, {"PYHC_IMAGE_SIZE_BUDGET": "off"}):
+            self.assertIsNone(get_image_size_budget())
+        with patch.dict(os.environ, {"PYHC_IMAGE_SIZE_BUDGET": "0.2"}):
+            self.assertEqual(get_image_size_budget(), 0.2)
+
+
+
+PUSH_OUTPUT = """\
+The push refers to repository [docker.io/user/pyhc-environment]
+5f70bf18a086: Preparing
+a3ed95caeb02: Preparing
+5f70bf18a086: Pushed
+a3ed95caeb02: Layer already exists
+0d1435bd79e4: Mounted from library/ubuntu
+v2026.10.19: digest: sha256:%s size: 2841
+""" % ("ab" * 32)
+
+
+def _manifest(*layers):
+    return json.dumps({"schemaVersion": 2, "layers": [{"digest": digest, "size": size} for digest, size in layers]})
+
+
+class TestPublishImage(unittest.TestCase):
+    """Tests for pushing the date tag and copying 'latest' in the registry."""
+
+    def setUp(self):
+        self.commands = []
+        self.manifests = {
+            "user/img:latest": _manifest(("sha256:base", 100), ("sha256:old", 50)),
+            "user/img:v2026.10.19": _manifest(("sha256:base", 100), ("sha256:new", 70)),
+        }
+
+    def _run(self, command, **kwargs):
+        self.assertIsInstance(command, list)
+        self.commands.append(command)
+        if command[:5] == ["docker", "buildx", "imagetools", "inspect", "--raw"]:
+            ref = command[5]
+            found = ref in self.manifests
+            return subprocess.CompletedProcess(command, 0 if found else 1, self.manifests.get(ref, ""), "")
+        return subprocess.CompletedProcess(command, 0, PUSH_OUTPUT if command[:2] == ["docker", "push"] else "", "")
+
+    def test_parse_push_output(self):
+        self.assertEqual(parse_push_output(PUSH_OUTPUT.splitlines()),
+                         {"pushed": 1, "existing": 1, "mounted": 1, "digest": "sha256:" + "ab" * 32})
+
+    def test_get_manifest_layers(self):
+        with patch("docker_operations.subprocess.run", side_effect=self._run):
+            self.assertEqual(get_manifest_layers("user/img:latest"), {"sha256:base": 100, "sha256:old": 50})
+            self.assertEqual(get_manifest_layers("user/img:missing"), {})
+        # An image index (e.g. 'latest' written by imagetools without --prefer-index=false) resolves to linux/amd64
+        self.manifests["localhost:5000/img@sha256:amd64"] = _manifest(("sha256:base", 100))
+        self.manifests["localhost:5000/img:latest"] = json.dumps({"manifests": [
+            {"digest": "sha256:arm64", "platform": {"os": "linux", "architecture": "arm64"}},
+            {"digest": "sha256:amd64", "platform": {"os": "linux", "architecture": "amd64"}},
+            {"digest": "sha256:attestation", "platform": {"os": "unknown", "architecture": "unknown"}},
+        ]})
+        self.manifests["localhost:5000/img:single"] = json.dumps({"manifests": [{"digest": "sha256:amd64"}]})
+        with patch("docker_operations.subprocess.run", side_effect=self._run):
+            self.assertEqual(get_manifest_layers("localhost:5000/img:latest"), {"sha256:base": 100})
+            self.assertEqual(get_manifest_layers("localhost:5000/img:single"), {"sha256:base": 100})
+
+    def test_latest_is_copied_in_the_registry(self):
+        with patch("docker_operations.subprocess.run", side_effect=self._run):
+            result = publish_image("user/img:v2026.10.19", "user/img:latest")
+        self.assertEqual([c for c in self.commands if "inspect" not in c], [
+            ["docker", "push", "user/img:v2026.10.19"],
+            ["docker", "buildx", "imagetools", "create", "--prefer-index=false", "--tag", "user/img:latest",
+             "user/img:v2026.10.19"],
+            ["docker", "rmi", "user/img:v2026.10.19"],
+        ])
+        self.assertEqual(result["uploaded_bytes"], 70)
+        self.assertRegex(format_push_report(result),
+                         r"^Pushed user/img:v2026.10.19 in \d+s: 1 layers \(70 B\) uploaded, 2 already in the registry; "
+                         r"latest copied in the registry$")
+
+    def test_push_through_the_engine_api(self):
+        events = [
+            {"status": "The push refers to repository [docker.io/user/img]"},
+            {"status": "Preparing", "id": "5f70bf18a086"},
+            {"status": "Pushing", "id": "5f70bf18a086", "progressDetail": {"current": 512, "total": 1000}},
+            {"status": "Pushing", "id": "5f70bf18a086", "progressDetail": {"current": 1000, "total": 1000}},
+            {"status": "Pushed", "id": "5f70bf18a086"},
+            {"status": "Layer already exists", "id": "a3ed95caeb02"},
+            {"status": "Mounted from library/ubuntu", "id": "0d1435bd79e4"},
+            {"status": "v2026.10.19: digest: sha256:abc size: 2841"},
+            {"progressDetail": {}, "aux": {"Tag": "v2026.10.19", "Digest": "sha256:abc", "Size": 2841}},
+        ]
+        calls = []
+
+        class FakeAPI:
+            def push(self, repository, tag=None, stream=False, decode=False):
+                calls.append(("push", repository, tag, stream, decode))
+                return iter(events)
+
+            def remove_image(self, image):
+                calls.append(("remove_image", image))
+
+        client = type("FakeClient", (), {"api": FakeAPI()})()
+        with patch("docker_operations.subprocess.run", side_effect=self._run):
+            result = publish_image("localhost:5000/img:v2026.10.19", "localhost:5000/img:latest", client=client)
+        self.assertEqual(calls, [("push", "localhost:5000/img", "v2026.10.19", True, True),
+                                 ("remove_image", "localhost:5000/img:v2026.10.19")])
+        self.assertEqual(self.commands, [["docker", "buildx", "imagetools", "create", "--prefer-index=false", "--tag",
+                                          "localhost:5000/img:latest", "localhost:5000/img:v2026.10.19"]])
+        self.assertEqual({key: result[key] for key in ("pushed", "existing", "mounted", "digest", "uploaded_bytes")},
+                         {"pushed": 1, "existing": 1, "mounted": 1, "digest": "sha256:abc", "uploaded_bytes": 1000})
+
+        with self.assertRaises(RuntimeError):
+            parse_push_events([{"status": "Preparing", "id": "x"}, {"error": "denied: requested access is denied"}])
+
+
+
+class TestContextHashReuse(unittest.TestCase):
+    """Tests for finding an already pushed image built from the same context."""
+
+    def setUp(self):
+        self.inspect = {
+            "user/img:latest": {"name": "user/img:latest",
+                                "manifest": {"digest": "sha256:latest", "mediaType": "application/vnd.oci.image.manifest.v1+json"},
+                                "image": {"config": {"Labels": {CONTEXT_HASH_LABEL: "abc123"}}}},
+            "user/multi:latest": {"manifest": {"digest": "sha256:index"},
+                                  "image": {"linux/amd64": {"config": {"Labels": {CONTEXT_HASH_LABEL: "def456"}}},
+                                            "linux/arm64": {"config": {"Labels": {CONTEXT_HASH_LABEL: "def456"}}}}},
+            "continuumio/miniconda3": {"manifest": {"digest": "sha256:base"}, "image": {}},
+        }
+
+    def _run(self, command, **kwargs):
+        ref = command[4]
+        if ref not in self.inspect:
+            return subprocess.CompletedProcess(command, 1, "", "not found")
+        return subprocess.CompletedProcess(command, 0, json.dumps(self.inspect[ref]), "")
+
+    def test_get_registry_image(self):
+        with patch("docker_operations.subprocess.run", side_effect=self._run):
+            self.assertEqual(get_registry_image("user/img:latest"), {"digest": "sha256:latest", "labels": {CONTEXT_HASH_LABEL: "abc123"}})
+            self.assertEqual(get_registry_image("user/multi:latest")["labels"], {CONTEXT_HASH_LABEL: "def456"})
+            self.assertEqual(get_registry_image("continuumio/miniconda3"), {"digest": "sha256:base", "labels": {}})
+            self.assertIsNone(get_registry_image("user/missing:latest"))
+
+    def test_find_reusable_image(self):
+        with patch("docker_operations.subprocess.run", side_effect=self._run):
+            self.assertEqual(find_reusable_image("user/img:latest", "abc123"), "sha256:latest")
+            self.assertIsNone(find_reusable_image("user/img:latest", "changed"))
+            self.assertIsNone(find_reusable_image("user/missing:latest", "abc123"))
+
+    def test_resolve_base_digests(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            dockerfile = os.path.join(tmp, "Dockerfile")
+            with open(dockerfile, "w") as f:
+                f.write("FROM continuumio/miniconda3 AS toolchain\nFROM toolchain\nFROM private/base:1\n")
+            with patch("docker_operations.subprocess.run", side_effect=self._run):
+                self.assertEqual(resolve_base_digests(dockerfile), {"continuumio/miniconda3": "sha256:base", "private/base:1": None})
+
+
+def _docker_available():
+    return shutil.which("docker") is not None and subprocess.run(
+        ["docker", "info"], capture_output=True).returncode == 0
+
+
+@unittest.skipUnless(_docker_available(), "needs a Docker daemon")
+class TestPublishImageAgainstRegistry(unittest.TestCase):
+    """publish_image() against a throwaway local registry:2."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.container = subprocess.run(["docker", "run", "-d", "-p", "127.0.0.1::5000", "registry:2"], check=True,
+                                       capture_output=True, text=True).stdout.strip()
+        port = subprocess.run(["docker", "port", cls.container, "5000"], check=True,
+                              capture_output=True, text=True).stdout.strip().rsplit(":", 1)[1]
+        cls.repository = f"localhost:{port}/pyhc-push-test"
+
+    @classmethod
+    def tearDownClass(cls):
+        subprocess.run(["docker", "rm", "-f", cls.container], capture_output=True)
+
+    def _build(self, tag, content):
+        with tempfile.TemporaryDirectory() as context:
+            with open(os.path.join(context, "Dockerfile"), "w") as f:
+                f.write("FROM scratch\nCOPY data /data\n")
+            with open(os.path.join(context, "data"), "w") as f:
+                f.write(content)
+            subprocess.run(["docker", "build", "-q", "-t", tag, context], check=True, capture_output=True)
+
+    def _push_and_copy_latest(self, repository, client):
+        date_tag, latest_tag = f"{repository}:v1", f"{repository}:latest"
+        self._build(date_tag, "x" * 4096)
+        result = publish_image(date_tag, latest_tag, client=client)
+        self.assertEqual(result["pushed"], 1)
+        self.assertGreater(result["uploaded_bytes"], 0)
+        self.assertEqual(get_manifest_layers(latest_tag), get_manifest_layers(date_tag))
+        # latest is a copy of the manifest, not a new index wrapping it
+        raw = subprocess.run(["docker", "buildx", "imagetools", "inspect", "--raw", latest_tag], check=True,
+                             capture_output=True, text=True).stdout
+        self.assertIn("layers", json.loads(raw))
+
+        # The same content under a new date tag uploads nothing
+        self._build(f"{repository}:v2", "x" * 4096)
+        result = publish_image(f"{repository}:v2", latest_tag, client=client)
+        self.assertEqual((result["pushed"], result["uploaded_bytes"]), (0, 0))
+
+    def test_push_and_copy_latest_with_the_cli(self):
+        self._push_and_copy_latest(f"{self.repository}-cli", None)
+
+    def test_push_and_copy_latest_through_the_engine_api(self):
+        client = get_docker_client()
+        if client is None:
+            self.skipTest("needs the Docker SDK for Python")
+        self._push_and_copy_latest(f"{self.repository}-api", client)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+Unit tests for the historical multi-version compatibility matrix.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+import openpyxl
+
+# Add the utils directory to the path so we can import module functions.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from historical_dependency_matrix import (
+    collect_release_requirements,
+    build_historical_matrix,
+    write_historical_spreadsheet,
+    find_incompatible_releases,
+)
+
+
+RELEASE_HISTORY = {
+    "sunpy": {
+        "4.0.0": datetime(2022, 5, 1),
+        "5.0.0": datetime(2023, 6, 1),
+        "5.1.0": datetime(2023, 11, 1),
+        "6.0.0": datetime(2024, 6, 1),
+    },
+    "hapiclient": {"0.3.3": datetime(2024, 1, 1)},
+}
+
+REQUIRES_DIST = {
+    ("sunpy", "4.0.0"): ["numpy>=1.17,<2"],
+    ("sunpy", "5.0.0"): ["numpy>=1.21,<2", "parfive; extra == 'net'"],
+    ("sunpy", "5.1.0"): ["numpy>=1.21,<2", "parfive; extra == 'net'"],
+    ("sunpy", "6.0.0"): ["numpy>=1.23", "parfive>=2; extra == 'net'"],
+    ("hapiclient", "0.3.3"): ["numpy", "obscure-dep>=1"],
+}
+
+
+def _fake_load_requires_dist(distributions, **_kwargs):
+    return {(name, version): REQUIRES_DIST[(name, version)] for name, version in distributions}
+
+
+class TestHistoricalDependencyMatrix(unittest.TestCase):
+    @patch("historical_dependency_matrix.load_requires_dist", side_effect=_fake_load_requires_dist)
+    @patch("historical_dependency_matrix.fetch_release_history", side_effect=lambda name: RELEASE_HISTORY[name])
+    def setUp(self, _mock_history, _mock_load):
+        self.release_requirements = collect_release_requirements(
+            ["sunpy[net]==6.0.0", "hapiclient==0.3.3"], years=2, as_of=datetime(2024, 12, 31), python_version="3.12",
+        )
+        self.matrix = build_historical_matrix(
+            self.release_requirements, {"numpy": "2.2.6", "parfive": "2.1.0", "sunpy": "6.0.0"},
+        )
+
+    def test_releases_within_window_newest_first(self):
+        self.assertEqual(
+            list(self.release_requirements),
+            ["sunpy==6.0.0", "sunpy==5.1.0", "sunpy==5.0.0", "hapiclient==0.3.3"],
+        )
+        self.assertEqual(self.release_requirements["sunpy==5.0.0"], {"numpy": ">=1.21,<2", "parfive": "any"})
+
+    def test_identical_requirement_sets_are_evaluated_once(self):
+        self.assertEqual(len(self.matrix["projects"]), 4)
+        self.assertEqual(len(self.matrix["requirement_sets"]), 3)
+        self.assertEqual(self.matrix["project_set_ids"][1], self.matrix["project_set_ids"][2])
+
+    def test_incompatible_releases(self):
+        self.assertEqual(self.matrix["dependencies"], ["numpy", "obscure-dep", "parfive"])
+        self.assertEqual(self.matrix["allowed_ranges"], ["==2.2.6", None, "==2.1.0"])
+        self.assertEqual(
+            find_incompatible_releases(self.matrix),
+            {"sunpy==5.1.0": ["numpy>=1.21,<2"], "sunpy==5.0.0": ["numpy>=1.21,<2"]},
+        )
+
+    def test_spreadsheet_is_streamed_with_one_column_per_release(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "history.xlsx")
+            write_historical_spreadsheet(self.matrix, path)
+            worksheet = openpyxl.load_workbook(path).active
+
+            self.assertEqual(
+                [cell.value for cell in worksheet[1]],
+                ["Package", "Resolved Version", "sunpy==6.0.0", "sunpy==5.1.0", "sunpy==5.0.0", "hapiclient==0.3.3"],
+            )
+            self.assertEqual([cell.value for cell in worksheet[2]], ["numpy", "==2.2.6", ">=1.23", ">=1.21,<2", ">=1.21,<2", "any"])
+            self.assertEqual(worksheet["C2"].fill.start_color.rgb[-6:].lower(), "00ff00")
+            self.assertEqual(worksheet["D2"].fill.start_color.rgb[-6:].lower(), "ff0000")
+            self.assertEqual(worksheet["B3"].value, "not installed")
+            self.assertIsNone(worksheet["F3"].fill.fill_type)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
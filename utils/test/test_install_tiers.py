@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+"""
+Unit tests for the lockfile-derived Docker install tiers in install_tiers.py.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add the utils directory to the path so we can import module functions.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from install_tiers import (
+    assign_install_tiers,
+    format_requirement,
+    parse_lockfile_graph,
+    parse_lockfile_hashes,
+    write_install_tiers,
+)
+
+LOCKFILE = """\
+# This file was autogenerated by uv via the following command:
+#    uv pip compile packages.txt -o /tmp/new-resolved-versions.txt
+Astropy==7.1.0
+    # via
+    #   pyhc-a
+    #   pyhc-b
+astropy-iers-data==0.2025.6.2
+    # via astropy
+botocore==1.38.0
+    # via pyhc-a
+numpy==2.2.6
+    # via
+    #   astropy
+    #   pyhc-c
+pyhc-a==1.0
+    # via -r docker/pyhc-environment/contents/packages.txt
+pyhc-b==2.0
+    # via
+    #   -r docker/pyhc-environment/contents/packages.txt
+    #   pyhc-c
+pyhc-c==3.0
+    # via -r docker/pyhc-environment/contents/packages.txt
+tiny-helper==0.1
+    # via pyhc-c
+"""
+
+
+class TestInstallTiers(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.lockfile = os.path.join(self._tmp.name, "resolved-versions.txt")
+        with open(self.lockfile, "w") as f:
+            f.write(LOCKFILE)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_parse_lockfile_graph(self):
+        pins, dependents, roots = parse_lockfile_graph(self.lockfile)
+        self.assertEqual(pins["astropy"], "Astropy==7.1.0")
+        self.assertEqual(len(pins), 8)
+        self.assertEqual(roots, {"pyhc-a", "pyhc-b", "pyhc-c"})
+        self.assertEqual(dependents["numpy"], {"astropy", "pyhc-c"})
+        self.assertEqual(dependents["pyhc-b"], {"pyhc-c"})
+
+    def test_graph_only_tiers(self):
+        tiers = assign_install_tiers(*parse_lockfile_graph(self.lockfile))
+        self.assertEqual(tiers["top"], ["pyhc-a==1.0", "pyhc-b==2.0", "pyhc-c==3.0"])
+        # With only three PyHC packages, a dependency of any one of them is shared by a third of them
+        self.assertEqual(tiers["base"], ["astropy-iers-data==0.2025.6.2", "Astropy==7.1.0", "botocore==1.38.0",
+                                         "numpy==2.2.6", "tiny-helper==0.1"])
+        self.assertEqual(tiers["mid"], [])
+
+    def test_frequent_releases_go_to_top_tier(self):
+        pins, dependents, roots = parse_lockfile_graph(self.lockfile)
+        roots = roots | {"pyhc-d", "pyhc-e", "pyhc-f", "pyhc-g", "pyhc-h", "pyhc-i", "pyhc-j", "pyhc-k", "pyhc-l"}
+        tiers = assign_install_tiers(pins, dependents, roots, {"astropy-iers-data": 52.0, "botocore": 240.0, "numpy": 12.5})
+        self.assertIn("astropy-iers-data==0.2025.6.2", tiers["top"])
+        self.assertIn("botocore==1.38.0", tiers["top"])
+        # 3 of 12 PyHC packages need astropy and numpy (pyhc-c through pyhc-b); only pyhc-c needs tiny-helper
+        self.assertEqual(tiers["base"], ["Astropy==7.1.0", "numpy==2.2.6"])
+        self.assertEqual(tiers["mid"], ["tiny-helper==0.1"])
+
+    @patch("install_tiers.fetch_release_history", side_effect=RuntimeError("offline"))
+    def test_write_tiers_covers_the_lockfile(self, _history):
+        output_dir = os.path.join(self._tmp.name, "install-tiers")
+        counts = write_install_tiers(self.lockfile, output_dir)
+        self.assertEqual(sum(counts.values()), 8)
+
+        lines = []
+        for tier in ("base", "mid", "top"):
+            with open(os.path.join(output_dir, f"{tier}.txt")) as f:
+                lines += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        self.assertEqual(sorted(lines, key=str.lower), sorted(parse_lockfile_graph(self.lockfile)[0].values(), key=str.lower))
+
+
+    @patch("install_tiers.fetch_release_history", side_effect=RuntimeError("offline"))
+    def test_hashes_carry_over_to_the_tier_files(self, _history):
+        with open(self.lockfile, "w") as f:
+            f.write(
+                "numpy==2.2.6 \\\n"
+                "    --hash=sha256:aaaa \\\n"
+                "    --hash=sha256:bbbb\n"
+                "    # via pyhc-a\n"
+                "pyhc-a==1.0 \\\n"
+                "    --hash=sha256:cccc\n"
+                "    # via -r docker/pyhc-environment/contents/packages.txt\n"
+            )
+        pins, _, roots = parse_lockfile_graph(self.lockfile)
+        self.assertEqual(pins, {"numpy": "numpy==2.2.6", "pyhc-a": "pyhc-a==1.0"})
+        self.assertEqual(roots, {"pyhc-a"})
+        self.assertEqual(parse_lockfile_hashes(self.lockfile), {"numpy": ["sha256:aaaa", "sha256:bbbb"], "pyhc-a": ["sha256:cccc"]})
+
+        output_dir = os.path.join(self._tmp.name, "install-tiers")
+        write_install_tiers(self.lockfile, output_dir)
+        with open(os.path.join(output_dir, "base.txt")) as f:
+            self.assertEqual(f.read().splitlines()[1:], ["numpy==2.2.6 \\", "    --hash=sha256:aaaa \\", "    --hash=sha256:bbbb"])
+
+    @patch("install_tiers.fetch_release_history", side_effect=RuntimeError("offline"))
+    def test_local_builds_are_left_out_of_the_tiers(self, _history):
+        output_dir = os.path.join(self._tmp.name, "install-tiers")
+        counts = write_install_tiers(self.lockfile, output_dir, local_builds={"tiny-helper", "pyhc-c"})
+        self.assertEqual(sum(counts.values()), 6)
+        with open(os.path.join(output_dir, "top.txt")) as f:
+            self.assertEqual(f.read().splitlines()[1:], ["pyhc-a==1.0", "pyhc-b==2.0"])
+
+    def test_format_requirement_without_hashes(self):
+        self.assertEqual(format_requirement("numpy==2.2.6"), "numpy==2.2.6")
+        self.assertEqual(format_requirement("numpy==2.2.6", []), "numpy==2.2.6")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""
+Unit tests for the installed-distribution inventory in installed_distributions.py.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add the utils directory to the path so we can import module functions.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import installed_distributions
+from installed_distributions import get_installed_distributions, site_packages_dirs
+
+
+def _write_metadata(site_packages, dirname, filename, name, version, requires=()):
+    path = os.path.join(site_packages, dirname)
+    os.makedirs(path)
+    lines = ["Metadata-Version: 2.1", f"Name: {name}", f"Version: {version}"]
+    lines += [f"Requires-Dist: {requirement}" for requirement in requires]
+    with open(os.path.join(path, filename), "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+class TestInstalledDistributions(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.venv = os.path.join(self._tmp.name, ".venv")
+        self.site_packages = os.path.join(self.venv, "lib", "python3.12", "site-packages")
+        os.makedirs(self.site_packages)
+        os.makedirs(os.path.join(self.venv, "bin"))
+        open(os.path.join(self.venv, "bin", "python"), "w").close()
+        self.cache_dir = os.path.join(self._tmp.name, "cache")
+
+        _write_metadata(self.site_packages, "Foo_Bar-1.2.dist-info", "METADATA", "Foo_Bar", "1.2",
+                        ["numpy>=1.25", "pytest; extra == 'tests'"])
+        _write_metadata(self.site_packages, "legacy_pkg-0.9-py3.12.egg-info", "PKG-INFO", "legacy.pkg", "0.9")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_venv_path_or_python_executable(self):
+        expected = [os.path.realpath(self.site_packages)]
+        self.assertEqual(site_packages_dirs(self.venv), expected)
+        self.assertEqual(site_packages_dirs(os.path.join(self.venv, "bin", "python")), expected)
+
+    def test_inventory_reads_dist_info_and_egg_info(self):
+        inventory = get_installed_distributions(self.venv, cache_dir=self.cache_dir)
+        self.assertEqual(list(inventory), ["foo-bar", "legacy-pkg"])
+        self.assertEqual(inventory["foo-bar"], {
+            "name": "Foo_Bar",
+            "version": "1.2",
+            "requires": ["numpy>=1.25", "pytest; extra == 'tests'"],
+        })
+        self.assertEqual(inventory["legacy-pkg"]["requires"], [])
+
+    def test_cache_reused_until_site_packages_changes(self):
+        first = get_installed_distributions(self.venv, cache_dir=self.cache_dir)
+        with patch.object(installed_distributions, "_scan_distributions") as mock_scan:
+            self.assertEqual(get_installed_distributions(self.venv, cache_dir=self.cache_dir), first)
+            mock_scan.assert_not_called()
+
+        _write_metadata(self.site_packages, "baz-3.0.dist-info", "METADATA", "baz", "3.0")
+        os.utime(self.site_packages, ns=(0, os.stat(self.site_packages).st_mtime_ns + 1))
+        self.assertIn("baz", get_installed_distributions(self.venv, cache_dir=self.cache_dir))
+
+    def test_current_interpreter(self):
+        inventory = get_installed_distributions(cache_dir=self.cache_dir)
+        self.assertIn("packaging", inventory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""
+Unit tests for cached PyPI metadata and the lockfile-only (fast mode) dependency table.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+# Add the utils directory to the path so we can import module functions.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from package_metadata import (
+    parse_resolved_versions,
+    fetch_requires_dist,
+    fetch_release_files,
+    applicable_requirements,
+    marker_environment,
+)
+from generate_dependency_table import (
+    get_dependency_ranges_from_lockfile,
+    generate_dependency_table_data_from_lockfile,
+)
+
+
+LOCKFILE = """\
+# This file was autogenerated by uv via the following command:
+#    uv pip compile packages.txt -o /tmp/new-resolved-versions.txt
+alpha==1.0.0
+    # via -r docker/pyhc-environment/contents/packages.txt
+Beta_Pkg==2.0.0
+    # via
+    #   -r docker/pyhc-environment/contents/packages.txt
+numpy==2.2.6
+    # via
+    #   alpha
+    #   beta-pkg
+pytest==8.3.0
+    # via alpha
+"""
+
+REQUIRES_DIST = {
+    ("alpha", "1.0.0"): [
+        "numpy>=1.25,<3",
+        "pytest>=7; extra == 'tests'",
+        "colorama; sys_platform == 'win32' and python_version < '3.0'",
+    ],
+    ("beta-pkg", "2.0.0"): ["numpy~=2.1", "alpha==1.*"],
+    ("numpy", "2.2.6"): [],
+    ("pytest", "8.3.0"): [],
+}
+
+
+def _fake_load_requires_dist(distributions, **_kwargs):
+    return {(name, version): REQUIRES_DIST[(name, version)] for name, version in distributions}
+
+
+class TestPackageMetadata(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.lockfile = os.path.join(self.tmpdir.name, "resolved-versions.txt")
+        with open(self.lockfile, "w") as f:
+            f.write(LOCKFILE)
+
+    def test_parse_resolved_versions(self):
+        self.assertEqual(
+            parse_resolved_versions(self.lockfile),
+            {"alpha": "1.0.0", "beta-pkg": "2.0.0", "numpy": "2.2.6", "pytest": "8.3.0"},
+        )
+
+    def test_applicable_requirements_respects_markers_and_extras(self):
+        environment = marker_environment("3.12")
+        names = [r.name for r in applicable_requirements(REQUIRES_DIST[("alpha", "1.0.0")], (), environment)]
+        self.assertEqual(names, ["numpy"])
+        names = [r.name for r in applicable_requirements(REQUIRES_DIST[("alpha", "1.0.0")], ("tests",), environment)]
+        self.assertEqual(names, ["numpy", "pytest"])
+
+    @patch("package_metadata.requests.get")
+    def test_fetch_requires_dist_is_cached(self, mock_get):
+        response = MagicMock()
+        response.json.return_value = {
+            "info": {"requires_dist": ["numpy>=1.25"]},
+            "urls": [{"filename": "alpha-1.0.0.tar.gz"}, {"filename": "alpha-1.0.0-py3-none-any.whl", "yanked": True}],
+        }
+        mock_get.return_value = response
+
+        first = fetch_requires_dist("Alpha", "1.0.0", cache_dir=self.tmpdir.name)
+        second = fetch_requires_dist("alpha", "1.0.0", cache_dir=self.tmpdir.name)
+        files = fetch_release_files("alpha", "1.0.0", cache_dir=self.tmpdir.name)
+
+        self.assertEqual(first, ["numpy>=1.25"])
+        self.assertEqual(second, first)
+        self.assertEqual(files, ["alpha-1.0.0.tar.gz"])
+        # Both come from one request for the release's JSON document
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch("generate_dependency_table.load_requires_dist", side_effect=_fake_load_requires_dist)
+    def test_dependency_ranges_walk_the_resolved_tree(self, _mock_load):
+        resolved_versions = parse_resolved_versions(self.lockfile)
+        result = get_dependency_ranges_from_lockfile(
+            ["alpha[tests]==1.0.0", "Beta_Pkg", "git+https://example.com/x.git", "missing==1.0"],
+            resolved_versions,
+            python_version="3.12",
+        )
+
+        self.assertEqual(list(result), ["alpha[tests]==1.0.0", "Beta_Pkg==2.0.0"])
+        self.assertEqual(result["alpha[tests]==1.0.0"], {"alpha": "==1.0.0", "numpy": ">=1.25,<3", "pytest": ">=7"})
+        # Transitive requirements are combined with the direct ones, like uv pip tree output
+        self.assertEqual(result["Beta_Pkg==2.0.0"]["alpha"], ">=1.0.0,<2.0.0")
+        self.assertEqual(result["Beta_Pkg==2.0.0"]["numpy"], ">=2.1,<3")
+        self.assertEqual(result["Beta_Pkg==2.0.0"]["Beta_Pkg"], "==2.0.0")
+        self.assertNotIn("pytest", result["Beta_Pkg==2.0.0"])
+
+    @patch("generate_dependency_table.get_spec0_packages", return_value=["numpy>=2.0.0"])
+    @patch("generate_dependency_table.subprocess.check_output", side_effect=AssertionError("no installs in fast mode"))
+    @patch("generate_dependency_table.load_requires_dist", side_effect=_fake_load_requires_dist)
+    def test_table_data_from_lockfile(self, _mock_load, _mock_check_output, _mock_spec0):
+        table_data = generate_dependency_table_data_from_lockfile(
+            ["alpha==1.0.0", "Beta_Pkg==2.0.0"], self.lockfile, python_version="3.12",
+        )
+        self.assertEqual(table_data["spec0_requirements"], {"numpy": ">=2.0.0"})
+        self.assertEqual(table_data["core_dependencies"], {})
+        self.assertEqual(table_data["other_dependencies"]["numpy"][1], ">=2.1,<3")
+        self.assertTrue(table_data["project_data"]["alpha==1.0.0"]["numpy"].compatible)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""
+Unit tests for the JSON lines dependency table export and query_dependency_table.py.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the utils directory to the path so we can import module functions.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generate_dependency_table import (
+    write_table_data_jsonl,
+    find_dependency_conflicts,
+    find_spec0_problems,
+)
+import query_dependency_table as query
+
+
+TABLE_DATA = {
+    "core_dependencies": {"numpy": (2, ">=1.25", True)},
+    "other_dependencies": {
+        "botocore": (4, None, None),
+        "requests": (5, " ==2.32.0", None),
+    },
+    "project_data": {
+        "alpha==1.0.0": {
+            "numpy": (True, False, ">=1.20"),
+            "botocore": (False, None, "<1.40"),
+            "requests": (True, None, "any"),
+        },
+        "beta==2.0.0": {
+            "numpy": (True, True, ">=2.0"),
+            "botocore": (False, None, ">=1.42"),
+        },
+    },
+    "spec0_requirements": {"numpy": ">=2.0.0"},
+}
+
+
+class TestQueryDependencyTable(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, "table.jsonl")
+        self.count = write_table_data_jsonl(TABLE_DATA, self.path)
+        self.records = query.load_table_records(self.path)
+
+    def test_one_record_per_used_cell(self):
+        self.assertEqual(self.count, 5)
+        self.assertEqual(len(self.records), 5)
+        record = self.records[0]
+        self.assertEqual(record["project"], "alpha==1.0.0")
+        self.assertEqual(record["dependency"], "numpy")
+        self.assertEqual(record["allowed_range"], ">=1.25")
+        self.assertTrue(record["core"])
+        self.assertEqual(record["row"], 2)
+
+    def test_dependency_constraints(self):
+        self.assertEqual(
+            query.dependency_constraints(self.records, "NumPy"),
+            [("alpha==1.0.0", ">=1.20", True), ("beta==2.0.0", ">=2.0", True)],
+        )
+
+    def test_conflicts_and_spec0_match_table_data_reports(self):
+        self.assertEqual(query.find_conflicts(self.records), find_dependency_conflicts(TABLE_DATA))
+        self.assertEqual(query.find_spec0_problems(self.records), find_spec0_problems(TABLE_DATA))
+
+    def test_requirements_file(self):
+        with self.assertRaises(ValueError):
+            query.requirements_file(self.records)
+
+        resolved = [r for r in self.records if r["dependency"] != "botocore"]
+        self.assertEqual(query.requirements_file(resolved), "numpy>=1.25\nrequests==2.32.0")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+"""
+Unit tests for the image slimming script, docker/pyhc-environment/contents/slim-image.py.
+"""
+
+import importlib.util
+import os
+import tempfile
+import time
+import unittest
+
+CONTENTS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "docker", "pyhc-environment", "contents",
+)
+# File lists of real wheels from the lockfile, one path per line
+WHEEL_FILES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+_spec = importlib.util.spec_from_file_location("slim_image", os.path.join(CONTENTS_DIR, "slim-image.py"))
+slim_image = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(slim_image)
+
+RULES = """\
+allow   **/site-packages/sunpy/**
+deny    **/site-packages/**/tests/
+allow   **/__pycache__/*.{cache_tag}.pyc
+deny    **/*.pyc
+deny    **/site-packages/**/*.a
+strip   **/*.so
+dedupe  **/site-packages/*.libs/*
+"""
+
+
+class TestSlimImage(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self._tmp.name, "env")
+        self.site = os.path.join(self.root, "lib", "python3.12", "site-packages")
+        self.rules_path = os.path.join(self._tmp.name, "rules.txt")
+        with open(self.rules_path, "w") as f:
+            f.write(RULES)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, relpath, content=b"x" * 100):
+        path = os.path.join(self.site, relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def test_glob_to_regex(self):
+        regex = slim_image.glob_to_regex("**/site-packages/**/tests")
+        self.assertTrue(regex.match("lib/python3.12/site-packages/numpy/tests"))
+        self.assertTrue(regex.match("lib/python3.12/site-packages/numpy/_core/tests"))
+        self.assertFalse(regex.match("lib/python3.12/site-packages/numpy/tests_helper"))
+        self.assertTrue(slim_image.glob_to_regex("**/*.pyc").match("a.pyc"))
+        self.assertFalse(slim_image.glob_to_regex("*.pyc").match("pkg/a.pyc"))
+
+    def test_parse_rules(self):
+        rules = slim_image.parse_rules(self.rules_path, "cpython-312")
+        self.assertEqual([rule["action"] for rule in rules], ["allow", "deny", "allow", "deny", "deny", "strip", "dedupe"])
+        self.assertTrue(rules[1]["dir_only"])
+        self.assertEqual(rules[2]["pattern"], "**/__pycache__/*.cpython-312.pyc")
+        with open(self.rules_path, "a") as f:
+            f.write("remove **/*.txt\n")
+        with self.assertRaises(ValueError):
+            slim_image.parse_rules(self.rules_path, "cpython-312")
+
+    def test_environment_cache_tag(self):
+        os.makedirs(self.site)
+        self.assertEqual(slim_image.environment_cache_tag(self.root), "cpython-312")
+
+    def test_slim(self):
+        self._write("numpy/tests/test_core.py")
+        self._write("numpy/core.py")
+        self._write("numpy/__pycache__/core.cpython-312.pyc")
+        self._write("numpy/__pycache__/core.cpython-39.pyc")
+        self._write("numpy/libnpy.a")
+        self._write("sunpy/tests/test_map.py")
+        self._write("numpy.libs/libgfortran-abc.so.5", b"same" * 50)
+        self._write("scipy.libs/libgfortran-abc.so.5", b"same" * 50)
+
+        rules = slim_image.parse_rules(self.rules_path, slim_image.environment_cache_tag(self.root))
+        dry = slim_image.slim(self.root, rules, dry_run=True)
+        self.assertTrue(os.path.exists(os.path.join(self.site, "numpy/tests/test_core.py")))
+
+        saved = slim_image.slim(self.root, rules)
+        self.assertEqual(saved, dry)
+        self.assertEqual(saved["deny **/site-packages/**/tests/"], {"bytes": 100, "files": 1})
+        self.assertEqual(saved["deny **/*.pyc"], {"bytes": 100, "files": 1})
+        self.assertEqual(saved["deny **/site-packages/**/*.a"], {"bytes": 100, "files": 1})
+        self.assertEqual(saved["dedupe **/site-packages/*.libs/*"], {"bytes": 200, "files": 1})
+
+        self.assertFalse(os.path.exists(os.path.join(self.site, "numpy/tests")))  # Emptied directories go too
+        self.assertTrue(os.path.exists(os.path.join(self.site, "numpy/core.py")))
+        self.assertTrue(os.path.exists(os.path.join(self.site, "numpy/__pycache__/core.cpython-312.pyc")))
+        self.assertTrue(os.path.exists(os.path.join(self.site, "sunpy/tests/test_map.py")))  # allow wins
+        self.assertTrue(os.path.samefile(os.path.join(self.site, "numpy.libs/libgfortran-abc.so.5"),
+                                         os.path.join(self.site, "scipy.libs/libgfortran-abc.so.5")))
+
+    def test_slim_only_touches_files_newer_than_the_marker(self):
+        old = self._write("astropy/tests/test_old.py")
+        marker = os.path.join(self._tmp.name, "marker")
+        time.sleep(0.01)
+        with open(marker, "w"):
+            pass
+        time.sleep(0.01)
+        new = self._write("pandas/tests/test_new.py")
+
+        rules = slim_image.parse_rules(self.rules_path, "cpython-312")
+        saved = slim_image.slim(self.root, rules, os.stat(marker).st_ctime_ns)
+        self.assertEqual(saved["deny **/site-packages/**/tests/"]["files"], 1)
+        self.assertTrue(os.path.exists(old))
+        self.assertFalse(os.path.exists(new))
+
+    def _install_wheel_files(self, name):
+        """Create the files listed in data/<name>.files.txt under site-packages; return their relative paths."""
+        with open(os.path.join(WHEEL_FILES_DIR, f"{name}.files.txt")) as f:
+            relpaths = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        for relpath in relpaths:
+            self._write(relpath, relpath.encode())
+        return relpaths
+
+    def _slim_with_shipped_rules(self):
+        rules = slim_image.parse_rules(os.path.join(CONTENTS_DIR, "slim-rules.txt"), "cpython-312")
+        slim_image.slim(self.root, rules)
+        return lambda relpath: os.path.exists(os.path.join(self.site, relpath))
+
+    def test_shipped_rules_keep_sources_read_at_runtime(self):
+        cython = self._install_wheel_files("cython-3.3.0")
+        numba = self._install_wheel_files("numba-0.67.0")
+        numpy = self._install_wheel_files("numpy-2.3.5")
+        exists = self._slim_with_shipped_rules()
+
+        # Cython's utility code (ObjectHandling.c, CppConvert.pyx, ...) is read by every compilation
+        self.assertEqual([path for path in cython if not exists(path)], [])
+        utility = [path for path in cython if path.startswith("Cython/Utility/") and path.endswith((".c", ".pyx"))]
+        self.assertGreater(len(utility), 30)
+
+        numba_sources = [path for path in numba if path.endswith((".c", ".cpp"))]
+        self.assertIn("numba/pycc/modulemixin.c", numba_sources)
+        self.assertEqual([path for path in numba_sources if not exists(path)], [])
+        self.assertFalse(any(exists(path) for path in numba if path.startswith("numba/tests/")))
+
+        for path in ("numpy/f2py/src/fortranobject.c", "numpy/_core/include/numpy/__multiarray_api.c",
+                     "numpy/_core/lib/libnpymath.a", "numpy/random/lib/libnpyrandom.a"):
+            self.assertIn(path, numpy)
+            self.assertTrue(exists(path), path)
+        self.assertFalse(exists("numpy/random/_examples/cython/extending.pyx"))
+        self.assertFalse(any(exists(path) for path in numpy if path.startswith("numpy/_core/tests/")))
+
+    def test_shipped_rules_parse(self):
+        rules = slim_image.parse_rules(os.path.join(CONTENTS_DIR, "slim-rules.txt"), "cpython-312")
+        self.assertTrue(any(rule["action"] == "allow" and "pysat" in rule["pattern"] for rule in rules))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+"""
+Unit tests for the cached SPEC 0 release-date tables in pipeline_utils.py.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+
+# Add the utils directory to the path so we can import module functions.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from packaging.version import Version
+
+from pipeline_utils import (
+    parse_upload_time,
+    parse_release_dates,
+    load_spec0_release_dates,
+    spec0_minimum_versions,
+    build_spec0_drop_schedule,
+    spec0_requirements_on,
+    get_spec0_packages,
+)
+from generate_dependency_table import (
+    DependencyCell,
+    is_spec0_compliant,
+    find_spec0_problems,
+    forecast_spec0_problems,
+)
+
+
+SIMPLE_API_DATA = {
+    "files": [
+        {"filename": "numpy-1.26.0-cp311-cp311-manylinux.whl", "upload-time": "2023-09-16T20:10:00.123456Z"},
+        {"filename": "numpy-1.26.0.tar.gz", "upload-time": "2023-09-16T19:00:00Z"},
+        {"filename": "numpy-1.26.4.tar.gz", "upload-time": "2024-02-05T21:00:00Z"},
+        {"filename": "numpy-2.0.0rc1.tar.gz", "upload-time": "2024-03-30T00:00:00Z"},
+        {"filename": "numpy-2.0.0.tar.gz", "upload-time": "2024-06-16T18:00:00Z"},
+        {"filename": "numpy-bogus.tar.gz", "upload-time": "2024-06-16T18:00:00Z"},
+        {"filename": "numpy-2.1.0.tar.gz", "upload-time": None},
+    ]
+}
+
+
+def _response(status_code=200, data=None, etag=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = data
+    response.headers = {"ETag": etag} if etag else {}
+    return response
+
+
+class TestParseReleaseDates(unittest.TestCase):
+    def test_parse_upload_time_formats(self):
+        self.assertEqual(parse_upload_time("2024-06-16T18:08:08Z"), datetime(2024, 6, 16, 18, 8, 8))
+        self.assertEqual(parse_upload_time("2024-06-16T18:08:08.5Z"), datetime(2024, 6, 16, 18, 8, 8, 500000))
+        self.assertIsNone(parse_upload_time("not a date"))
+        self.assertIsNone(parse_upload_time(None))
+
+    def test_only_earliest_final_minor_releases(self):
+        self.assertEqual(
+            parse_release_dates(SIMPLE_API_DATA),
+            {"1.26.0": datetime(2023, 9, 16, 19, 0), "2.0.0": datetime(2024, 6, 16, 18, 0)},
+        )
+
+
+class TestSpec0MinimumVersions(unittest.TestCase):
+    RELEASE_DATES = {
+        "numpy": {Version("1.26.0"): datetime(2023, 9, 16), Version("2.0.0"): datetime(2024, 6, 16)},
+        "zarr": {Version("2.0.0"): datetime(2015, 1, 1)},
+    }
+
+    def test_minimum_version_moves_with_date(self):
+        self.assertEqual(spec0_minimum_versions(self.RELEASE_DATES, datetime(2025, 1, 1)), {"numpy": Version("1.26.0")})
+        self.assertEqual(spec0_minimum_versions(self.RELEASE_DATES, datetime(2025, 10, 1)), {"numpy": Version("2.0.0")})
+        self.assertEqual(spec0_minimum_versions(self.RELEASE_DATES, datetime(2027, 1, 1)), {})
+
+
+class TestSpec0DropSchedule(unittest.TestCase):
+    RELEASE_DATES = {
+        "numpy": {
+            Version("1.26.0"): datetime(2023, 9, 16),
+            Version("2.0.0"): datetime(2024, 6, 16),
+            Version("2.1.0"): datetime(2024, 8, 18),
+        },
+    }
+
+    def test_schedule_is_sorted_by_drop_date(self):
+        schedule = build_spec0_drop_schedule(self.RELEASE_DATES)
+        self.assertEqual([str(v) for v, _, _ in schedule["numpy"]], ["1.26.0", "2.0.0", "2.1.0"])
+        _, released, dropped = schedule["numpy"][0]
+        self.assertEqual(dropped - released, timedelta(days=730))
+
+    def test_requirements_on_future_dates(self):
+        schedule = build_spec0_drop_schedule(self.RELEASE_DATES)
+        self.assertEqual(spec0_requirements_on(schedule, datetime(2025, 9, 1)), {"numpy": ">=1.26.0"})
+        self.assertEqual(spec0_requirements_on(schedule, datetime(2025, 10, 1)), {"numpy": ">=2.0.0"})
+        self.assertEqual(spec0_requirements_on(schedule, datetime(2026, 7, 1)), {"numpy": ">=2.1.0"})
+
+    def test_forecast_matches_find_spec0_problems_per_date(self):
+        schedule = build_spec0_drop_schedule(self.RELEASE_DATES)
+        project_ranges = {
+            "alpha==1.0": {"numpy": ">=1.20,<2.0", "requests": ">=2.0"},
+            "beta==2.0": {"numpy": ">=1.24,!=2.0.0,<2.1"},
+            "gamma==3.0": {"numpy": "any"},
+            "delta==4.0": {"numpy": "==1.*"},
+        }
+        dates = [datetime(2025, 9, 1), datetime(2025, 10, 1), datetime(2026, 7, 1)]
+        forecast = forecast_spec0_problems(
+            {"project_data": {
+                project: {pkg: DependencyCell(True, None, rng) for pkg, rng in ranges.items()}
+                for project, ranges in project_ranges.items()
+            }},
+            schedule,
+            dates,
+        )
+
+        for date in dates:
+            requirements = spec0_requirements_on(schedule, date)
+            table_data = {
+                "project_data": {
+                    project: {
+                        pkg: DependencyCell(True, is_spec0_compliant(pkg, rng, requirements), rng)
+                        for pkg, rng in ranges.items()
+                    }
+                    for project, ranges in project_ranges.items()
+                },
+                "spec0_requirements": requirements,
+            }
+            with self.subTest(date=date):
+                self.assertEqual(forecast[date], find_spec0_problems(table_data))
+        self.assertEqual(forecast[dates[0]], [])
+        self.assertEqual(len(forecast[dates[2]]), 3)
+
+
+class TestLoadSpec0ReleaseDates(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.cache_path = os.path.join(self.tmpdir.name, "spec0.json")
+
+    @patch("pipeline_utils.requests.get")
+    def test_fresh_cache_skips_pypi(self, mock_get):
+        mock_get.return_value = _response(data=SIMPLE_API_DATA, etag='"abc"')
+
+        first = load_spec0_release_dates(["numpy"], cache_path=self.cache_path)
+        second = load_spec0_release_dates(["numpy"], cache_path=self.cache_path)
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(first["numpy"][Version("2.0.0")], datetime(2024, 6, 16, 18, 0))
+
+    @patch("pipeline_utils.requests.get")
+    def test_stale_cache_revalidates_with_etag(self, mock_get):
+        mock_get.return_value = _response(data=SIMPLE_API_DATA, etag='"abc"')
+        load_spec0_release_dates(["numpy"], cache_path=self.cache_path)
+
+        mock_get.reset_mock()
+        mock_get.return_value = _response(status_code=304)
+        result = load_spec0_release_dates(["numpy"], cache_path=self.cache_path, max_age=timedelta(0))
+
+        self.assertEqual(mock_get.call_args.kwargs["headers"]["If-None-Match"], '"abc"')
+        self.assertIn(Version("1.26.0"), result["numpy"])
+        with open(self.cache_path) as f:
+            self.assertEqual(json.load(f)["packages"]["numpy"]["etag"], '"abc"')
+
+    @patch("pipeline_utils.requests.get", side_effect=RuntimeError("offline"))
+    def test_failed_refresh_falls_back_to_cache(self, _mock_get):
+        with open(self.cache_path, "w") as f:
+            json.dump({"packages": {"numpy": {
+                "fetched_at": "2000-01-01T00:00:00",
+                "etag": None,
+                "release_dates": {"2.0.0": "2024-06-16T18:00:00"},
+            }}}, f)
+
+        result = load_spec0_release_dates(["numpy", "scipy"], cache_path=self.cache_path)
+        self.assertEqual(result, {"numpy": {Version("2.0.0"): datetime(2024, 6, 16, 18, 0)}})
+
+    @patch("pipeline_utils.requests.get")
+    def test_unwritable_cache_is_not_fatal(self, mock_get):
+        mock_get.return_value = _response(data=SIMPLE_API_DATA, etag='"abc"')
+        cache_path = os.path.join(self.tmpdir.name, "missing-dir", "spec0.json")
+
+        result = load_spec0_release_dates(["numpy"], cache_path=cache_path)
+        self.assertIn(Version("2.0.0"), result["numpy"])
+        self.assertFalse(os.path.exists(cache_path))
+
+    @patch("pipeline_utils.load_spec0_release_dates")
+    def test_get_spec0_packages_for_date(self, mock_load):
+        mock_load.return_value = TestSpec0MinimumVersions.RELEASE_DATES
+        self.assertEqual(get_spec0_packages(datetime(2025, 1, 1)), ["numpy>=1.26.0"])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
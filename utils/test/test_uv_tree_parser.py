@@ -5,9 +5,12 @@ Unit tests for uv dependency-tree parsing and package extraction flow.
 
 import os
 import sys
+import tempfile
 import unittest
 from unittest.mock import patch
 
+import openpyxl
+
 
 # Add the utils directory to the path so we can import module functions.
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -15,7 +18,12 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from generate_dependency_table import (
     parse_uv_tree_output,
     get_dependency_ranges_by_package,
+    summarize_extraction_stats,
     find_dependency_conflicts,
+    find_spec0_problems,
+    excel_spreadsheet_from_table_data,
+    build_dependency_index,
+    DependencyCell,
 )
 
 
@@ -187,6 +195,38 @@ class TestGetDependencyRangesByPackageParallel(unittest.TestCase):
         self.assertIn("explode==1.0.0", str(exc.exception))
 
 
+    @patch("generate_dependency_table.get_packages_installed_in_environment", return_value=[])
+    @patch("generate_dependency_table.subprocess.check_output")
+    def test_workers_report_to_shared_stats_file(self, mock_check_output, _mock_installed):
+        mock_check_output.side_effect = self._mock_tree_for_command
+        get_dependency_ranges_by_package(["alpha==1.0.0", "beta==2.0.0"], max_workers=2)
+
+        stats_files = {call.kwargs["env"]["PYHC_DEP_TREE_STATS_FILE"] for call in mock_check_output.call_args_list}
+        self.assertEqual(len(stats_files), 1)
+        self.assertFalse(os.path.exists(stats_files.pop()))
+
+
+class TestSummarizeExtractionStats(unittest.TestCase):
+    def test_summarizes_worker_lines(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as f:
+            f.write('{"package": "sunpy[all]", "scratch": "tmpfs", "link_mode": "copy", "venv_kb": 2048, '
+                    '"read_bytes": 1048576, "write_bytes": 0, "elapsed_ms": 900, "status": 0}\n')
+            f.write('{"package": "hapiclient", "scratch": "disk", "link_mode": "hardlink", "venv_kb": 1024, '
+                    '"read_bytes": 0, "write_bytes": 2097152, "elapsed_ms": 400, "status": 0}\n')
+        self.addCleanup(os.remove, f.name)
+
+        summary = summarize_extraction_stats(f.name)
+        self.assertEqual(summary['venvs'], 2)
+        self.assertEqual(summary['tmpfs'], 1)
+        self.assertEqual(summary['venv_mb'], 3.0)
+        self.assertEqual(summary['largest_venv'], ("sunpy[all]", 2.0))
+        self.assertEqual((summary['read_mb'], summary['write_mb']), (1.0, 2.0))
+        self.assertEqual(summary['link_modes'], {"copy": 1, "hardlink": 1})
+
+    def test_missing_or_empty_stats(self):
+        self.assertIsNone(summarize_extraction_stats("/nonexistent/stats.jsonl"))
+
+
 class TestFindDependencyConflicts(unittest.TestCase):
     def test_detects_conflicts_from_tuple_dependency_shape(self):
         table_data = {
@@ -235,6 +275,59 @@ class TestFindDependencyConflicts(unittest.TestCase):
         self.assertIn("pyspedas requires botocore>=1.40.46,<1.40.62", conflicts[0])
         self.assertIn("cloudcatalog requires botocore>=1.42.43", conflicts[0])
 
+    def test_detects_conflicts_from_sparse_cells(self):
+        table_data = {
+            "core_dependencies": {},
+            "other_dependencies": {
+                "botocore": (2, None, None),
+                "numpy": (3, ">=2.0", True),
+            },
+            "project_data": {
+                "pyspedas==2.0.7": {"botocore": DependencyCell(False, None, "<1.40.62")},
+                "cloudcatalog==1.1.0": {
+                    "botocore": DependencyCell(False, None, ">=1.42.43"),
+                    "numpy": DependencyCell(True, False, ">=1.20"),
+                },
+            },
+            "spec0_requirements": {"numpy": ">=2.0.0"},
+        }
+
+        self.assertEqual(
+            find_dependency_conflicts(table_data),
+            ["Conflict for 'botocore': pyspedas requires botocore<1.40.62; cloudcatalog requires botocore>=1.42.43"],
+        )
+        self.assertEqual(
+            find_spec0_problems(table_data),
+            ["cloudcatalog: requires numpy>=1.20 but SPEC 0 requires numpy>=2.0.0"],
+        )
+
+    def test_uses_dependency_index_when_present(self):
+        project_data = {
+            "pyspedas==2.0.7": {"botocore": DependencyCell(False, None, "<1.40.62")},
+            "cloudcatalog==1.1.0": {"botocore": DependencyCell(False, None, ">=1.42.43")},
+        }
+        index = build_dependency_index(project_data)
+        self.assertEqual([project for project, _ in index["botocore"]], ["pyspedas==2.0.7", "cloudcatalog==1.1.0"])
+
+        # The reports read the index rather than rescanning project_data
+        table_data = {
+            "core_dependencies": {},
+            "other_dependencies": {"botocore": (2, None, None)},
+            "project_data": {},
+            "dependency_index": index,
+        }
+        self.assertEqual(
+            find_dependency_conflicts(table_data),
+            ["Conflict for 'botocore': pyspedas requires botocore<1.40.62; cloudcatalog requires botocore>=1.42.43"],
+        )
+
+    def test_dependency_cell_unpacks_like_tuple(self):
+        cell = DependencyCell(True, None, ">=1.0")
+        compatible, spec0_compliant, version_range = cell
+        self.assertEqual((compatible, spec0_compliant, version_range), (True, None, ">=1.0"))
+        self.assertEqual(cell, (True, None, ">=1.0"))
+        self.assertFalse(hasattr(cell, "__dict__"))
+
     def test_returns_empty_when_no_conflict_markers(self):
         table_data = {
             "core_dependencies": {"numpy": (2, ">=1.0", True)},
@@ -249,5 +342,58 @@ class TestFindDependencyConflicts(unittest.TestCase):
         self.assertEqual(conflicts, [])
 
 
+class TestExcelSpreadsheetFromTableData(unittest.TestCase):
+    TABLE_DATA = {
+        "core_dependencies": {"numpy": (2, ">=1.25", True)},
+        "other_dependencies": {
+            "botocore": (4, None, None),
+            "requests": (5, ">=2.0", False),
+        },
+        "project_data": {
+            "alpha==1.0.0": {
+                "numpy": (True, True, ">=1.20"),
+                "botocore": (False, None, "<1.40"),
+                "requests": (True, False, ">=1.0"),
+            },
+            "beta==2.0.0": {
+                "botocore": (False, None, ">=1.42"),
+            },
+        },
+    }
+
+    def _round_trip(self):
+        workbook = excel_spreadsheet_from_table_data(self.TABLE_DATA)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "table.xlsx")
+            workbook.save(path)
+            return openpyxl.load_workbook(path).active
+
+    @staticmethod
+    def _fill(cell):
+        return cell.fill.start_color.rgb[-6:].lower() if cell.fill.fill_type else None
+
+    def test_rows_are_written_in_row_order(self):
+        worksheet = self._round_trip()
+        self.assertEqual(
+            [cell.value for cell in worksheet[1]],
+            ["Package", "Allowed Version Range", "alpha==1.0.0", "beta==2.0.0"],
+        )
+        self.assertEqual([cell.value for cell in worksheet[2]], ["numpy", ">=1.25", ">=1.20", None])
+        self.assertEqual([cell.value for cell in worksheet[4]], ["botocore", "N/A", "<1.40", ">=1.42"])
+        self.assertEqual([cell.value for cell in worksheet[5]], ["requests", ">=2.0", ">=1.0", None])
+
+    def test_cells_use_shared_fill_styles(self):
+        worksheet = self._round_trip()
+        self.assertEqual(self._fill(worksheet["A2"]), "aaaaaa")  # core dependency
+        self.assertEqual(self._fill(worksheet["A3"]), "333333")  # separator
+        self.assertEqual(self._fill(worksheet["C2"]), "00ff00")  # compatible
+        self.assertEqual(self._fill(worksheet["B4"]), "ff0000")  # conflict
+        self.assertEqual(self._fill(worksheet["C4"]), "ff0000")
+        self.assertEqual(self._fill(worksheet["B5"]), "ffff00")  # SPEC 0 non-compliant allowed range
+        self.assertEqual(self._fill(worksheet["C5"]), "ffff00")
+        self.assertIsNone(self._fill(worksheet["D5"]))
+        self.assertLessEqual({"PyHC Green", "PyHC Red", "PyHC Gray"}, set(worksheet.parent.named_styles))
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""
+Unit tests for the in-image lockfile check, docker/pyhc-environment/contents/verify-lockfile.py.
+"""
+
+import importlib.util
+import os
+import tempfile
+import unittest
+
+SCRIPT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "docker", "pyhc-environment", "contents", "verify-lockfile.py",
+)
+_spec = importlib.util.spec_from_file_location("verify_lockfile", SCRIPT_PATH)
+verify_lockfile = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(verify_lockfile)
+
+
+class TestVerifyLockfile(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, name, content):
+        path = os.path.join(self._tmp.name, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_read_pins_across_tier_files(self):
+        base = self._write("base.txt", "# base install tier\nnumpy==2.2.6 \\\n    --hash=sha256:aaaa\n")
+        top = self._write("top.txt", "# top install tier\nSciQLop==0.12.2\npyhc_core==0.0.8\n")
+        self.assertEqual(verify_lockfile.read_pins([base, top]), {
+            "numpy": ("numpy", "2.2.6"),
+            "sciqlop": ("SciQLop", "0.12.2"),
+            "pyhc-core": ("pyhc_core", "0.0.8"),
+        })
+
+    def test_compare(self):
+        pins = {"numpy": ("numpy", "2.2.6"), "sunpy": ("sunpy", "8.0.0"), "astropy": ("astropy", "7.1")}
+        installed = {"numpy": "2.2.6", "astropy": "7.1.0", "pip": "25.1", "uv": "0.8.0"}
+        missing, mismatched, extra = verify_lockfile.compare(pins, installed)
+        self.assertEqual(missing, ["sunpy"])
+        self.assertEqual(mismatched, [])  # 7.1 == 7.1.0
+        self.assertEqual(extra, ["pip", "uv"])
+
+        missing, mismatched, _ = verify_lockfile.compare(pins, {**installed, "numpy": "2.3.0", "sunpy": "8.0.0"})
+        self.assertEqual(missing, [])
+        self.assertEqual(mismatched, [("numpy", "2.2.6", "2.3.0")])
+
+    def test_main_against_the_running_interpreter(self):
+        import packaging
+        exact = self._write("top.txt", f"packaging=={packaging.__version__}\n")
+        self.assertEqual(verify_lockfile.main([exact]), 0)
+        wrong = self._write("mid.txt", "packaging==0.0.1\n")
+        self.assertEqual(verify_lockfile.main([exact, wrong]), 1)
+        self.assertEqual(verify_lockfile.main([]), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+"""
+Unit tests for the interval/array range evaluation in version_intervals.py.
+"""
+
+import os
+import sys
+import unittest
+
+# Add the utils directory to the path so we can import module functions.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from packaging.version import Version
+
+from version_intervals import (
+    parse_range_bounds,
+    evaluate_range_grid,
+    format_range_bounds,
+    IncrementalRequirementReducer,
+)
+from generate_dependency_table import (
+    are_compatible,
+    is_spec0_compliant,
+    compatibility_grid,
+    spec0_compliance_grid,
+    reduce_environment_requirements,
+)
+
+
+class TestParseRangeBounds(unittest.TestCase):
+    def test_any_is_unbounded(self):
+        self.assertEqual(parse_range_bounds("any"), (None, None, frozenset()))
+        self.assertEqual(parse_range_bounds("ANY"), (None, None, frozenset()))
+
+    def test_strictest_bounds_win(self):
+        lower, upper, exclusions = parse_range_bounds(">=1.0,>1.5,<3,<=2.0,!=1.7")
+        self.assertEqual(lower, (Version("1.5"), True))
+        self.assertEqual(upper, (Version("2.0"), True))
+        self.assertEqual(exclusions, frozenset({Version("1.7")}))
+
+    def test_pin_and_compatible_release(self):
+        self.assertEqual(
+            parse_range_bounds(" ==1.2.3"),
+            ((Version("1.2.3"), False), (Version("1.2.3"), True), frozenset()),
+        )
+        self.assertEqual(
+            parse_range_bounds("~=1.2.3"),
+            ((Version("1.2.3"), False), (Version("1.3"), False), frozenset()),
+        )
+
+    def test_unsupported_specifiers_return_none(self):
+        self.assertIsNone(parse_range_bounds("==1.*"))
+        self.assertIsNone(parse_range_bounds("===1.0"))
+        self.assertIsNone(parse_range_bounds("not a range"))
+
+
+class TestEvaluateRangeGrid(unittest.TestCase):
+    PAIRS = [
+        (">=1.0", ">=1.5,<2"),
+        (">=1.0,<2.0", ">=2.0"),
+        (">1.0", "<=1.0"),
+        (">=1.0", "<1.0.0"),
+        ("==1.5", ">=1.0,<2.0,!=1.5"),
+        (">=1.0,<2.0,!=1.5", "==1.5"),
+        (">=1.0,<2.0,!=1.5", "==1.6"),
+        ("any", "<0.1"),
+        (">=2.0.0", ">=1.5,<2.0"),
+        (">=1.2,<1.3", "~=1.2.5"),
+        ("<1.2", "~=1.2.5"),
+        (">=4.9.2,!=5.0", ">=4.12"),
+        (">=1.21.0,<1.27.0", ">=1.19.5,<1.27.0"),
+        ("==1.1.2", "<2"),
+        (">=1.0.4,<2.0.0", ">=2.0.0"),
+    ]
+
+    def test_matches_scalar_are_compatible(self):
+        for allowed, project in self.PAIRS:
+            with self.subTest(allowed=allowed, project=project):
+                compatible, fallback = evaluate_range_grid([allowed], [[project]])
+                self.assertFalse(fallback[0, 0])
+                self.assertEqual(bool(compatible[0, 0]), are_compatible(allowed, project))
+
+    def test_touching_inclusive_bounds_intersect(self):
+        # ">=1.0,<=2.0" and ">=2.0" share exactly 2.0. The scalar range logic rejects
+        # this edge case; the interval evaluation treats the single version as valid.
+        compatible, _ = evaluate_range_grid([">=1.0,<=2.0"], [[">=2.0"], [">2.0"]])
+        self.assertEqual(compatible[:, 0].tolist(), [True, False])
+
+    def test_grid_shape_and_unused_cells(self):
+        allowed = [">=1.0", None, "any"]
+        grid = [
+            [">=1.5", ">=2.0", None],
+            [None, "<1.0", ">=0.1"],
+        ]
+        compatible, fallback = evaluate_range_grid(allowed, grid)
+        self.assertEqual(compatible.shape, (2, 3))
+        self.assertEqual(compatible.tolist(), [[True, False, False], [False, False, True]])
+        self.assertFalse(fallback.any())
+
+    def test_unsupported_cells_are_flagged_for_fallback(self):
+        compatible, fallback = evaluate_range_grid([">=1.0"], [["==1.*"], [">=1.0"]])
+        self.assertEqual(fallback[:, 0].tolist(), [True, False])
+        self.assertEqual(compatible[:, 0].tolist(), [False, True])
+
+    def test_compatibility_grid_resolves_fallback_cells(self):
+        grid = compatibility_grid([">=1.0,<3"], [["===2.0"]])
+        self.assertEqual(bool(grid[0, 0]), are_compatible(">=1.0,<3", "===2.0"))
+
+
+class TestSpec0ComplianceGrid(unittest.TestCase):
+    def test_matches_scalar_is_spec0_compliant(self):
+        spec0 = {"numpy": ">=2.0.0", "scipy": ">=1.12.0"}
+        names = ["numpy", "requests", "scipy"]
+        grid = [
+            [">=1.5,<2.0", ">=2.0", "any"],
+            [">=1.20", None, "==1.11.*"],
+            [None, ">=1.0", ">=1.13,<2"],
+        ]
+        compliance = spec0_compliance_grid(names, grid, spec0)
+        for p, row in enumerate(grid):
+            for d, version_range in enumerate(row):
+                with self.subTest(project=p, package=names[d]):
+                    if version_range is None:
+                        self.assertIsNone(compliance[p, d])
+                    else:
+                        self.assertEqual(compliance[p, d], is_spec0_compliant(names[d], version_range, spec0))
+
+
+class TestIncrementalRequirementReducer(unittest.TestCase):
+    PROJECTS = {
+        "alpha==1.0": {"numpy": ">=1.20,<2.0", "requests": "any", "alpha": "==1.0"},
+        "beta==2.0": {"numpy": ">=1.25", "requests": ">=2.0,!=2.1.0", "beta": "==2.0"},
+        "gamma==3.0": {"numpy": ">=1.22,<1.27", "scipy": ">=1.10", "gamma": "==3.0"},
+    }
+
+    @staticmethod
+    def _interval(range_str):
+        lower, upper, _ = parse_range_bounds(range_str)
+        return lower, upper
+
+    def test_matches_reduce_environment_requirements(self):
+        reducer = IncrementalRequirementReducer.from_project_dependencies(self.PROJECTS)
+        expected = reduce_environment_requirements(self.PROJECTS)
+        allowed = reducer.allowed_ranges()
+        self.assertEqual(list(allowed), list(expected))
+        for package_name, expected_range in expected.items():
+            with self.subTest(package=package_name):
+                self.assertEqual(self._interval(allowed[package_name]), self._interval(expected_range))
+        self.assertEqual(allowed["requests"], ">=2.0,!=2.1.0")
+        self.assertEqual(reducer.conflicts(), [])
+
+    def test_replacing_project_only_touches_its_dependencies(self):
+        reducer = IncrementalRequirementReducer.from_project_dependencies(self.PROJECTS)
+        affected = reducer.set_project_requirements(
+            "gamma==3.0", {"numpy": ">=2.1", "scipy": ">=1.10", "gamma": "==3.0"}
+        )
+        self.assertEqual(affected, {"numpy"})
+        self.assertIsNone(reducer.allowed_range("numpy"))
+        self.assertEqual(reducer.conflicts(), ["numpy"])
+
+        # Loosening the offending project clears the conflict again
+        reducer.set_project_requirements("alpha==1.0", {"numpy": ">=1.20", "alpha": "==1.0"})
+        self.assertEqual(reducer.allowed_range("numpy"), ">=2.1")
+        self.assertEqual(reducer.conflicts(), [])
+        self.assertEqual(reducer.allowed_range("requests"), ">=2.0,!=2.1.0")
+
+    def test_remove_project_drops_unused_dependencies(self):
+        reducer = IncrementalRequirementReducer.from_project_dependencies(self.PROJECTS)
+        self.assertEqual(reducer.remove_project("gamma==3.0"), {"numpy", "scipy", "gamma"})
+        self.assertNotIn("scipy", reducer.allowed_ranges())
+        self.assertEqual(reducer.allowed_range("numpy"), ">=1.25,<2.0")
+        self.assertEqual(reducer.contributors("numpy"), {"alpha==1.0": ">=1.20,<2.0", "beta==2.0": ">=1.25"})
+
+    def test_single_version_conflicts(self):
+        reducer = IncrementalRequirementReducer.from_project_dependencies({
+            "a": {"dep": "==1.5"},
+            "b": {"dep": ">=1.0,!=1.5"},
+        })
+        self.assertEqual(reducer.conflicts(), ["dep"])
+        reducer.set_project_requirements("b", {"dep": ">=1.0,!=1.6"})
+        self.assertEqual(reducer.allowed_range("dep"), "==1.5")
+
+    def test_unsupported_range_raises(self):
+        reducer = IncrementalRequirementReducer()
+        with self.assertRaises(ValueError):
+            reducer.set_project_requirements("a", {"dep": "==1.*"})
+
+    def test_format_range_bounds_drops_irrelevant_exclusions(self):
+        lower, upper, exclusions = parse_range_bounds(">=1.0,<2.0,!=0.5,!=1.5,!=2.0")
+        self.assertEqual(format_range_bounds(lower, upper, exclusions), ">=1.0,<2.0,!=1.5")
+        self.assertEqual(format_range_bounds(None, None, frozenset()), "any")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""
+Unit tests for the in-image scripts docker/pyhc-environment/contents/compile-bytecode.py and warm-image.py.
+"""
+
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+CONTENTS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "docker", "pyhc-environment", "contents",
+)
+
+
+def _load(name, filename):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(CONTENTS_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module  # So worker processes can unpickle its functions
+    spec.loader.exec_module(module)
+    return module
+
+
+compile_bytecode = _load("compile_bytecode", "compile-bytecode.py")
+warm_image = _load("warm_image", "warm-image.py")
+
+
+class TestCompileBytecode(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, relpath, content):
+        path = os.path.join(self.root, relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_compiles_new_sources_only(self):
+        old = self._write("site-packages/old/__init__.py", "x = 1\n")
+        marker = self._write("marker", "")
+        time.sleep(0.01)
+        os.utime(marker)  # ctime of the marker is before the new files
+        marker_ns = os.stat(marker).st_ctime_ns
+        time.sleep(0.01)
+        good = self._write("site-packages/pkg/__init__.py", "y = 2\n")
+        self._write("site-packages/pkg/py2_example.py", "print 'hello'\n")
+        self._write("site-packages/pkg/data.txt", "not python\n")
+
+        sources = compile_bytecode.find_sources(self.root, marker_ns)
+        self.assertEqual([os.path.basename(path) for path in sources], ["__init__.py", "py2_example.py"])
+        self.assertEqual(compile_bytecode.compile_sources(sources, workers=2), (1, 1))
+        self.assertTrue(os.path.exists(importlib.util.cache_from_source(good)))
+        self.assertFalse(os.path.exists(importlib.util.cache_from_source(old)))
+
+    def test_main(self):
+        self._write("pkg/mod.py", "z = 3\n")
+        self.assertEqual(compile_bytecode.main(["--layer", "top", "--workers", "1", self.root]), 0)
+        self.assertEqual(compile_bytecode.find_sources(self.root), [os.path.join(self.root, "pkg", "mod.py")])
+        self.assertEqual(compile_bytecode.compile_sources([]), (0, 0))
+
+
+class TestWarmImage(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.watched = os.path.join(self._tmp.name, "watched")
+        self.modules = os.path.join(self._tmp.name, "modules")
+        os.makedirs(self.watched)
+        os.makedirs(self.modules)
+        self._path = os.environ.get("PYTHONPATH")
+        os.environ["PYTHONPATH"] = self.modules
+
+    def tearDown(self):
+        if self._path is None:
+            os.environ.pop("PYTHONPATH", None)
+        else:
+            os.environ["PYTHONPATH"] = self._path
+        self._tmp.cleanup()
+
+    def test_changed_paths(self):
+        with open(os.path.join(self.watched, "a.txt"), "w") as f:
+            f.write("a")
+        before = warm_image.snapshot([self.watched])
+        with open(os.path.join(self.watched, "a.txt"), "w") as f:
+            f.write("longer")
+        os.makedirs(os.path.join(self.watched, "cache"))
+        after = warm_image.snapshot([self.watched])
+        self.assertEqual(warm_image.changed_paths(before, after),
+                         [os.path.join(self.watched, "a.txt"), os.path.join(self.watched, "cache")])
+        self.assertEqual(warm_image.changed_paths(after, after), [])
+
+    def test_check_cold_import(self):
+        with open(os.path.join(self.modules, "quiet_module.py"), "w") as f:
+            f.write("x = 1\n")
+        with open(os.path.join(self.modules, "writing_module.py"), "w") as f:
+            # Creates its config file on first import, like astropy or pysat
+            f.write(f"import os\npath = {os.path.join(self.watched, 'first-run.cfg')!r}\n"
+                    f"os.path.exists(path) or open(path, 'w').close()\n")
+        self.assertEqual(warm_image.check_cold_import(["json", "quiet_module"], [self.watched]), [])
+        self.assertEqual(warm_image.check_cold_import(["writing_module", "missing_module"], [self.watched]),
+                         [os.path.join(self.watched, "first-run.cfg")])
+        # Once the file exists (the warm-up), importing again writes nothing
+        self.assertEqual(warm_image.check_cold_import(["writing_module"], [self.watched]), [])
+
+    def test_run_python(self):
+        self.assertGreaterEqual(warm_image.run_python("pass"), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
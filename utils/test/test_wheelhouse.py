@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+"""
+Unit tests for the locally built wheelhouse in wheelhouse.py and the in-image build script
+docker/pyhc-environment/contents/build-wheelhouse.py.
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+# Add the utils directory to the path so we can import module functions.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wheelhouse import (
+    format_wheelhouse_report,
+    has_compatible_wheel,
+    load_manifest,
+    merge_built_wheels,
+    plan_wheelhouse,
+    read_wheelhouse_plan,
+    target_tags,
+    toolchain_fingerprint,
+    wheel_key,
+    write_wheelhouse_plan,
+)
+
+SCRIPT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "docker", "pyhc-environment", "contents", "build-wheelhouse.py",
+)
+_spec = importlib.util.spec_from_file_location("build_wheelhouse", SCRIPT_PATH)
+build_wheelhouse = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(build_wheelhouse)
+
+ENVIRONMENT_YML = """\
+name: pyhc-all
+channels:
+  - conda-forge
+dependencies:
+  - python=3.12
+  - gcc_linux-64=14.2.*       # compiler comment
+  - gfortran_linux-64=14.2.*
+  - jupyterlab=4.0.10
+  - pip
+"""
+
+RELEASE_FILES = {
+    ("numpy", "2.2.6"): ["numpy-2.2.6.tar.gz", "numpy-2.2.6-cp312-cp312-manylinux_2_17_x86_64.manylinux2014_x86_64.whl"],
+    ("requests", "2.32.3"): ["requests-2.32.3-py3-none-any.whl", "requests-2.32.3.tar.gz"],
+    ("wmm2015", "1.1.1"): ["wmm2015-1.1.1.tar.gz"],
+    ("oldpkg", "0.1"): ["oldpkg-0.1-cp39-cp39-manylinux2014_x86_64.whl", "oldpkg-0.1.tar.gz"],
+}
+
+
+def _release_files(name, version):
+    if (name, version) not in RELEASE_FILES:
+        raise RuntimeError("offline")
+    return RELEASE_FILES[(name, version)]
+
+
+class TestWheelhouse(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.environment_file = self._write("environment.yml", ENVIRONMENT_YML)
+        self.wheelhouse_dir = os.path.join(self._tmp.name, "wheelhouse")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, name, content):
+        path = os.path.join(self._tmp.name, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_toolchain_fingerprint_tracks_compilers_only(self):
+        fingerprint = toolchain_fingerprint(self.environment_file, "x86_64")
+        self.assertEqual(fingerprint, toolchain_fingerprint(self.environment_file, "x86_64"))
+        self.assertNotEqual(fingerprint, toolchain_fingerprint(self.environment_file, "aarch64"))
+
+        self._write("environment.yml", ENVIRONMENT_YML.replace("jupyterlab=4.0.10", "jupyterlab=4.4.0"))
+        self.assertEqual(fingerprint, toolchain_fingerprint(self.environment_file, "x86_64"))
+        self._write("environment.yml", ENVIRONMENT_YML.replace("gcc_linux-64=14.2.*", "gcc_linux-64=15.1.*"))
+        self.assertNotEqual(fingerprint, toolchain_fingerprint(self.environment_file, "x86_64"))
+
+    def test_wheel_key(self):
+        self.assertEqual(wheel_key("Sammi_CDF", "1.1.0", "3.12", "abc123"), "sammi-cdf-1.1.0-cp312-abc123")
+
+    def test_has_compatible_wheel(self):
+        tags = target_tags("3.12", "x86_64")
+        self.assertTrue(has_compatible_wheel(RELEASE_FILES[("numpy", "2.2.6")], tags))
+        self.assertTrue(has_compatible_wheel(RELEASE_FILES[("requests", "2.32.3")], tags))
+        self.assertFalse(has_compatible_wheel(RELEASE_FILES[("wmm2015", "1.1.1")], tags))
+        self.assertFalse(has_compatible_wheel(RELEASE_FILES[("oldpkg", "0.1")], tags))
+        self.assertFalse(has_compatible_wheel(["not-a-wheel.whl"], tags))
+
+    @patch("wheelhouse.fetch_release_files", side_effect=_release_files)
+    def test_plan_wheelhouse(self, _files):
+        pins = {"numpy": "numpy==2.2.6", "requests": "requests==2.32.3", "wmm2015": "wmm2015==1.1.1",
+                "oldpkg": "oldpkg==0.1", "unknown": "unknown==1.0"}
+        plan = plan_wheelhouse(pins, self.wheelhouse_dir, self.environment_file)
+        self.assertEqual(sorted(plan), ["oldpkg", "wmm2015"])
+        self.assertTrue(plan["wmm2015"]["key"].startswith("wmm2015-1.1.1-cp312-"))
+        self.assertFalse(plan["wmm2015"]["cached"])
+
+        # Once the wheel is in the wheelhouse, the plan reuses it
+        key = plan["wmm2015"]["key"]
+        self._write(os.path.join("wheelhouse", key, "wmm2015-1.1.1-cp312-cp312-linux_x86_64.whl"), "wheel")
+        self._write(os.path.join("wheelhouse", "manifest.json"), json.dumps({key: {"wheel": "wmm2015-1.1.1-cp312-cp312-linux_x86_64.whl"}}))
+        self.assertTrue(plan_wheelhouse(pins, self.wheelhouse_dir, self.environment_file)["wmm2015"]["cached"])
+
+    def test_plan_file_round_trip(self):
+        plan = {"wmm2015": {"pin": "wmm2015==1.1.1", "key": "wmm2015-1.1.1-cp312-abc", "cached": False}}
+        path = os.path.join(self._tmp.name, "wheelhouse.txt")
+        write_wheelhouse_plan(plan, path)
+        self.assertEqual(read_wheelhouse_plan(path), {"wmm2015-1.1.1-cp312-abc": "wmm2015==1.1.1"})
+        self.assertEqual(build_wheelhouse.read_plan(path), [("wmm2015-1.1.1-cp312-abc", "wmm2015==1.1.1")])
+        write_wheelhouse_plan({}, path)
+        self.assertEqual(read_wheelhouse_plan(path), {})
+
+    def test_build_script_reuses_cached_wheels(self):
+        plan_path = self._write("wheelhouse.txt", "# header\nwmm2015==1.1.1  # wmm2015-key\n")
+        self._write(os.path.join("cache", "wmm2015-key", "wmm2015-1.1.1-cp312-cp312-linux_x86_64.whl"), "wheel")
+        output_dir = os.path.join(self._tmp.name, "out")
+        report_dir = os.path.join(self._tmp.name, "builds")
+        with patch.object(build_wheelhouse, "build_wheel") as build:
+            self.assertEqual(build_wheelhouse.main([plan_path, os.path.join(self._tmp.name, "cache"), output_dir, report_dir]), 0)
+            build.assert_not_called()
+        with open(os.path.join(output_dir, "install.txt")) as f:
+            self.assertEqual(f.read(), "wmm2015-key/wmm2015-1.1.1-cp312-cp312-linux_x86_64.whl\n")
+        with open(os.path.join(report_dir, "wmm2015-key.json")) as f:
+            self.assertEqual(json.load(f), {"cached": True})
+        self.assertEqual(sorted(os.listdir(output_dir)), ["install.txt", "wmm2015-key"])
+
+    def test_merge_built_wheels(self):
+        plan_path = self._write("wheelhouse.txt", "wmm2015==1.1.1  # wmm-key\nsavic==1.2.7  # savic-key\nmissing==1.0  # missing-key\n")
+        export_dir = os.path.join(self._tmp.name, "export")
+        self._write(os.path.join("export", "wheels", "wmm-key", "wmm2015-1.1.1-cp312-cp312-linux_x86_64.whl"), "new wheel")
+        self._write(os.path.join("export", "builds", "wmm-key.json"), json.dumps({"cached": False, "build_seconds": 95.2}))
+        self._write(os.path.join("export", "wheels", "savic-key", "savic-1.2.7-cp312-cp312-linux_x86_64.whl"), "old wheel")
+        self._write(os.path.join("export", "builds", "savic-key.json"), json.dumps({"cached": True}))
+
+        now = datetime(2026, 10, 1)
+        # savic was built on an earlier run; "stale" hasn't been used for two months
+        merge_built_wheels(export_dir, self.wheelhouse_dir, self._write("first.txt", "savic==1.2.7  # savic-key\n"), now - timedelta(days=1))
+        manifest = load_manifest(self.wheelhouse_dir)
+        manifest["savic-key"]["build_seconds"] = 300.0
+        manifest["stale"] = {"wheel": "stale.whl", "last_used": (now - timedelta(days=60)).isoformat()}
+        with open(os.path.join(self.wheelhouse_dir, "manifest.json"), "w") as f:
+            json.dump(manifest, f)
+
+        report = merge_built_wheels(export_dir, self.wheelhouse_dir, plan_path, now)
+        self.assertEqual(report, {"built": [("wmm-key", 95.2)], "reused": [("savic-key", 300.0)],
+                                  "missing": ["missing-key"], "pruned": ["stale"]})
+        manifest = load_manifest(self.wheelhouse_dir)
+        self.assertEqual(sorted(manifest), ["savic-key", "wmm-key"])
+        self.assertEqual(manifest["wmm-key"]["name"], "wmm2015")
+        self.assertEqual(manifest["wmm-key"]["last_used"], now.isoformat())
+        self.assertTrue(os.path.exists(os.path.join(self.wheelhouse_dir, "wmm-key", "wmm2015-1.1.1-cp312-cp312-linux_x86_64.whl")))
+
+        summary = format_wheelhouse_report(report)
+        self.assertTrue(summary.startswith("Wheelhouse: 1 reused (300.0s of builds saved), 1 built in 95.2s"))
+        self.assertIn("missing missing-key", summary)
+
+
+if __name__ == '__main__':
+    unittest.main()
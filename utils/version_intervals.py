@@ -0,0 +1,372 @@
+"""
+Interval representation of version ranges for array-backed compatibility checks.
+
+A version range like ">=1.5,<2.0,!=1.6" is treated as an interval over the
+ordered version space (lower bound, upper bound) plus a set of excluded points.
+For a grid of ranges, the versions mentioned in each column are replaced by dense
+integer ranks so that bounds can be compared with NumPy broadcasting instead of
+repeatedly combining SpecifierSets in Python loops.
+
+The same bounds also back `IncrementalRequirementReducer`, which keeps each
+dependency's allowed range up to date as individual projects change.
+"""
+
+from bisect import bisect_left, insort
+from functools import lru_cache
+
+import numpy as np
+from packaging.specifiers import Specifier, InvalidSpecifier
+from packaging.version import Version, InvalidVersion
+
+
+# Encoded bound used for a missing lower/upper bound. Real bounds are encoded as
+# 2*rank (inclusive) or 2*rank+1 / 2*rank-1 (exclusive lower / exclusive upper),
+# so these sentinels always sort outside any encoded bound.
+_UNBOUNDED_LOWER = -2
+
+
+def _compatible_release_upper(version):
+    """
+    :param version: Version from a compatible release rule (i.e. Version(v) from '~=v')
+    :return: The exclusive PEP 440 upper bound Version, e.g. Version("1.3") for "~=1.2.3"
+    """
+    parts = list(version.release)
+    if len(parts) == 1:
+        upper_parts = [parts[0] + 1]
+    else:
+        upper_parts = parts[:-1]
+        upper_parts[-1] += 1
+    return Version(".".join(str(p) for p in upper_parts))
+
+
+@lru_cache(maxsize=None)
+def parse_range_bounds(range_str):
+    """
+    Parse a version range string into interval bounds.
+    :param range_str: String like ">=1.5.0,<2.0,!=1.6" or "any"
+    :return: Tuple (lower, upper, exclusions) where lower is (Version, exclusive) or None,
+             upper is (Version, inclusive) or None, and exclusions is a frozenset of Versions.
+             Returns None if the range can't be represented as an interval (e.g. '===' or wildcards).
+    """
+    lower = None
+    upper = None
+    exclusions = set()
+
+    cleaned = str(range_str).strip()
+    if cleaned.lower() == "any":
+        return None, None, frozenset()
+
+    for part in cleaned.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            spec = Specifier(part)
+        except InvalidSpecifier:
+            return None
+        if spec.version.endswith(".*"):
+            return None
+        try:
+            v = Version(spec.version)
+        except InvalidVersion:
+            return None
+
+        op = spec.operator
+        new_lower = None
+        new_upper = None
+        if op == ">=":
+            new_lower = (v, False)
+        elif op == ">":
+            new_lower = (v, True)
+        elif op == "<=":
+            new_upper = (v, True)
+        elif op == "<":
+            new_upper = (v, False)
+        elif op == "==":
+            new_lower = (v, False)
+            new_upper = (v, True)
+        elif op == "~=":
+            new_lower = (v, False)
+            new_upper = (_compatible_release_upper(v), False)
+        elif op == "!=":
+            exclusions.add(v)
+        else:
+            return None  # '===' arbitrary equality has no interval meaning
+
+        # The strictest lower bound is the largest (v, exclusive) and the strictest
+        # upper bound is the smallest (v, inclusive).
+        if new_lower is not None and (lower is None or new_lower > lower):
+            lower = new_lower
+        if new_upper is not None and (upper is None or new_upper < upper):
+            upper = new_upper
+
+    return lower, upper, frozenset(exclusions)
+
+
+def evaluate_range_grid(reference_ranges, range_grid):
+    """
+    Check every cell of range_grid for a non-empty intersection with its column's reference range.
+
+    This is the array equivalent of calling `are_compatible(reference_ranges[d], range_grid[p][d])`
+    for every cell, e.g. the "Allowed Version Range" column against each project's ranges.
+    :param reference_ranges: List of D range strings like [">=1.0,<2.0", "any", None, ...].
+                             None marks a column with no valid range (a dependency conflict).
+    :param range_grid: List of P lists of D range strings. None marks an unused cell.
+    :return: Tuple (compatible, fallback) of (P, D) boolean arrays. `fallback` flags cells that
+             are in use but couldn't be encoded as intervals; their `compatible` value is False
+             and callers should evaluate them another way.
+    """
+    n_cols = len(reference_ranges)
+    rows = [list(reference_ranges)] + [list(row) for row in range_grid]
+    n_rows = len(rows)
+
+    parsed = []
+    present = np.zeros((n_rows, n_cols), dtype=bool)
+    supported = np.zeros((n_rows, n_cols), dtype=bool)
+    column_versions = [set() for _ in range(n_cols)]
+    for i, row in enumerate(rows):
+        parsed_row = []
+        for d, range_str in enumerate(row):
+            bounds = None
+            if range_str is not None:
+                present[i, d] = True
+                bounds = parse_range_bounds(str(range_str))
+                if bounds is not None:
+                    supported[i, d] = True
+                    lower, upper, exclusions = bounds
+                    if lower is not None:
+                        column_versions[d].add(lower[0])
+                    if upper is not None:
+                        column_versions[d].add(upper[0])
+                    column_versions[d].update(exclusions)
+            parsed_row.append(bounds)
+        parsed.append(parsed_row)
+
+    # Dense per-column ranks keep the exclusion mask small: its last axis only needs
+    # as many slots as the busiest column has distinct versions.
+    column_ranks = [{v: r for r, v in enumerate(sorted(versions))} for versions in column_versions]
+    n_ranks = max([len(ranks) for ranks in column_ranks] + [1])
+    unbounded_upper = 2 * n_ranks + 2
+
+    lower_keys = np.full((n_rows, n_cols), _UNBOUNDED_LOWER, dtype=np.int64)
+    upper_keys = np.full((n_rows, n_cols), unbounded_upper, dtype=np.int64)
+    excluded = np.zeros((n_rows, n_cols, n_ranks), dtype=bool)
+    for i, parsed_row in enumerate(parsed):
+        for d, bounds in enumerate(parsed_row):
+            if bounds is None:
+                continue
+            lower, upper, exclusions = bounds
+            ranks = column_ranks[d]
+            if lower is not None:
+                lower_keys[i, d] = 2 * ranks[lower[0]] + (1 if lower[1] else 0)
+            if upper is not None:
+                upper_keys[i, d] = 2 * ranks[upper[0]] - (0 if upper[1] else 1)
+            for v in exclusions:
+                excluded[i, d, ranks[v]] = True
+
+    lo = np.maximum(lower_keys[1:], lower_keys[0])
+    hi = np.minimum(upper_keys[1:], upper_keys[0])
+    non_empty = lo <= hi
+    # Equal even keys mean the intersection collapsed to a single version, which
+    # survives only if neither side excludes it.
+    single_version = non_empty & (lo == hi) & (lo % 2 == 0)
+    point_rank = np.clip(lo // 2, 0, n_ranks - 1)
+    point_excluded = np.take_along_axis(excluded[1:], point_rank[..., None], axis=2)[..., 0]
+    point_excluded |= excluded[0][np.arange(n_cols), point_rank]
+    intersects = non_empty & ~(single_version & point_excluded)
+
+    in_use = present[1:] & present[0]
+    encoded = supported[1:] & supported[0]
+    compatible = intersects & in_use & encoded
+    fallback = in_use & ~encoded
+    return compatible, fallback
+
+
+def format_range_bounds(lower, upper, exclusions):
+    """
+    Format interval bounds back into a version range string.
+    :param lower: (Version, exclusive) or None
+    :param upper: (Version, inclusive) or None
+    :param exclusions: Iterable of excluded Versions (only those inside the bounds are kept)
+    :return: String like ">=1.5,<2.0,!=1.6", "==1.5" or "any"
+    """
+    if lower is not None and upper is not None and lower[0] == upper[0] and not lower[1] and upper[1]:
+        return f"=={lower[0]}"
+
+    rules = []
+    if lower is not None:
+        rules.append(f"{'>' if lower[1] else '>='}{lower[0]}")
+    if upper is not None:
+        rules.append(f"{'<=' if upper[1] else '<'}{upper[0]}")
+    for v in sorted(exclusions):
+        if lower is not None and (v < lower[0] or (v == lower[0] and lower[1])):
+            continue
+        if upper is not None and (v > upper[0] or (v == upper[0] and not upper[1])):
+            continue
+        rules.append(f"!={v}")
+    return ",".join(rules) if rules else "any"
+
+
+class _DependencyConstraints:
+    """
+    The multiset of constraints that projects place on one dependency.
+    Bounds are kept in sorted lists so the strictest ones are always at the ends.
+    """
+    __slots__ = ("owners", "lowers", "uppers", "exclusions")
+
+    def __init__(self):
+        self.owners = {}       # project -> (range string, parsed bounds)
+        self.lowers = []       # sorted (Version, exclusive); strictest is last
+        self.uppers = []       # sorted (Version, inclusive); strictest is first
+        self.exclusions = {}   # Version -> number of projects excluding it
+
+    def add(self, project, range_str, bounds):
+        lower, upper, exclusions = bounds
+        self.owners[project] = (range_str, bounds)
+        if lower is not None:
+            insort(self.lowers, lower)
+        if upper is not None:
+            insort(self.uppers, upper)
+        for v in exclusions:
+            self.exclusions[v] = self.exclusions.get(v, 0) + 1
+
+    def remove(self, project):
+        _, (lower, upper, exclusions) = self.owners.pop(project)
+        if lower is not None:
+            del self.lowers[bisect_left(self.lowers, lower)]
+        if upper is not None:
+            del self.uppers[bisect_left(self.uppers, upper)]
+        for v in exclusions:
+            self.exclusions[v] -= 1
+            if not self.exclusions[v]:
+                del self.exclusions[v]
+
+    def bounds(self):
+        lower = self.lowers[-1] if self.lowers else None
+        upper = self.uppers[0] if self.uppers else None
+        return lower, upper
+
+    def is_satisfiable(self):
+        lower, upper = self.bounds()
+        if lower is None or upper is None:
+            return True
+        if lower[0] != upper[0]:
+            return lower[0] < upper[0]
+        # Bounds meet at a single version: it must be included on both sides and not excluded
+        return not lower[1] and upper[1] and lower[0] not in self.exclusions
+
+    def allowed_range(self):
+        if not self.is_satisfiable():
+            return None
+        lower, upper = self.bounds()
+        return format_range_bounds(lower, upper, self.exclusions)
+
+
+class IncrementalRequirementReducer:
+    """
+    Incremental counterpart of `reduce_environment_requirements()`.
+
+    Keeps, for every dependency, the constraints contributed by each project, so replacing one
+    project's requirements only touches the dependencies that project (old or new) mentions.
+    Each touched dependency costs O(n) to update (a binary search plus a list insert or delete), where n
+    is the number of projects using it; with ~75 PyHC projects that's a few element moves.
+    """
+
+    def __init__(self):
+        self._project_requirements = {}  # project -> {package: range string}
+        self._constraints = {}           # package -> _DependencyConstraints
+        self._conflicts = set()
+
+    @classmethod
+    def from_project_dependencies(cls, project_dependencies):
+        """
+        :param project_dependencies: Dict like {'PyHC Package 1': {'package1': '>=1.0'}, 'PyHC Package 2': {...}}
+        :return: An IncrementalRequirementReducer holding all the given projects
+        """
+        reducer = cls()
+        for project, requirements in project_dependencies.items():
+            reducer.set_project_requirements(project, requirements)
+        return reducer
+
+    def set_project_requirements(self, project, requirements):
+        """
+        Add a project, or replace all of its requirements.
+        :param project: Project key like 'sunpy==7.1.0'
+        :param requirements: Dict like {'numpy': '>=1.25', 'requests': 'any'}
+        :return: Set of package names whose constraints changed
+        :raises ValueError: If a range can't be represented as an interval (e.g. wildcards)
+        """
+        parsed = {}
+        for package_name, range_str in requirements.items():
+            bounds = parse_range_bounds(str(range_str))
+            if bounds is None:
+                raise ValueError(f"Package '{package_name}': unsupported version range '{range_str}' for project '{project}'")
+            parsed[package_name] = (range_str, bounds)
+
+        old_requirements = self._project_requirements.get(project, {})
+        affected = set()
+        for package_name, old_range in old_requirements.items():
+            if parsed.get(package_name, (None,))[0] != old_range:
+                self._constraints[package_name].remove(project)
+                affected.add(package_name)
+        for package_name, (range_str, bounds) in parsed.items():
+            if old_requirements.get(package_name) != range_str:
+                self._constraints.setdefault(package_name, _DependencyConstraints()).add(project, range_str, bounds)
+                affected.add(package_name)
+
+        self._project_requirements[project] = {name: range_str for name, (range_str, _) in parsed.items()}
+        self._refresh(affected)
+        return affected
+
+    def remove_project(self, project):
+        """
+        :param project: Project key like 'sunpy==7.1.0'
+        :return: Set of package names whose constraints changed
+        """
+        requirements = self._project_requirements.pop(project, {})
+        for package_name in requirements:
+            self._constraints[package_name].remove(project)
+        self._refresh(requirements.keys())
+        return set(requirements)
+
+    def _refresh(self, package_names):
+        for package_name in package_names:
+            constraints = self._constraints[package_name]
+            if not constraints.owners:
+                del self._constraints[package_name]
+                self._conflicts.discard(package_name)
+            elif constraints.is_satisfiable():
+                self._conflicts.discard(package_name)
+            else:
+                self._conflicts.add(package_name)
+
+    def allowed_range(self, package_name):
+        """
+        :param package_name: Dependency name like 'numpy'
+        :return: String like '>=1.25,<2.0', 'any', or None if the package has a dependency conflict
+        :raises KeyError: If no project requires the package
+        """
+        return self._constraints[package_name].allowed_range()
+
+    def allowed_ranges(self):
+        """
+        :return: Dict like {'package1': '>=1.0,<2.0', 'package2': None, ...} (sorted alphabetically),
+                 the same shape `reduce_environment_requirements()` returns.
+        """
+        return {name: self._constraints[name].allowed_range() for name in sorted(self._constraints)}
+
+    def conflicts(self):
+        """
+        :return: Sorted list of package names whose constraints can't all be satisfied
+        """
+        return sorted(self._conflicts)
+
+    def contributors(self, package_name):
+        """
+        :param package_name: Dependency name like 'numpy'
+        :return: Dict like {'sunpy==7.1.0': '>=1.25', ...} of the projects constraining the package
+        """
+        constraints = self._constraints.get(package_name)
+        if constraints is None:
+            return {}
+        return {project: range_str for project, (range_str, _) in constraints.owners.items()}
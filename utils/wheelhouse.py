@@ -0,0 +1,262 @@
+"""
+Content-addressed wheelhouse of locally built wheels for the packages that PyPI has no usable wheel for.
+
+Sdist-only releases (and releases without a wheel for the image's Python and platform) used to be compiled from
+scratch with the conda gcc/gfortran toolchain on every daily build. `pipeline.py --compile` now lists them in
+install-tiers/wheelhouse.txt, each with a key derived from its name, version, Python version and toolchain.
+The Dockerfile's `wheels` stage builds only the keys missing from contents/wheelhouse (restored by the workflow
+cache) with build-wheelhouse.py and the image installs the resulting wheels. After the build, the
+`wheelhouse-export` stage is exported and merged back into the wheelhouse here, together with the build times.
+
+Layout:
+    contents/wheelhouse/<key>/<wheel file>
+    contents/wheelhouse/manifest.json        key → {"name", "version", "wheel", "sha256", "build_seconds", "last_used"}
+"""
+
+import hashlib
+import json
+import os
+import platform
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from packaging.tags import compatible_tags, cpython_tags
+from packaging.utils import InvalidWheelFilename, canonicalize_name, parse_wheel_filename
+
+try:
+    from .package_metadata import fetch_release_files
+    from .version_utils import parse_python_version_from_env_yml
+except ImportError:
+    from package_metadata import fetch_release_files
+    from version_utils import parse_python_version_from_env_yml
+
+MANIFEST_NAME = "manifest.json"
+PLAN_NAME = "wheelhouse.txt"
+
+# Wheels that no build has used for this long are pruned from the wheelhouse
+WHEEL_MAX_UNUSED_AGE = timedelta(days=30)
+
+# environment.yml dependencies whose versions change the compiled output
+TOOLCHAIN_PACKAGE_RE = re.compile(r"^(?:[\w-]+::)?(python|gcc[\w-]*|gxx[\w-]*|gfortran[\w-]*|libgfortran[\w-]*|cmake|make|ninja)\s*([=<>!]|$)")
+
+
+def toolchain_fingerprint(environment_file: str, machine: str = None) -> str:
+    """Hash the parts of the build environment that compiled wheels depend on.
+
+    Args:
+        environment_file: Path to environment.yml
+        machine: Target architecture (default: this machine's, e.g. "x86_64")
+
+    Returns:
+        Short hex digest of the compiler and Python pins in environment.yml and the architecture
+    """
+    pins = []
+    with open(environment_file, "r") as f:
+        for line in f:
+            entry = line.split("#")[0].strip()
+            if entry.startswith("- "):
+                entry = entry[2:].strip()
+                if TOOLCHAIN_PACKAGE_RE.match(entry):
+                    pins.append(entry.replace(" ", ""))
+    pins.append(machine or platform.machine())
+    return hashlib.sha256("\n".join(sorted(pins)).encode("utf-8")).hexdigest()[:12]
+
+
+def wheel_key(name: str, version: str, python_version: str, toolchain: str) -> str:
+    """Content address of one locally built wheel, e.g. "wmm2015-1.1.1-cp312-3f2a9c0d1e4b"."""
+    python_tag = "cp" + "".join(python_version.split(".")[:2])
+    return f"{canonicalize_name(name)}-{version}-{python_tag}-{toolchain}"
+
+
+def target_tags(python_version: str, machine: str = None) -> set:
+    """Wheel tags the image can install, for a CPython version like "3.12" on manylinux."""
+    machine = machine or platform.machine()
+    version = tuple(int(part) for part in python_version.split(".")[:2])
+    platforms = [f"manylinux_2_{minor}_{machine}" for minor in range(40, 4, -1)]
+    platforms += [f"manylinux2014_{machine}", f"manylinux2010_{machine}", f"manylinux1_{machine}", f"linux_{machine}"]
+    tags = set(cpython_tags(version, platforms=platforms))
+    tags |= set(compatible_tags(version, interpreter=f"cp{version[0]}{version[1]}", platforms=platforms))
+    return tags
+
+
+def has_compatible_wheel(filenames, tags) -> bool:
+    """Whether any of a release's files is a wheel with one of the given tags."""
+    for filename in filenames:
+        if not filename.endswith(".whl"):
+            continue
+        try:
+            _, _, _, wheel_tags = parse_wheel_filename(filename)
+        except InvalidWheelFilename:
+            continue
+        if wheel_tags & tags:
+            return True
+    return False
+
+
+def load_manifest(wheelhouse_dir: str) -> dict:
+    path = os.path.join(wheelhouse_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_manifest(wheelhouse_dir: str, manifest: dict) -> None:
+    os.makedirs(wheelhouse_dir, exist_ok=True)
+    path = os.path.join(wheelhouse_dir, MANIFEST_NAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(dict(sorted(manifest.items())), f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def plan_wheelhouse(pins: dict, wheelhouse_dir: str, environment_file: str, python_version: str = None,
+                    max_workers: int = 8) -> dict:
+    """Find the pinned releases that have to be built locally, and which of them the wheelhouse already has.
+
+    Args:
+        pins: Dict mapping canonical name → "name==version" line, from install_tiers.parse_lockfile_graph()
+        wheelhouse_dir: Wheelhouse directory (may not exist yet)
+        environment_file: Path to environment.yml, for the Python version and toolchain
+        python_version: Target Python version like "3.12" (default: from environment.yml)
+        max_workers: Maximum concurrent PyPI requests for uncached release file lists
+
+    Returns:
+        Dict mapping canonical name → {"pin": "name==version", "key": ..., "cached": bool}. Releases whose file
+        list can't be fetched are left out, so they're installed from PyPI as before.
+    """
+    python_version = python_version or parse_python_version_from_env_yml(environment_file)
+    toolchain = toolchain_fingerprint(environment_file)
+    tags = target_tags(python_version)
+    manifest = load_manifest(wheelhouse_dir)
+
+    def _needs_local_build(item):
+        name, pin = item
+        version = pin.split("==", 1)[1]
+        try:
+            return name, not has_compatible_wheel(fetch_release_files(name, version), tags)
+        except Exception as e:
+            print(f"Could not list the release files of {pin}: {e}")
+            return name, False
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        results = list(executor.map(_needs_local_build, sorted(pins.items())))
+
+    plan = {}
+    for name, local in results:
+        if not local:
+            continue
+        pin = pins[name]
+        key = wheel_key(name, pin.split("==", 1)[1], python_version, toolchain)
+        entry = manifest.get(key)
+        cached = entry is not None and os.path.exists(os.path.join(wheelhouse_dir, key, entry["wheel"]))
+        plan[name] = {"pin": pin, "key": key, "cached": cached}
+    return plan
+
+
+def write_wheelhouse_plan(plan: dict, path: str) -> None:
+    """Write the wheelhouse install tier read by build-wheelhouse.py and verify-lockfile.py."""
+    with open(path, "w") as f:
+        f.write("# Locally built wheels (name==version  # wheelhouse key), generated by `pipeline.py --compile` (utils/wheelhouse.py)\n")
+        for name in sorted(plan):
+            f.write(f"{plan[name]['pin']}  # {plan[name]['key']}\n")
+
+
+def read_wheelhouse_plan(path: str) -> dict:
+    """Read write_wheelhouse_plan() output back into a dict mapping key → "name==version"."""
+    plan = {}
+    if not os.path.exists(path):
+        return plan
+    with open(path, "r") as f:
+        for line in f:
+            if line.startswith("#") or "#" not in line:
+                continue
+            pin, key = (part.strip() for part in line.split("#", 1))
+            plan[key] = pin
+    return plan
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def merge_built_wheels(export_dir: str, wheelhouse_dir: str, plan_path: str, now: datetime = None) -> dict:
+    """Merge the wheels exported from the Docker `wheelhouse-export` stage into the wheelhouse, and prune
+    wheels no build has used for WHEEL_MAX_UNUSED_AGE.
+
+    Args:
+        export_dir: Directory the export stage was written to (wheels/<key>/<wheel> and builds/<key>.json)
+        wheelhouse_dir: Persistent wheelhouse directory
+        plan_path: install-tiers/wheelhouse.txt used by the build
+        now: Current time (default: now, naive UTC)
+
+    Returns:
+        Dict {"built": [(key, seconds)], "reused": [(key, seconds saved)], "missing": [keys], "pruned": [keys]}
+    """
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    manifest = load_manifest(wheelhouse_dir)
+    report = {"built": [], "reused": [], "missing": [], "pruned": []}
+
+    for key, pin in sorted(read_wheelhouse_plan(plan_path).items()):
+        build_dir = os.path.join(export_dir, "wheels", key)
+        wheels = sorted(f for f in os.listdir(build_dir) if f.endswith(".whl")) if os.path.isdir(build_dir) else []
+        if not wheels:
+            report["missing"].append(key)
+            continue
+
+        build_info = {}
+        build_info_path = os.path.join(export_dir, "builds", f"{key}.json")
+        if os.path.exists(build_info_path):
+            with open(build_info_path, "r") as f:
+                build_info = json.load(f)
+
+        # Compare content rather than trusting the build report, which may come from a cached Docker layer
+        entry = manifest.get(key)
+        sha256 = _sha256(os.path.join(build_dir, wheels[0]))
+        if entry is not None and entry.get("sha256") == sha256 and os.path.exists(os.path.join(wheelhouse_dir, key, wheels[0])):
+            report["reused"].append((key, entry.get("build_seconds") or 0.0))
+        else:
+            target_dir = os.path.join(wheelhouse_dir, key)
+            os.makedirs(target_dir, exist_ok=True)
+            shutil.copy2(os.path.join(build_dir, wheels[0]), os.path.join(target_dir, wheels[0]))
+            entry = {
+                "name": pin.split("==", 1)[0],
+                "version": pin.split("==", 1)[1],
+                "wheel": wheels[0],
+                "sha256": sha256,
+                "build_seconds": build_info.get("build_seconds"),
+            }
+            report["built"].append((key, entry["build_seconds"] or 0.0))
+        entry["last_used"] = now.isoformat()
+        manifest[key] = entry
+
+    for key, entry in list(manifest.items()):
+        last_used = datetime.fromisoformat(entry.get("last_used", now.isoformat()))
+        if now - last_used > WHEEL_MAX_UNUSED_AGE:
+            shutil.rmtree(os.path.join(wheelhouse_dir, key), ignore_errors=True)
+            del manifest[key]
+            report["pruned"].append(key)
+
+    save_manifest(wheelhouse_dir, manifest)
+    return report
+
+
+def format_wheelhouse_report(report: dict) -> str:
+    """Summarize merge_built_wheels() results, e.g. "Wheelhouse: 3 reused (412.0s of builds saved), 1 built in 95.2s"."""
+    saved = sum(seconds for _, seconds in report["reused"])
+    built = sum(seconds for _, seconds in report["built"])
+    lines = [f"Wheelhouse: {len(report['reused'])} reused ({saved:.1f}s of builds saved), "
+             f"{len(report['built'])} built in {built:.1f}s"]
+    for key, seconds in report["built"]:
+        lines.append(f"  built   {key} ({seconds:.1f}s)")
+    for key in report["missing"]:
+        lines.append(f"  missing {key}")
+    for key in report["pruned"]:
+        lines.append(f"  pruned  {key}")
+    return "\n".join(lines)